@@ -0,0 +1,264 @@
+"""
+Teste de carga ponta a ponta contra o stand-in local (benchmarks/standin.py).
+
+Chama os handlers dos cogs (ProfileCog.perfil, LinkCog.user, PatchCog.patch)
+com interações falsas, numa taxa alvo (chegadas abertas: não espera um
+comando terminar para disparar o próximo), e mede a latência de cada
+comando, as requisições que chegaram ao upstream e o atraso do event loop.
+
+    python -m benchmarks.loadtest --rps 30 --duration 60 --mix perfil=6,user=3,patch=1 \\
+        --accounts 300 --latency 150 --throttle-every 20 --throttle-for 2
+
+Cache em disco e banco ficam num diretório temporário: cada execução começa fria.
+"""
+import os
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="dppgg-load-")
+# precisa valer antes de importar os services (o DISK_CACHE é criado no import)
+os.environ.setdefault("DPPGG_CACHE_PATH", os.path.join(_TMP, "cache.db"))
+os.environ.setdefault("DPPGG_DB_PATH", os.path.join(_TMP, "dppgg.db"))
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from benchmarks.standin import StandInUpstream, add_fault_args, faults_from_args, start
+from cogs.link import LinkCog
+from cogs.patch import PatchCog
+from cogs.profile import ProfileCog
+from services import leagueofgraphs, liquipedia
+from utils.diskcache import DISK_CACHE
+from utils.http import HttpPool
+from utils.workers import PARSE_POOL
+
+GUILD_ID = 1
+
+
+class _FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, **kwargs) -> None:
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs) -> None:
+        self._done = True
+        self._interaction.sent.append(content)
+
+
+class _FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+
+    async def send(self, content=None, **kwargs) -> None:
+        self._interaction.sent.append(content)
+
+
+class FakeInteraction:
+    """O suficiente de discord.Interaction para os handlers rodarem sem gateway."""
+
+    def __init__(self, user_id: int):
+        self.user = SimpleNamespace(id=user_id, mention=f"<@{user_id}>")
+        self.guild_id = GUILD_ID
+        self.guild = None
+        self.channel = None
+        self.response = _FakeResponse(self)
+        self.followup = _FakeFollowup(self)
+        self.sent: list = []
+
+    @property
+    def outcome(self) -> str:
+        # respostas com texto são os avisos; sucesso manda só o embed
+        text = next((s for s in self.sent if s), "")
+        if text.startswith("⏳"):
+            return "unavailable"
+        if text.startswith("❌"):
+            return "not_found"
+        return "ok" if self.sent else "no_reply"
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def _lag_monitor(samples: list[float], interval: float = 0.05) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (loop.time() - t0 - interval) * 1000))
+
+
+async def run(args) -> dict:
+    standin = StandInUpstream(Path(args.fixtures), faults_from_args(args), seed=args.seed)
+    runner, upstream_url = await start(standin)
+    pool = await HttpPool(upstream=upstream_url).start()
+
+    bot = SimpleNamespace(http_pool=pool)
+    profile_cog, link_cog, patch_cog = ProfileCog(bot), LinkCog(bot), PatchCog(bot)
+    bot.get_cog = {"ProfileCog": profile_cog, "LinkCog": link_cog, "PatchCog": patch_cog}.get
+
+    rnd = random.Random(args.seed)
+    accounts = [f"Player{i}-BR1" for i in range(args.accounts)]
+    link_cog.user_history = {str(1000 + i): {"region": "br", "nickname": nick} for i, nick in enumerate(accounts)}
+    # popularidade tipo Zipf: poucos perfis muito consultados, cauda longa de frios
+    cum_weights = list(itertools.accumulate(1 / (k + 1) ** args.zipf for k in range(args.accounts)))
+
+    def pick_account() -> int:
+        return rnd.choices(range(args.accounts), cum_weights=cum_weights)[0]
+
+    async def perfil(it: FakeInteraction):
+        nick = f"missing{rnd.randrange(50)}-BR1" if rnd.random() < args.missing_rate else accounts[pick_account()]
+        await profile_cog.perfil.callback(profile_cog, it, "br", nick)
+
+    async def user(it: FakeInteraction):
+        member = SimpleNamespace(id=1000 + pick_account())
+        member.mention = f"<@{member.id}>"
+        await link_cog.user.callback(link_cog, it, member)
+
+    async def patch(it: FakeInteraction):
+        await patch_cog.patch.callback(patch_cog, it)
+
+    handlers = {"perfil": perfil, "user": user, "patch": patch}
+    mix = _parse_mix(args.mix)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+
+    latencies: dict[str, list[float]] = {n: [] for n in names}
+    outcomes: dict[str, dict[str, int]] = {n: {} for n in names}
+    lag: list[float] = []
+
+    async def one(name: str):
+        it = FakeInteraction(user_id=rnd.randrange(10**6))
+        t0 = time.perf_counter()
+        try:
+            await handlers[name](it)
+            outcome = it.outcome
+        except Exception as e:
+            outcome = f"error:{type(e).__name__}"
+        latencies[name].append((time.perf_counter() - t0) * 1000)
+        outcomes[name][outcome] = outcomes[name].get(outcome, 0) + 1
+
+    lag_task = asyncio.create_task(_lag_monitor(lag))
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    tasks = []
+    total = int(args.rps * args.duration)
+    for i in range(total):
+        delay = started + i / args.rps - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(rnd.choices(names, weights)[0])))
+
+    _, pending = await asyncio.wait(tasks, timeout=args.drain) if tasks else (set(), set())
+    for t in pending:
+        t.cancel()
+    elapsed = loop.time() - started
+    lag_task.cancel()
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        "elapsed_s": round(elapsed, 2),
+        "commands": {
+            name: {
+                "count": len(latencies[name]),
+                "p50_ms": round(percentile(latencies[name], 50), 1),
+                "p95_ms": round(percentile(latencies[name], 95), 1),
+                "p99_ms": round(percentile(latencies[name], 99), 1),
+                "max_ms": round(max(latencies[name], default=0.0), 1),
+                "outcomes": outcomes[name],
+            }
+            for name in names
+        },
+        "unfinished": len(pending),
+        "upstream": dict(standin.counts),
+        "hosts": {host: g.stats.as_dict() for host, g in pool.guards.items()},
+        "loop_lag_ms": {
+            "p50": round(percentile(lag, 50), 2),
+            "p99": round(percentile(lag, 99), 2),
+            "max": round(max(lag, default=0.0), 2),
+        },
+        "caches": {
+            "profile_memory": leagueofgraphs.PROFILE_CACHE.stats.as_dict(),
+            "profile_negative": leagueofgraphs.PROFILE_MISSES.stats.as_dict(),
+            "team_memory": liquipedia.TEAM_CACHE.stats.as_dict(),
+            "disk": DISK_CACHE.stats.as_dict(),
+        },
+        "parse_pool": {fn: s.as_dict() for fn, s in PARSE_POOL.stats.items()},
+    }
+
+    await pool.close()
+    await runner.cleanup()
+    return report
+
+
+def _print_report(report: dict) -> None:
+    print(f"\nDuração: {report['elapsed_s']}s   não terminados: {report['unfinished']}")
+    print(f"{'comando':<10} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  resultados")
+    for name, c in report["commands"].items():
+        print(
+            f"{name:<10} {c['count']:>6} {c['p50_ms']:>7.1f}ms {c['p95_ms']:>7.1f}ms "
+            f"{c['p99_ms']:>7.1f}ms {c['max_ms']:>7.1f}ms  {c['outcomes']}"
+        )
+    print("\nRequisições no upstream:")
+    for site, n in sorted(report["upstream"].items()):
+        print(f"  {site:<40} {n}")
+    print("\nPor host (cliente):")
+    for host, s in report["hosts"].items():
+        print(f"  {host:<40} {s}")
+    lag = report["loop_lag_ms"]
+    print(f"\nAtraso do event loop: p50 {lag['p50']}ms  p99 {lag['p99']}ms  max {lag['max']}ms")
+    print("\nCaches:")
+    for name, s in report["caches"].items():
+        print(f"  {name:<18} {s}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    parser.add_argument("--rps", type=float, default=20.0, help="comandos por segundo")
+    parser.add_argument("--duration", type=float, default=30.0, help="segundos disparando comandos")
+    parser.add_argument("--drain", type=float, default=60.0, help="espera máxima pelos comandos restantes (s)")
+    parser.add_argument("--mix", default="perfil=6,user=3,patch=1")
+    parser.add_argument("--accounts", type=int, default=200, help="contas distintas consultadas")
+    parser.add_argument("--zipf", type=float, default=1.1, help="concentração da popularidade das contas")
+    parser.add_argument("--missing-rate", type=float, default=0.05, help="fração de /perfil com nick inexistente")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="imprime o relatório em JSON")
+    add_fault_args(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        PARSE_POOL.shutdown()
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
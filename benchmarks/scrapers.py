@@ -0,0 +1,288 @@
+"""
+Benchmark offline dos extratores, em cima de páginas gravadas.
+
+Cada fixture é um par em benchmarks/fixtures/:
+    <nome>.html  -> a página como veio do site
+    <nome>.json  -> {"kind", "source", "args", "expected": {alvo: saída}}
+
+As fixtures versionadas têm "source": "synthetic": páginas no formato dos
+sites (mesmas classes, scripts com HTML de isca, tabelas aninhadas), com
+dados inventados. As gravadas com `record` têm a URL de origem.
+
+"expected" é o golden: toda execução compara a saída de cada alvo com ele,
+então dá para trocar o parser por um mais rápido sem medo. Tempo (melhor de
+N chamadas), pico de memória e blocos alocados que sobrevivem à chamada
+(tracemalloc) são comparados com benchmarks/baseline.json.
+
+Uso (da raiz do repositório):
+    python -m benchmarks.scrapers                      # mede e compara
+    python -m benchmarks.scrapers --update-baseline    # grava os números atuais
+    python -m benchmarks.scrapers --update-golden      # aceita as saídas atuais
+    python -m benchmarks.scrapers record profile br/Nome-TAG
+    python -m benchmarks.scrapers record team "T1"
+    python -m benchmarks.scrapers record patch-listing
+    python -m benchmarks.scrapers record patch-article https://www.leagueoflegends.com/pt-br/news/game-updates/...
+
+Sai com código 1 se algum golden divergir ou algum número piorar além da
+tolerância.
+"""
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+
+from services import leagueofgraphs as log
+from services import liquipedia as lq
+from services import patchnotes as pn
+from utils.extract import Extractor
+from utils.html import make_soup
+
+HERE = Path(__file__).resolve().parent
+FIXTURES = HERE / "fixtures"
+BASELINE = HERE / "baseline.json"
+
+# piora aceita antes de acusar regressão (fração) e folga absoluta de tempo
+TOLERANCE = 0.25
+# tempo oscila bem mais que memória numa máquina compartilhada: compara o melhor
+# tempo (min_ms, menos ruidoso que a mediana) com uma folga maior
+TIME_TOLERANCE = 0.6
+TIME_SLACK_MS = 0.2
+# chamadas descartadas antes de medir
+WARMUP = 5
+
+
+def _profile_soup(html: str):
+    # mesma árvore que parse_profile_html monta: só as regiões lidas
+    return make_soup(log._scoped_profile_html(html))
+
+
+def _profile_field_extractor(name: str) -> Extractor:
+    # PROFILE_SPEC reduzido a um campo/grupo de topo: o custo de cada parte da passada única
+    spec = log.PROFILE_SPEC
+    return Extractor(replace(
+        spec,
+        fields=tuple(f for f in spec.fields if f.name == name),
+        groups=tuple(g for g in spec.groups if g.name == name),
+    ))
+
+
+_PROFILE_FIELDS = {name: _profile_field_extractor(name) for name in ("profile_img", "rank", "games")}
+
+
+# alvos por tipo de fixture: nome -> fn(html, args) chamada a cada medição
+TARGETS = {
+    "profile": {
+        "_extract_profile": lambda html, args, soup: log._extract_profile(soup),
+        **{
+            f"_extract_profile[{name}]": (lambda html, args, soup, ex=ex: ex.extract(soup))
+            for name, ex in _PROFILE_FIELDS.items()
+        },
+        "parse_profile_html": lambda html, args, soup: log.parse_profile_html(html, args["slug"], args["region"]),
+    },
+    "team": {
+        "_parse_team_info": lambda html, args, soup: lq._parse_team_info(html, args["title"]),
+    },
+    "patch-listing": {
+        "parse_patch_listing": lambda html, args, soup: pn.parse_patch_listing(html),
+    },
+    "patch-article": {
+        "parse_patch_article": lambda html, args, soup: pn.parse_patch_article(html, args["url"]),
+    },
+}
+
+# extratores que recebem a árvore pronta: a montagem dela não entra na medição
+_SOUP_BUILDERS = {"profile": _profile_soup}
+
+
+def _normalize(value):
+    # tuplas viram listas, modelos viram dicts: compara do mesmo jeito que o golden foi gravado
+    return json.loads(json.dumps(value, ensure_ascii=False, default=lambda model: model.to_dict()))
+
+
+def _measure(fn, repeat: int) -> dict:
+    # aquecimento fora da medição: caches de regex/bs4 e alocador já no regime
+    for _ in range(WARMUP):
+        fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(max(s.count_diff, 0) for s in after.compare_to(before, "filename"))
+    del result
+
+    return {
+        "median_ms": round(statistics.median(times), 4),
+        "min_ms": round(min(times), 4),
+        "peak_kb": round((peak - base) / 1024, 1),
+        "alloc_blocks": blocks,
+    }
+
+
+def load_fixtures(directory: Path) -> list[tuple[str, str, dict]]:
+    fixtures = []
+    for meta_path in sorted(directory.glob("*.json")):
+        html_path = meta_path.with_suffix(".html")
+        if not html_path.exists():
+            continue
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        fixtures.append((meta_path.stem, html_path.read_text(encoding="utf-8"), meta))
+    return fixtures
+
+
+def _regressions(current: dict, base: dict) -> list[str]:
+    found = []
+    if current["min_ms"] > base["min_ms"] * (1 + TIME_TOLERANCE) + TIME_SLACK_MS:
+        found.append(f"tempo {base['min_ms']:.3f} -> {current['min_ms']:.3f} ms")
+    if current["peak_kb"] > base["peak_kb"] * (1 + TOLERANCE) + 1:
+        found.append(f"pico {base['peak_kb']:.1f} -> {current['peak_kb']:.1f} KB")
+    if current["alloc_blocks"] > base["alloc_blocks"] * (1 + TOLERANCE) + 10:
+        found.append(f"blocos {base['alloc_blocks']} -> {current['alloc_blocks']}")
+    return found
+
+
+def run(args) -> int:
+    directory = Path(args.fixtures)
+    fixtures = load_fixtures(directory)
+    if not fixtures:
+        # sem fixture o gate não compara nada: falha em vez de passar em branco
+        print(f"Nenhuma fixture em {directory}. Grave uma com: python -m benchmarks.scrapers record ...")
+        return 1
+
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8")) if BASELINE.exists() else {}
+    results = {}
+    failures = []
+
+    print(f"{'fixture/alvo':<55} {'mediana':>10} {'pico':>10} {'blocos':>8}")
+    for name, html, meta in fixtures:
+        kind = meta["kind"]
+        call_args = meta.get("args") or {}
+        build = _SOUP_BUILDERS.get(kind)
+        soup = build(html) if build else None
+        expected = meta.setdefault("expected", {})
+
+        for target, fn in TARGETS[kind].items():
+            key = f"{name}/{target}"
+            output = _normalize(fn(html, call_args, soup))
+            if args.update_golden:
+                expected[target] = output
+            elif target in expected and expected[target] != output:
+                failures.append(f"{key}: saída diferente do golden")
+            elif target not in expected:
+                print(f"  aviso: {key} sem golden (use --update-golden)")
+
+            stats = _measure(lambda: fn(html, call_args, soup), args.repeat)
+            results[key] = stats
+            print(f"{key:<55} {stats['median_ms']:>8.3f}ms {stats['peak_kb']:>8.1f}KB {stats['alloc_blocks']:>8}")
+
+            if not args.update_baseline and key in baseline:
+                failures += [f"{key}: {r}" for r in _regressions(stats, baseline[key])]
+
+        if args.update_golden:
+            (directory / f"{name}.json").write_text(
+                json.dumps(meta, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+            )
+
+    if args.update_baseline:
+        BASELINE.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline gravado em {BASELINE}")
+
+    if failures:
+        print("\nFALHOU:")
+        for f in failures:
+            print(f" - {f}")
+        return 1
+    return 0
+
+
+async def _download(kind: str, target: str | None) -> tuple[str, str, dict]:
+    """(html, url de origem, args) de uma página ao vivo, pelo mesmo caminho dos services."""
+    from utils.http import HttpPool
+
+    async with HttpPool() as pool:
+        if kind == "profile":
+            region, slug = target.split("/", 1)
+            url = f"https://{log.HOST}/summoner/{region}/{slug}"
+            # página inteira: o corte antecipado do bot gravaria uma fixture truncada
+            html = await log._fetch_html(pool, url, full=True)
+            return html, url, {"region": region, "slug": slug}
+
+        if kind == "team":
+            title = await lq._resolve_page_title(pool, target)
+            if not title:
+                raise SystemExit(f"Time não encontrado: {target}")
+            html = await lq._parse_page_html(pool, title)
+            return html, f"{lq.LOL_BASE}/{title.replace(' ', '_')}", {"title": title}
+
+        url = pn.LATEST_URL if kind == "patch-listing" else target
+        async with pool.get(pn.PROFILE, url) as response:
+            response.raise_for_status()
+            html = await response.text()
+        return html, url, {"url": url} if kind == "patch-article" else {}
+
+
+def record(args) -> int:
+    html, source, call_args = asyncio.run(_download(args.kind, args.target))
+    if not html:
+        print("Página vazia ou não encontrada; nada gravado.")
+        return 1
+
+    name = args.name or re.sub(r"[^a-z0-9]+", "-", f"{args.kind} {args.target or ''}".lower()).strip("-")
+    directory = Path(args.fixtures)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{name}.html").write_text(html, encoding="utf-8")
+
+    build = _SOUP_BUILDERS.get(args.kind)
+    soup = build(html) if build else None
+    meta = {
+        "kind": args.kind,
+        "source": source,
+        "args": call_args,
+        "expected": {t: _normalize(fn(html, call_args, soup)) for t, fn in TARGETS[args.kind].items()},
+    }
+    (directory / f"{name}.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print(f"Gravado {name} ({len(html) // 1024} KB). Confira o golden antes de commitar.")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scrapers")
+    parser.add_argument("--fixtures", default=str(FIXTURES))
+    sub = parser.add_subparsers(dest="command")
+
+    parser.add_argument("--repeat", type=int, default=50, help="chamadas medidas por alvo")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--update-golden", action="store_true")
+
+    rec = sub.add_parser("record", help="baixa uma página real e grava fixture + golden")
+    rec.add_argument("kind", choices=sorted(TARGETS))
+    rec.add_argument("target", nargs="?", help="região/slug, nome do time ou URL do artigo")
+    rec.add_argument("--name")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        if args.kind in ("profile", "team", "patch-article") and not args.target:
+            parser.error(f"record {args.kind} precisa do alvo")
+        return record(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Servidor local que imita League of Graphs, Liquipedia e as notas de patch,
+servindo as fixtures gravadas em benchmarks/fixtures (ver benchmarks/scrapers.py).
+
+O bot (ou o driver de carga) fala com ele via HttpPool(upstream=...) ou
+DPPGG_UPSTREAM_URL=http://127.0.0.1:8765: os caminhos são os mesmos dos sites,
+só o host muda. Latência, rajadas de 429 e erros 503 são configuráveis.
+
+    python -m benchmarks.standin --port 8765 --latency 150 --jitter 50 \\
+        --error-rate 0.02 --throttle-every 30 --throttle-for 3
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+from benchmarks.scrapers import FIXTURES, load_fixtures
+
+# slugs com este prefixo respondem 404 (exercita o cache negativo)
+MISSING_PREFIX = "missing"
+
+# cabeçalhos de seção como o MediaWiki renderiza: <div class="mw-heading mw-headingN"><hN>título</hN></div>
+_HEADING_RE = re.compile(r'<div class="mw-heading mw-heading(\d)"><h\1[^>]*>(.*?)</h\1></div>', re.S)
+
+
+def split_sections(html: str) -> tuple[list[dict], list[str]]:
+    """
+    (prop=sections, texto de cada section=N) de uma página gravada. A seção N
+    vai do seu cabeçalho até o próximo de nível igual ou maior; a 0 é o que
+    vem antes do primeiro cabeçalho.
+    """
+    heads = list(_HEADING_RE.finditer(html))
+    sections, texts = [], [html[: heads[0].start()] if heads else html]
+    for i, m in enumerate(heads):
+        level = int(m.group(1))
+        end = next((h.start() for h in heads[i + 1:] if int(h.group(1)) <= level), len(html))
+        sections.append({"index": str(i + 1), "line": re.sub(r"<[^>]+>", "", m.group(2)), "level": str(level)})
+        texts.append(html[m.start():end])
+    return sections, texts
+
+
+@dataclass
+class Faults:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    # fração das requisições que recebe 503
+    error_rate: float = 0.0
+    # a cada `throttle_every` s, responde 429 durante `throttle_for` s
+    throttle_every: float = 0.0
+    throttle_for: float = 0.0
+    retry_after: int = 1
+
+
+class StandInUpstream:
+    def __init__(self, fixtures_dir: Path = FIXTURES, faults: Faults | None = None, *, seed: int = 0):
+        self.faults = faults or Faults()
+        self.random = random.Random(seed)
+        self.counts: Counter = Counter()
+        self._started = time.monotonic()
+
+        self.profiles: dict[tuple[str, str], str] = {}
+        self.teams: dict[str, str] = {}
+        self.listing: str | None = None
+        self.articles: dict[str, str] = {}
+        for _, html, meta in load_fixtures(fixtures_dir):
+            kind, args = meta["kind"], meta.get("args") or {}
+            if kind == "profile":
+                self.profiles[(args["region"], args["slug"])] = html
+            elif kind == "team":
+                self.teams[args["title"]] = html
+            elif kind == "patch-listing":
+                self.listing = html
+            elif kind == "patch-article":
+                self.articles[urlsplit(args["url"]).path] = html
+
+        # revisão fixa por time: a mesma oldid sempre devolve a mesma página
+        self.revids = {title: i for i, title in enumerate(sorted(self.teams), start=1)}
+        self.titles_by_revid = {rev: title for title, rev in self.revids.items()}
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._faults_middleware])
+        app.router.add_get("/summoner/{region}/{slug}", self.summoner)
+        app.router.add_get("/leagueoflegends/api.php", self.mediawiki)
+        app.router.add_get("/pt-br/news/tags/patch-notes/", self.patch_listing)
+        app.router.add_get("/pt-br/news/{tail:.*}", self.patch_article)
+        return app
+
+    @staticmethod
+    def _site(request: web.Request) -> str:
+        return request.headers.get("X-Upstream-Host") or request.path.split("/")[1]
+
+    @web.middleware
+    async def _faults_middleware(self, request: web.Request, handler):
+        site = self._site(request)
+        self.counts[site] += 1
+
+        f = self.faults
+        if f.latency_ms or f.jitter_ms:
+            delay = max(0.0, self.random.gauss(f.latency_ms, f.jitter_ms)) / 1000
+            await asyncio.sleep(delay)
+
+        if f.throttle_every and (time.monotonic() - self._started) % f.throttle_every < f.throttle_for:
+            self.counts[f"{site} 429"] += 1
+            return web.Response(status=429, headers={"Retry-After": str(f.retry_after)})
+        if f.error_rate and self.random.random() < f.error_rate:
+            self.counts[f"{site} 503"] += 1
+            return web.Response(status=503)
+
+        return await handler(request)
+
+    def _html(self, request: web.Request, html: str) -> web.Response:
+        # validador estável: exercita o caminho de GET condicional (304)
+        etag = '"' + hashlib.blake2b(html.encode("utf-8"), digest_size=8).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=html, content_type="text/html", headers={"ETag": etag})
+
+    async def summoner(self, request: web.Request) -> web.Response:
+        region, slug = request.match_info["region"], request.match_info["slug"]
+        if slug.lower().startswith(MISSING_PREFIX) or not self.profiles:
+            return web.Response(status=404)
+        # sem fixture para o slug, qualquer perfil gravado serve de resposta
+        html = self.profiles.get((region, slug)) or next(iter(self.profiles.values()))
+        return self._html(request, html)
+
+    async def patch_listing(self, request: web.Request) -> web.Response:
+        if self.listing is None:
+            return web.Response(status=404)
+        return self._html(request, self.listing)
+
+    async def patch_article(self, request: web.Request) -> web.Response:
+        if not self.articles:
+            return web.Response(status=404)
+        html = self.articles.get(request.path) or next(iter(self.articles.values()))
+        return self._html(request, html)
+
+    async def mediawiki(self, request: web.Request) -> web.Response:
+        q = request.query
+        if q.get("action") == "query" and q.get("list") == "search":
+            term = q.get("srsearch", "").lower()
+            hits = [t for t in self.teams if term in t.lower()] or list(self.teams)[:1]
+            return web.json_response({"query": {"search": [{"title": t} for t in hits[:5]]}})
+
+        if q.get("action") == "query" and q.get("prop") == "info":
+            pages = {}
+            for i, title in enumerate(q.get("titles", "").split("|")):
+                if title in self.revids:
+                    pages[str(self.revids[title])] = {"title": title, "lastrevid": self.revids[title]}
+                else:
+                    pages[str(-i - 1)] = {"title": title, "missing": ""}
+            return web.json_response({"query": {"pages": pages}})
+
+        if q.get("action") == "query" and q.get("list") == "categorymembers":
+            return web.json_response({"query": {"categorymembers": [{"title": t} for t in self.teams]}})
+
+        if q.get("action") == "parse":
+            title = q.get("page") or self.titles_by_revid.get(int(q.get("oldid", 0) or 0))
+            if title not in self.teams:
+                return web.json_response({"error": {"code": "missingtitle"}})
+            sections, texts = split_sections(self.teams[title])
+            if q.get("prop") == "sections":
+                return web.json_response({"parse": {"title": title, "sections": sections}})
+            html = self.teams[title]
+            if q.get("section") is not None:
+                index = int(q["section"])
+                if index >= len(texts):
+                    return web.json_response({"error": {"code": "nosuchsection"}})
+                html = texts[index]
+            return web.json_response({"parse": {"title": title, "text": {"*": html}}})
+
+        return web.json_response({"error": {"code": "unsupported"}}, status=400)
+
+
+async def start(standin: StandInUpstream, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, str]:
+    """Sobe o servidor e devolve (runner, url base). Porta 0 escolhe uma livre."""
+    runner = web.AppRunner(standin.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound = runner.addresses[0]
+    return runner, f"http://{bound[0]}:{bound[1]}"
+
+
+def faults_from_args(args) -> Faults:
+    return Faults(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        throttle_every=args.throttle_every,
+        throttle_for=args.throttle_for,
+    )
+
+
+def add_fault_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--fixtures", default=str(FIXTURES))
+    parser.add_argument("--latency", type=float, default=100.0, help="latência média (ms)")
+    parser.add_argument("--jitter", type=float, default=30.0, help="desvio da latência (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=float, default=0.0, help="período das rajadas de 429 (s)")
+    parser.add_argument("--throttle-for", type=float, default=0.0, help="duração de cada rajada (s)")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.standin")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_fault_args(parser)
+    args = parser.parse_args(argv)
+
+    standin = StandInUpstream(Path(args.fixtures), faults_from_args(args))
+
+    async def serve():
+        runner, url = await start(standin, args.host, args.port)
+        print(f"Stand-in em {url} (DPPGG_UPSTREAM_URL={url}). Ctrl+C para sair.")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
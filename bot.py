@@ -1,42 +1,177 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import signal
 import sys
+import time
 import discord
+from discord import app_commands
 from discord.ext import commands
 
 from config import DISCORD_TOKEN
+from utils.cluster import CLUSTER
+from utils.diskcache import DISK_CACHE
+from utils.http import HttpPool
+from utils.logging_segup import (
+    COMMAND_SECONDS, GATEWAY_DELAY_SECONDS, LoopLagMonitor, MetricsExporter, setup_logging,
+)
+from utils.html import warm_up as warm_up_parser
+from utils.storage import BOT_META, MATCH_HISTORY
+from utils.workers import PARSE_POOL
 
 sys.stdout.reconfigure(encoding="utf-8")
 
+log = logging.getLogger("dppgg.bot")
+
 INTENTS = discord.Intents.default()
 INTENTS.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=INTENTS)
-
 EXTENSIONS = [
     "cogs.help",
     "cogs.profile",
     "cogs.patch",
     "cogs.link",
+    "cogs.team",
+    "cogs.ranking",
 ]
 
-@bot.event
-async def on_ready():
-    # Carrega extensões
-    for ext in EXTENSIONS:
+# DPPGG_FORCE_SYNC=1 sincroniza mesmo com o hash igual (ex: comandos apagados à mão no portal)
+FORCE_SYNC = os.getenv("DPPGG_FORCE_SYNC") == "1"
+TREE_HASH_KEY = "command_tree_hash"
+
+
+def command_tree_hash(tree: app_commands.CommandTree, application_id: int | None) -> str:
+    """Hash do payload que o sync enviaria: muda se qualquer comando/opção/descrição mudar."""
+    payload = []
+    for command in tree.get_commands():
+        try:
+            payload.append(command.to_dict(tree))
+        except TypeError:
+            # discord.py < 2.4: to_dict() sem a árvore
+            payload.append(command.to_dict())
+    payload.sort(key=lambda c: (c.get("type", 1), c["name"]))
+    raw = json.dumps({"app": application_id, "commands": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DppBot(commands.AutoShardedBot):
+    def __init__(self):
+        # no cluster, cada processo recebe só a sua faixa de shards (ver cluster.py)
+        super().__init__(
+            command_prefix="!",
+            intents=INTENTS,
+            shard_ids=CLUSTER.shard_ids,
+            shard_count=CLUSTER.shard_count,
+        )
+        # sessão HTTP única compartilhada pelos services (ver utils/http.py)
+        self.http_pool = HttpPool()
+        self.loop_lag = LoopLagMonitor()
+        self.metrics = MetricsExporter()
+        # interaction.id -> início, para medir a latência de cada slash command
+        self._command_started: dict[int, float] = {}
+        self._startup_tasks: list[asyncio.Task] = []
+        self._shutdown_task: asyncio.Task | None = None
+
+    async def setup_hook(self):
+        # roda uma vez por processo (não a cada reconexão do gateway, como o on_ready)
+        await self.http_pool.start()
+        await MATCH_HISTORY.open()
+        await BOT_META.open()
+        self.tree.on_error = self._on_app_command_error
+        self.loop_lag.start()
+        await self.metrics.start()
+
+        # o supervisor do cluster (e systemd/docker) para o processo com SIGTERM; o
+        # discord.py só trata Ctrl+C, então sem isso o close() (flush dos vínculos,
+        # checkpoint do WAL, métricas) nunca rodaria
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self._on_sigterm)
+        except (NotImplementedError, RuntimeError):
+            # Windows: sem add_signal_handler
+            pass
+
+        for ext in EXTENSIONS:
+            try:
+                await self.load_extension(ext)
+            except Exception:
+                log.exception("falha ao carregar extensão", extra={"extension": ext})
+
+        # nada disso segura o login: os comandos já registrados no Discord continuam valendo
+        self._startup_tasks = [
+            asyncio.create_task(self._sync_commands()),
+            asyncio.create_task(PARSE_POOL.warm_up(warm_up_parser)),
+        ]
+
+    async def _sync_commands(self) -> None:
+        # os comandos são globais: no cluster, só o primário sincroniza
+        if not CLUSTER.primary:
+            return
+        digest = command_tree_hash(self.tree, self.application_id)
+        if not FORCE_SYNC and await BOT_META.get_meta(TREE_HASH_KEY) == digest:
+            log.info("árvore de comandos inalterada; sync pulado")
+            return
         try:
-            if ext not in bot.extensions:
-                await bot.load_extension(ext)
-        except Exception as e:
-            print(f"❌ Falha ao carregar {ext}: {e}")
-
-    # Sincroniza comandos
-    try:
-        synced = await bot.tree.sync()
-        print(f"✅ {len(synced)} comandos sincronizados:")
-        for cmd in synced:
-            print(f" - /{cmd.name} → {cmd.description}")
-    except Exception as e:
-        print(f"❌ Falha ao sincronizar comandos: {e}")
-
-    print("🤖 Bot online!")
-
-bot.run(DISCORD_TOKEN)
\ No newline at end of file
+            synced = await self.tree.sync()
+        except Exception:
+            log.exception("falha ao sincronizar comandos")
+            return
+        await BOT_META.set_meta(TREE_HASH_KEY, digest)
+        log.info("comandos sincronizados", extra={"count": len(synced), "commands": ",".join(c.name for c in synced)})
+
+    async def on_interaction(self, interaction: discord.Interaction):
+        if interaction.type is not discord.InteractionType.application_command:
+            return
+        self._command_started[interaction.id] = time.perf_counter()
+        GATEWAY_DELAY_SECONDS.observe(max(0.0, (discord.utils.utcnow() - interaction.created_at).total_seconds()))
+        # interações que nunca completam (timeout do Discord) não podem acumular
+        if len(self._command_started) > 1000:
+            oldest = sorted(self._command_started.items(), key=lambda kv: kv[1])[:500]
+            for key, _ in oldest:
+                self._command_started.pop(key, None)
+
+    def _finish_command(self, interaction: discord.Interaction, status: str) -> float | None:
+        started = self._command_started.pop(interaction.id, None)
+        if started is None:
+            return None
+        elapsed = time.perf_counter() - started
+        name = interaction.command.qualified_name if interaction.command else "desconhecido"
+        COMMAND_SECONDS.observe(elapsed, command=name, status=status)
+        log.info("comando concluído", extra={"command": name, "status": status, "elapsed_s": elapsed})
+        return elapsed
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        self._finish_command(interaction, "ok")
+
+    async def _on_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        self._finish_command(interaction, "error")
+        name = interaction.command.qualified_name if interaction.command else "desconhecido"
+        log.error("comando falhou", exc_info=error, extra={"command": name, "user_id": interaction.user.id})
+
+    async def on_ready(self):
+        # extensões e sync já rodaram no setup_hook; aqui só o aviso (dispara a cada reconexão)
+        log.info("bot online", extra={"guilds": len(self.guilds)})
+
+    def _on_sigterm(self) -> None:
+        if self._shutdown_task is None:
+            log.info("SIGTERM recebido; encerrando")
+            self._shutdown_task = asyncio.create_task(self.close())
+
+    async def close(self):
+        await super().close()
+        await self.loop_lag.stop()
+        await self.metrics.stop()
+        await self.http_pool.close()
+        PARSE_POOL.shutdown()
+        await DISK_CACHE.close()
+        await MATCH_HISTORY.close()
+        await BOT_META.close()
+
+
+if __name__ == "__main__":
+    # o bot só nasce aqui: o pool de parse em modo "process" (spawn) reimporta
+    # este módulo em cada worker, que não deve montar um DppBot próprio
+    setup_logging(static_fields={"cluster": CLUSTER.cluster_id} if CLUSTER.enabled else None)
+    bot = DppBot()
+    bot.run(DISCORD_TOKEN, log_handler=None)
\ No newline at end of file
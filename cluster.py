@@ -0,0 +1,164 @@
+"""
+Modo cluster: N processos do bot, cada um com uma faixa de shards do Discord.
+
+    python cluster.py --workers 4            # shards recomendados pelo Discord
+    python cluster.py --workers 4 --shards 16
+
+Os processos compartilham o cache em disco (DPPGG_CACHE_PATH) e o banco
+(DPPGG_DB_PATH), ambos SQLite em WAL: um perfil raspado por um worker já
+está quente para os outros. O supervisor reinicia quem cair, com backoff.
+"""
+import argparse
+import asyncio
+import logging
+import math
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+from config import DISCORD_TOKEN
+from utils.logging_segup import setup_logging
+
+BOT_PATH = Path(__file__).resolve().parent / "bot.py"
+GATEWAY_URL = "https://discord.com/api/v10/gateway/bot"
+# o Discord aceita um IDENTIFY por "balde" de concorrência a cada 5s
+IDENTIFY_INTERVAL = 5.0
+# worker que ficou de pé esse tempo todo volta a reiniciar sem espera
+STABLE_AFTER = 5 * 60
+MAX_BACKOFF = 60.0
+
+log = logging.getLogger("dppgg.cluster")
+
+
+async def gateway_info(token: str) -> tuple[int, int]:
+    """(shards recomendados, max_concurrency do IDENTIFY)."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_URL, headers={"Authorization": f"Bot {token}"}) as r:
+            r.raise_for_status()
+            data = await r.json()
+    limit = data.get("session_start_limit") or {}
+    return int(data["shards"]), int(limit.get("max_concurrency") or 1)
+
+
+def split_shards(total: int, workers: int) -> list[list[int]]:
+    """Faixas contíguas e o mais iguais possível: 10 shards / 3 workers -> 3, 3, 4."""
+    return [list(range(i * total // workers, (i + 1) * total // workers)) for i in range(workers)]
+
+
+class Worker:
+    def __init__(self, cluster_id: int, workers: int, shard_ids: list[int], shard_count: int, start_delay: float):
+        self.cluster_id = cluster_id
+        self.workers = workers
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.start_delay = start_delay
+        self.process: asyncio.subprocess.Process | None = None
+        self.restarts = 0
+
+    def env(self) -> dict:
+        env = {
+            **os.environ,
+            "DPPGG_CLUSTER_ID": str(self.cluster_id),
+            "DPPGG_CLUSTER_WORKERS": str(self.workers),
+            "DPPGG_SHARD_IDS": ",".join(map(str, self.shard_ids)),
+            "DPPGG_SHARD_COUNT": str(self.shard_count),
+        }
+        # cada worker precisa da sua própria porta de métricas
+        if os.getenv("DPPGG_METRICS_PORT"):
+            env["DPPGG_METRICS_PORT"] = str(int(os.environ["DPPGG_METRICS_PORT"]) + self.cluster_id)
+        return env
+
+    async def supervise(self, stopping: asyncio.Event) -> None:
+        # IDENTIFYs escalonados: todos os workers ao mesmo tempo estourariam o limite
+        try:
+            await asyncio.wait_for(stopping.wait(), timeout=self.start_delay)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        failures = 0
+        while not stopping.is_set():
+            started = time.monotonic()
+            self.process = await asyncio.create_subprocess_exec(sys.executable, str(BOT_PATH), env=self.env())
+            log.info("worker iniciado", extra={
+                "cluster": self.cluster_id, "pid": self.process.pid, "shards": ",".join(map(str, self.shard_ids)),
+            })
+            code = await self.process.wait()
+            if stopping.is_set():
+                break
+
+            failures = 0 if time.monotonic() - started >= STABLE_AFTER else failures + 1
+            delay = min(MAX_BACKOFF, 2 ** failures) if failures else 1.0
+            self.restarts += 1
+            log.error("worker caiu; reiniciando", extra={
+                "cluster": self.cluster_id, "exit_code": code, "restart_in_s": delay, "restarts": self.restarts,
+            })
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self, timeout: float = 20.0) -> None:
+        if self.process is None or self.process.returncode is not None:
+            return
+        # SIGTERM: o bot roda o close() (flush dos vínculos, checkpoint, métricas);
+        # kill só se ele não terminar dentro do prazo
+        self.process.terminate()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+
+
+async def run_cluster(workers: int, shards: int | None) -> None:
+    max_concurrency = 1
+    if shards is None:
+        shards, max_concurrency = await gateway_info(DISCORD_TOKEN)
+    workers = max(1, min(workers, shards))
+
+    group = []
+    delay = 0.0
+    for cluster_id, shard_ids in enumerate(split_shards(shards, workers)):
+        group.append(Worker(cluster_id, workers, shard_ids, shards, delay))
+        delay += math.ceil(len(shard_ids) / max_concurrency) * IDENTIFY_INTERVAL
+    log.info("cluster subindo", extra={"workers": workers, "shards": shards})
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C chega como KeyboardInterrupt
+            pass
+
+    tasks = [asyncio.create_task(w.supervise(stopping)) for w in group]
+    try:
+        await stopping.wait()
+    finally:
+        stopping.set()
+        log.info("parando workers")
+        await asyncio.gather(*(w.stop() for w in group))
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python cluster.py")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos do bot")
+    parser.add_argument("--shards", type=int, help="total de shards (padrão: recomendado pelo Discord)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    try:
+        asyncio.run(run_cluster(args.workers, args.shards))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,11 @@ class HelpCog(commands.Cog):
         embed.add_field(name="/perfil", value="🔍 Busca o perfil de um invocador.", inline=False)
         embed.add_field(name="/ajuda", value="📘 Exibe esta mensagem.", inline=False)
         embed.add_field(name="/patch", value="🛠️ Veja as últimas notas de atualização.", inline=False)
+        embed.add_field(name="/patch_inscrever", value="🔔 Recebe novas notas de patch num canal.", inline=False)
+        embed.add_field(name="/patch_cancelar", value="🔕 Cancela o envio automático das notas.", inline=False)
         embed.add_field(name="/time", value="🏟️ Info de time profissional (Liquipedia).", inline=False)
+        embed.add_field(name="/historico", value="📈 Sequência, PDL e campeões da conta vinculada.", inline=False)
+        embed.add_field(name="/ranking", value="🏅 Ranking dos membros vinculados do servidor.", inline=False)
         embed.add_field(name="/user", value="👤 Perfil vinculado a um usuário.", inline=False)
         embed.add_field(name="/vincular", value="🔗 Vincula sua conta ao LoL.", inline=False)
         embed.add_field(name="/desvincular", value="❌ Remove a vinculação.", inline=False)
@@ -1,23 +1,56 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from urllib.parse import quote
 from typing import Dict
 
-from services.leagueofgraphs import get_league_of_graphs_profile_async
+from services.leagueofgraphs import get_cached_profile_async
+from utils.cluster import CLUSTER
 from utils.formatting import rank_color
-from utils.storage import load_user_history, save_user_history
+from utils.ratelimit import UpstreamUnavailable
+from utils.storage import MATCH_HISTORY, UserStore, WriteBehindStore
 from utils.constants import EMBED_FOOTER_TEXT, EMBED_FOOTER_ICON
 
+# no cluster, de quanto em quanto tempo o mapa em memória é relido do banco
+RELOAD_MINUTES = 5
+
 
 class LinkCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # Carrega histórico ao subir o bot
-        self.user_history: Dict[str, Dict[str, str]] = load_user_history()
-
-    def _persist(self) -> None:
-        save_user_history(self.user_history)
+        self.store = WriteBehindStore(UserStore())
+        self.user_history: Dict[str, Dict[str, str]] = {}
+
+    async def cog_load(self) -> None:
+        # Carrega histórico ao subir o bot (migra o user_history.json na primeira vez)
+        await self.store.open()
+        self.user_history = await self.store.load_all()
+        if CLUSTER.enabled:
+            self.reload_links.start()
+
+    async def cog_unload(self) -> None:
+        self.reload_links.cancel()
+        # grava o que ainda estiver pendente antes de desligar
+        await self.store.close()
+
+    @tasks.loop(minutes=RELOAD_MINUTES)
+    async def reload_links(self):
+        # pega vínculos feitos em outros processos (usado pelo /ranking e pelo autocomplete)
+        self.user_history = await self.store.load_all()
+
+    async def _linked(self, user_id: str) -> Dict[str, str] | None:
+        """
+        Vínculo do usuário. Sozinho, o mapa em memória é a verdade; no cluster
+        o usuário pode ter vinculado por outro processo, então o banco decide.
+        """
+        if not CLUSTER.enabled:
+            return self.user_history.get(user_id)
+        linked = await self.store.get(user_id)
+        if linked is None:
+            self.user_history.pop(user_id, None)
+        else:
+            self.user_history[user_id] = linked
+        return linked
 
     @app_commands.command(
         name="vincular",
@@ -41,7 +74,7 @@ class LinkCog(commands.Cog):
             return
 
         self.user_history[user_id] = {"region": region, "nickname": nickname_tag}
-        self._persist()
+        self.store.upsert(user_id, region, nickname_tag)
 
         await interaction.response.send_message(
             f"✅ Vinculado: `{nickname_tag}` na região `{region}`.",
@@ -55,7 +88,7 @@ class LinkCog(commands.Cog):
     async def desvincular(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
 
-        if user_id not in self.user_history:
+        if await self._linked(user_id) is None:
             await interaction.response.send_message(
                 "❌ Você não possui nenhuma conta vinculada.",
                 ephemeral=True
@@ -63,7 +96,7 @@ class LinkCog(commands.Cog):
             return
 
         del self.user_history[user_id]
-        self._persist()
+        self.store.delete(user_id)
 
         await interaction.response.send_message(
             "✅ Sua conta foi desvinculada com sucesso.",
@@ -78,19 +111,25 @@ class LinkCog(commands.Cog):
     async def user(self, interaction: discord.Interaction, discord_user: discord.Member):
         await interaction.response.defer(ephemeral=True)
 
-        user_id = str(discord_user.id)
-        if user_id not in self.user_history:
+        linked = await self._linked(str(discord_user.id))
+        if linked is None:
             await interaction.followup.send(
                 f"❌ {discord_user.mention} não vinculou uma conta ainda.",
                 ephemeral=True
             )
             return
 
-        linked = self.user_history[user_id]
         region = linked["region"]
         nickname = linked["nickname"]
 
-        data = await get_league_of_graphs_profile_async(nickname, region)
+        try:
+            data = await get_cached_profile_async(nickname, region, http=self.bot.http_pool)
+        except UpstreamUnavailable:
+            await interaction.followup.send(
+                "⏳ O League of Graphs está instável agora. Tente novamente em alguns instantes.",
+                ephemeral=True
+            )
+            return
         if not data:
             await interaction.followup.send(
                 f"❌ Não encontrei `{nickname}` na região `{region}`.",
@@ -98,39 +137,37 @@ class LinkCog(commands.Cog):
             )
             return
 
-        color = rank_color(data.get("rank"))
-        url = f"https://www.leagueofgraphs.com/summoner/{region}/{quote(data['name'])}#championsData-all"
+        color = rank_color(data.rank)
+        url = f"https://www.leagueofgraphs.com/summoner/{region}/{quote(data.name)}#championsData-all"
 
         embed = discord.Embed(
-            title=f"👤 {data['name']}",
+            title=f"👤 {data.name}",
             url=url,
             color=color,
             description=f"🔍 Perfil vinculado de {discord_user.mention}"
         )
 
-        if data.get("profile_img"):
-            embed.set_thumbnail(url=data["profile_img"])
+        if data.profile_img:
+            embed.set_thumbnail(url=data.profile_img)
 
-        lm = data.get("last_matches", [])
         text = ""
-        for idx, m in enumerate(lm, start=1):
-            kda = m.get("kda", "KDA não disponível")
-            result_emoji = "✅" if "victory" in m.get("result", "").lower() else "❌"
+        for idx, m in enumerate(data.last_matches, start=1):
+            result_emoji = "✅" if m.is_victory else "❌"
             text += (
                 f"**Partida {idx}:**\n"
-                f"👻 Campeão: `{m.get('champion','–')}`\n"
-                f"{result_emoji} {m.get('result','–')}: `🗓️ {m.get('date','–')} | 🕹️ {m.get('mode','–')}`\n"
-                f"⏱️ Duração: `{m.get('duration','–')}`\n"
-                f"💰 KDA: `{kda}`\n\n"
+                f"👻 Campeão: `{m.champion}`\n"
+                f"{result_emoji} {m.result}: `🗓️ {m.date} | 🕹️ {m.mode}`\n"
+                f"⏱️ Duração: `{m.duration}`\n"
+                f"💰 KDA: `{m.kda}`\n\n"
             )
 
-        embed.add_field(name="🎮 Nível", value=f"**{data.get('level','–')}**", inline=True)
+        embed.add_field(name="🎮 Nível", value=f"**{data.level}**", inline=True)
         embed.add_field(
             name="🏆 Rank",
-            value=f"**{data.get('rank','Unranked')}** ({data.get('lp','–')} PDL)",
+            value=f"**{data.rank}** ({data.lp} PDL)",
             inline=True
         )
-        embed.add_field(name="📊 Win Rate", value=f"{data.get('winrate','–')}", inline=True)
+        embed.add_field(name="📊 Win Rate", value=f"{data.winrate}", inline=True)
         embed.add_field(name="📅 Últimos jogos", value=text or "Sem dados de partidas.", inline=False)
 
         embed.set_footer(text=EMBED_FOOTER_TEXT, icon_url=EMBED_FOOTER_ICON)
@@ -138,6 +175,58 @@ class LinkCog(commands.Cog):
         # Como é um comando "sobre outra pessoa", eu manteria ephemeral pra evitar flood.
         await interaction.followup.send(embed=embed, ephemeral=True)
 
+    @app_commands.command(
+        name="historico",
+        description="📈 Sequência, saldo de PDL e campeões mais jogados da conta vinculada."
+    )
+    @app_commands.describe(discord_user="Usuário do Discord (padrão: você)")
+    async def historico(self, interaction: discord.Interaction, discord_user: discord.Member | None = None):
+        target = discord_user or interaction.user
+        linked = await self._linked(str(target.id))
+        if not linked:
+            await interaction.response.send_message(
+                f"❌ {target.mention} não vinculou uma conta ainda.",
+                ephemeral=True
+            )
+            return
+
+        # responde só com o histórico local: nenhum scrape aqui
+        account = f"{linked['region']}/{linked['nickname']}"
+        agg = await MATCH_HISTORY.aggregates(account) if MATCH_HISTORY.is_open else None
+        if not agg or not agg["games"]:
+            await interaction.response.send_message(
+                "❌ Ainda não tenho partidas gravadas dessa conta. Use `/user` ou `/perfil` para coletar.",
+                ephemeral=True
+            )
+            return
+
+        streak = agg["streak"]
+        if streak > 0:
+            streak_text = f"🔥 {streak} vitória(s) seguida(s)"
+        elif streak < 0:
+            streak_text = f"🧊 {-streak} derrota(s) seguida(s)"
+        else:
+            streak_text = "–"
+
+        top = sorted(agg["champions"].items(), key=lambda kv: kv[1], reverse=True)[:5]
+        champions = "\n".join(f"`{name}` — {count} jogo(s)" for name, count in top) or "Sem dados."
+
+        embed = discord.Embed(
+            title=f"📈 Histórico de {linked['nickname'].replace('-', '#')}",
+            description=f"{agg['games']} partidas registradas ({agg['wins']}V / {agg['losses']}D)",
+            color=discord.Color.teal()
+        )
+        embed.add_field(name="🎯 Sequência", value=streak_text, inline=True)
+        embed.add_field(
+            name=f"📊 PDL (últimas {len(agg['lp_window'])} ranqueadas)",
+            value=f"{agg['lp_delta']:+d} PDL",
+            inline=True
+        )
+        embed.add_field(name="👻 Campeões mais jogados", value=champions, inline=False)
+        embed.set_footer(text=EMBED_FOOTER_TEXT, icon_url=EMBED_FOOTER_ICON)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(LinkCog(bot))
\ No newline at end of file
@@ -1,36 +1,170 @@
+import asyncio
+import logging
+
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
+from services.models import PatchNote
 from services.patchnotes import get_latest_patch_note_with_skins_async
+from utils.cluster import CLUSTER
 from utils.constants import LOL_ICON
+from utils.ratelimit import AdaptiveTokenBucket, UpstreamUnavailable
+from utils.storage import SubscriptionStore
+
+log = logging.getLogger(__name__)
+
+# de quanto em quanto tempo procura nota nova
+POLL_MINUTES = 10
+# envios simultâneos no fan-out; o discord.py ainda respeita os buckets de cada rota
+FANOUT_CONCURRENCY = 8
+# margem abaixo do limite global do Discord (50 req/s por bot)
+FANOUT_RATE = 25.0
+
+
+def build_patch_embed(patch: PatchNote) -> discord.Embed:
+    embed = discord.Embed(
+        title=f"📢 {patch.title}",
+        description=f"{patch.description}\n\n🔗 [Leia a nota completa aqui]({patch.url})",
+        color=discord.Color.orange()
+    )
+    embed.set_thumbnail(url=LOL_ICON)
+    embed.set_footer(text="🔹 Patch oficial do League of Legends | Dpp.gg")
+
+    if patch.skin_img:
+        embed.add_field(name="🆕 Novas Skins / Atualização", value=patch.skin_text or "Info não disponível", inline=False)
+        embed.set_image(url=patch.skin_img)
+
+    return embed
+
 
 class PatchCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.subscriptions = SubscriptionStore()
+
+    async def cog_load(self) -> None:
+        await self.subscriptions.open()
+        # no cluster, só o primário faz o poll (o envio é via REST, alcança qualquer shard)
+        if CLUSTER.primary:
+            self.poll_patch_notes.start()
+
+    async def cog_unload(self) -> None:
+        self.poll_patch_notes.cancel()
+        await self.subscriptions.close()
 
     @app_commands.command(name="patch", description="🛠️ Veja as últimas notas de atualização do LoL")
     async def patch(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        patch = await get_latest_patch_note_with_skins_async()
+        try:
+            patch = await get_latest_patch_note_with_skins_async(http=self.bot.http_pool)
+        except UpstreamUnavailable:
+            patch = None
         if not patch:
             await interaction.followup.send("❌ Não consegui acessar as notas agora. Tente mais tarde.")
             return
 
-        embed = discord.Embed(
-            title=f"📢 {patch['title']}",
-            description=f"{patch['description']}\n\n🔗 [Leia a nota completa aqui]({patch['url']})",
-            color=discord.Color.orange()
+        await interaction.followup.send(embed=build_patch_embed(patch))
+
+    @app_commands.command(
+        name="patch_inscrever",
+        description="🔔 Recebe as novas notas de patch automaticamente neste canal"
+    )
+    @app_commands.describe(canal="Canal que vai receber as notas (padrão: o canal atual)")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(manage_guild=True)
+    async def patch_inscrever(self, interaction: discord.Interaction, canal: discord.TextChannel | None = None):
+        channel = canal or interaction.channel
+        if not isinstance(channel, discord.TextChannel):
+            await interaction.response.send_message("❌ Escolha um canal de texto.", ephemeral=True)
+            return
+
+        await self.subscriptions.subscribe(channel.id, interaction.guild_id)
+        await interaction.response.send_message(
+            f"✅ {channel.mention} vai receber as próximas notas de patch.",
+            ephemeral=True
         )
-        embed.set_thumbnail(url=LOL_ICON)
-        embed.set_footer(text="🔹 Patch oficial do League of Legends | Dpp.gg")
 
-        if patch.get("skin_img"):
-            embed.add_field(name="🆕 Novas Skins / Atualização", value=patch.get("skin_text") or "Info não disponível", inline=False)
-            embed.set_image(url=patch["skin_img"])
+    @app_commands.command(
+        name="patch_cancelar",
+        description="🔕 Para de enviar as notas de patch neste canal"
+    )
+    @app_commands.describe(canal="Canal inscrito (padrão: o canal atual)")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(manage_guild=True)
+    async def patch_cancelar(self, interaction: discord.Interaction, canal: discord.TextChannel | None = None):
+        channel = canal or interaction.channel
+        removed = await self.subscriptions.unsubscribe(channel.id)
+        if not removed:
+            await interaction.response.send_message("❌ Este canal não está inscrito.", ephemeral=True)
+            return
+
+        await interaction.response.send_message("✅ Inscrição cancelada.", ephemeral=True)
+
+    @tasks.loop(minutes=POLL_MINUTES)
+    async def poll_patch_notes(self):
+        # tasks.loop para de vez numa exceção não tratada: uma volta ruim não pode encerrar os anúncios
+        try:
+            await self._poll_once()
+        except Exception:
+            log.exception("poll das notas de patch falhou")
+
+    async def _poll_once(self) -> None:
+        try:
+            patch = await get_latest_patch_note_with_skins_async(http=self.bot.http_pool)
+        except UpstreamUnavailable:
+            return
+        if not patch:
+            return
+
+        last_url = await self.subscriptions.get_meta("last_patch_url")
+        if last_url == patch.url:
+            return
+
+        # grava antes de enviar: um restart no meio não manda a mesma nota duas vezes
+        await self.subscriptions.set_meta("last_patch_url", patch.url)
+        if last_url is None:
+            # primeira execução: só marca a nota atual, sem disparar para todo mundo
+            return
+
+        await self._fan_out(build_patch_embed(patch))
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        await self.subscriptions.unsubscribe_guild(guild.id)
+
+    @poll_patch_notes.before_loop
+    async def _before_poll(self):
+        await self.bot.wait_until_ready()
+
+    async def _fan_out(self, embed: discord.Embed) -> None:
+        channel_ids = await self.subscriptions.channels()
+        semaphore = asyncio.Semaphore(FANOUT_CONCURRENCY)
+        bucket = AdaptiveTokenBucket(FANOUT_RATE, int(FANOUT_RATE))
+
+        async def send(channel_id: int):
+            async with semaphore:
+                await bucket.acquire()
+                try:
+                    # PartialMessageable: envia direto pelo id, sem um fetch_channel por canal fora do cache
+                    await self.bot.get_partial_messageable(channel_id).send(embed=embed)
+                except (discord.Forbidden, discord.NotFound) as e:
+                    # canal apagado ou sem permissão: não adianta tentar de novo
+                    log.info("canal inscrito removido", extra={"channel_id": channel_id, "status": e.status})
+                    await self.subscriptions.unsubscribe(channel_id)
+                except discord.HTTPException as e:
+                    log.warning(
+                        "envio da nota de patch falhou",
+                        extra={"channel_id": channel_id, "status": e.status, "code": e.code},
+                    )
+
+        results = await asyncio.gather(*(send(cid) for cid in channel_ids), return_exceptions=True)
+        # um canal com erro inesperado não derruba o envio para os outros
+        for channel_id, result in zip(channel_ids, results):
+            if isinstance(result, Exception):
+                log.error("envio da nota de patch falhou", exc_info=result, extra={"channel_id": channel_id})
 
-        await interaction.followup.send(embed=embed)
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(PatchCog(bot))
\ No newline at end of file
+    await bot.add_cog(PatchCog(bot))
@@ -3,8 +3,9 @@ from discord import app_commands
 from discord.ext import commands
 from urllib.parse import quote
 
-from services.leagueofgraphs import get_league_of_graphs_profile_async
+from services.leagueofgraphs import get_cached_profile_async
 from utils.formatting import rank_color
+from utils.ratelimit import UpstreamUnavailable
 from utils.constants import EMBED_FOOTER_TEXT, EMBED_FOOTER_ICON
 
 
@@ -26,7 +27,14 @@ class ProfileCog(commands.Cog):
         region = (region or "").strip().lower()
         nickname_tag = (nickname_tag or "").strip().replace("#", "-")
 
-        data = await get_league_of_graphs_profile_async(nickname_tag, region)
+        try:
+            data = await get_cached_profile_async(nickname_tag, region, http=self.bot.http_pool)
+        except UpstreamUnavailable:
+            await interaction.followup.send(
+                "⏳ O League of Graphs está instável agora. Tente novamente em alguns instantes.",
+                ephemeral=True
+            )
+            return
 
         if not data:
             await interaction.followup.send(
@@ -35,49 +43,46 @@ class ProfileCog(commands.Cog):
             )
             return
 
-        color = rank_color(data.get("rank"))
-        url = f"https://www.leagueofgraphs.com/summoner/{region}/{quote(data['url_name'])}"
+        color = rank_color(data.rank)
+        url = f"https://www.leagueofgraphs.com/summoner/{region}/{quote(data.url_name)}"
 
         embed = discord.Embed(
-            title=f"👤 {data['name']}",
+            title=f"👤 {data.name}",
             url=url,
             color=color,
-            description=f"🔍 Estatísticas de **{data['name']}** no servidor."
+            description=f"🔍 Estatísticas de **{data.name}** no servidor."
         )
 
         # Thumbnail: foto do invocador (quando vier válida)
-        thumb = (data.get("profile_img") or "").strip()
+        thumb = (data.profile_img or "").strip()
         if thumb.startswith("http://") or thumb.startswith("https://"):
             embed.set_thumbnail(url=thumb)
 
         # Rank + ícone do rank no "author" (não briga com thumbnail)
-        rank_line = f"{data.get('rank','Unranked')} ({data.get('lp','–')} PDL)"
-        rank_icon = (data.get("rank_img") or "").strip()
+        rank_line = f"{data.rank} ({data.lp} PDL)"
+        rank_icon = (data.rank_img or "").strip()
         if rank_icon.startswith("http://") or rank_icon.startswith("https://"):
             embed.set_author(name=rank_line, icon_url=rank_icon)
         else:
             embed.add_field(name="🏆 Rank", value=f"**{rank_line}**", inline=True)
 
         # Últimas partidas
-        lm = data.get("last_matches", [])
         text = ""
-        for idx, m in enumerate(lm, start=1):
-            kda = m.get("kda", "KDA não disponível")
-            res = (m.get("result") or "").lower()
-            result_emoji = "✅" if "victory" in res else ("❌" if "defeat" in res else "➖")
+        for idx, m in enumerate(data.last_matches, start=1):
+            result_emoji = "✅" if m.is_victory else ("❌" if m.is_defeat else "➖")
 
             text += (
                 f"**Partida {idx}:**\n"
-                f"👻 Campeão: `{m.get('champion','–')}`\n"
-                f"{result_emoji} {m.get('result','–')}: `🗓️ {m.get('date','–')} | 🕹️ {m.get('mode','–')}`\n"
-                f"⏱️ Duração: `{m.get('duration','–')}`\n"
-                f"💰 KDA: `{kda}`\n\n"
+                f"👻 Campeão: `{m.champion}`\n"
+                f"{result_emoji} {m.result}: `🗓️ {m.date} | 🕹️ {m.mode}`\n"
+                f"⏱️ Duração: `{m.duration}`\n"
+                f"💰 KDA: `{m.kda}`\n\n"
             )
 
-        embed.add_field(name="🎮 Nível", value=f"**{data.get('level','–')}**", inline=True)
+        embed.add_field(name="🎮 Nível", value=f"**{data.level}**", inline=True)
 
         # Só adiciona Win Rate como campo se não estiver usando rank no campo (a gente já adiciona rank acima quando não tem icon)
-        embed.add_field(name="📊 Win Rate", value=f"{data.get('winrate','–')}", inline=True)
+        embed.add_field(name="📊 Win Rate", value=f"{data.winrate}", inline=True)
 
         embed.add_field(
             name="📅 Últimos 5 Jogos",
@@ -0,0 +1,168 @@
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from services.ranking import PRIORITY_ACTIVE, PRIORITY_BACKGROUND, ProfileRefresher, account_key
+from utils.cluster import CLUSTER
+from utils.constants import EMBED_FOOTER_TEXT, EMBED_FOOTER_ICON
+from utils.formatting import rank_score
+from utils.storage import RankingStore
+
+# de quanto em quanto tempo a varredura enfileira os snapshots vencidos
+SWEEP_MINUTES = 10
+# linhas mostradas no embed
+RANKING_SIZE = 15
+
+
+def _winrate_value(snap: dict) -> float:
+    total = (snap.get("wins") or 0) + (snap.get("losses") or 0)
+    return (snap.get("wins") or 0) / total if total else 0.0
+
+
+def _age_text(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return "agora há pouco"
+    if minutes < 60:
+        return f"há {minutes} min"
+    hours = minutes // 60
+    if hours < 48:
+        return f"há {hours} h"
+    return f"há {hours // 24} dias"
+
+
+class RankingCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.store = RankingStore()
+        self.refresher = ProfileRefresher(self.store, bot.http_pool)
+        # (guild, user) já gravados nesta execução: evita uma escrita por comando
+        self._seen: set[tuple[int, int]] = set()
+
+    async def cog_load(self) -> None:
+        await self.store.open()
+        self.refresher.start()
+        self.sweep.start()
+
+    async def cog_unload(self) -> None:
+        self.sweep.cancel()
+        await self.refresher.stop()
+        await self.store.close()
+
+    def _links(self) -> dict:
+        link_cog = self.bot.get_cog("LinkCog")
+        return link_cog.user_history if link_cog else {}
+
+    async def _guild_accounts(self, guild_id: int) -> list[tuple[str, str, str]]:
+        """(user_id, region, nickname) dos membros vinculados que já usaram o bot no servidor."""
+        links = self._links()
+        out = []
+        for _, user_id in await self.store.members(guild_id):
+            linked = links.get(user_id)
+            if linked:
+                out.append((user_id, linked["region"], linked["nickname"]))
+        return out
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        # sem o intent de membros, é assim que o bot descobre quem está em cada servidor
+        if interaction.guild_id is not None:
+            await self._remember(interaction.guild_id, interaction.user.id)
+
+    async def _remember(self, guild_id: int, user_id: int) -> None:
+        seen = (guild_id, user_id)
+        if seen in self._seen:
+            return
+        self._seen.add(seen)
+        await self.store.add_member(guild_id, user_id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self._seen = {s for s in self._seen if s[0] != guild.id}
+        await self.store.remove_guild(guild.id)
+
+    @tasks.loop(minutes=SWEEP_MINUTES)
+    async def sweep(self):
+        links = self._links()
+        by_guild: dict[int, list[tuple[str, str]]] = {}
+        for guild_id, user_id in await self.store.members():
+            # no cluster, cada processo varre só os servidores dos seus shards
+            if CLUSTER.enabled and self.bot.get_guild(guild_id) is None:
+                continue
+            linked = links.get(user_id)
+            if linked:
+                by_guild.setdefault(guild_id, []).append((linked["region"], linked["nickname"]))
+
+        accounts = {account_key(r, n) for accs in by_guild.values() for r, n in accs}
+        snapshots = await self.store.snapshots(sorted(accounts))
+        for guild_id, accs in by_guild.items():
+            priority = PRIORITY_ACTIVE if self.refresher.is_active(guild_id) else PRIORITY_BACKGROUND
+            self.refresher.enqueue_stale(accs, snapshots, priority)
+
+    @sweep.before_loop
+    async def _before_sweep(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(name="ranking", description="🏅 Ranking dos membros vinculados deste servidor")
+    @app_commands.guild_only()
+    async def ranking(self, interaction: discord.Interaction):
+        # responde só com o snapshot salvo: nunca espera scrape ao vivo
+        self.refresher.touch(interaction.guild_id)
+        await self._remember(interaction.guild_id, interaction.user.id)
+        accounts = await self._guild_accounts(interaction.guild_id)
+        if not accounts:
+            await interaction.response.send_message(
+                "❌ Ninguém deste servidor vinculou uma conta ainda. Use `/vincular`.",
+                ephemeral=True
+            )
+            return
+
+        snapshots = await self.store.snapshots([account_key(r, n) for _, r, n in accounts])
+        self.refresher.enqueue_stale([(r, n) for _, r, n in accounts], snapshots, PRIORITY_ACTIVE)
+        # contas deste servidor esperando scrape (as que já estavam na fila também)
+        queued = len({(r, n) for _, r, n in accounts if self.refresher.is_queued(r, n)})
+
+        now = time.time()
+        rows = []
+        oldest = None
+        for user_id, region, nickname in accounts:
+            snap = snapshots.get(account_key(region, nickname))
+            if snap is None or snap[0] is None:
+                continue
+            data, refreshed_at = snap
+            oldest = refreshed_at if oldest is None else min(oldest, refreshed_at)
+            rows.append((rank_score(data.get("rank"), data.get("lp")), _winrate_value(data), user_id, data))
+
+        rows.sort(key=lambda r: (r[0], r[1]), reverse=True)
+
+        lines = []
+        for pos, (_, _, user_id, data) in enumerate(rows[:RANKING_SIZE], start=1):
+            lp = f" ({data.get('lp')} PDL)" if data.get("lp") not in (None, "–") else ""
+            lines.append(
+                f"**{pos}.** <@{user_id}> — `{data.get('name')}` · "
+                f"**{data.get('rank') or 'Unranked'}**{lp} · {data.get('winrate') or '–'}"
+            )
+
+        if lines:
+            description = "\n".join(lines)
+        else:
+            description = "⏳ Buscando os perfis pela primeira vez. Tente de novo em alguns instantes."
+
+        embed = discord.Embed(
+            title=f"🏅 Ranking de {interaction.guild.name if interaction.guild else 'servidor'}",
+            description=description,
+            color=discord.Color.gold()
+        )
+        if oldest is not None:
+            embed.add_field(name="🕒 Dados", value=f"Atualizados {_age_text(now - oldest)}", inline=True)
+        if queued:
+            embed.add_field(name="🔄 Atualizando", value=f"{queued} perfil(is) na fila", inline=True)
+
+        embed.set_footer(text=EMBED_FOOTER_TEXT, icon_url=EMBED_FOOTER_ICON)
+        await interaction.response.send_message(embed=embed)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(RankingCog(bot))
@@ -0,0 +1,96 @@
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from services.liquipedia import TEAM_INDEX, get_cached_team_info_async, load_team_index, refresh_team_index
+from utils.cluster import CLUSTER
+from utils.constants import FOOTER_TEXT
+from utils.ratelimit import UpstreamUnavailable
+
+# o índice de times muda pouco (times novos/renomeados)
+INDEX_REFRESH_HOURS = 12
+
+
+class TeamCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_load(self) -> None:
+        # índice salvo em disco deixa o autocomplete pronto antes da primeira varredura
+        await load_team_index()
+        # no cluster, só o primário varre a Liquipedia; os outros releem o índice do disco
+        if CLUSTER.primary:
+            self.refresh_index.start()
+        else:
+            self.reload_index.start()
+
+    async def cog_unload(self) -> None:
+        self.refresh_index.cancel()
+        self.reload_index.cancel()
+
+    @tasks.loop(hours=INDEX_REFRESH_HOURS)
+    async def refresh_index(self):
+        try:
+            await refresh_team_index(http=self.bot.http_pool)
+        except UpstreamUnavailable:
+            pass
+
+    @tasks.loop(hours=1)
+    async def reload_index(self):
+        await load_team_index()
+
+    @refresh_index.before_loop
+    async def _before_refresh(self):
+        await self.bot.wait_until_ready()
+
+    async def _team_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=t[:100], value=t[:100]) for t in TEAM_INDEX.search(current)]
+
+    @app_commands.command(name="time", description="🏟️ Info de time profissional (Liquipedia)")
+    @app_commands.describe(nome="Nome do time (ex: T1, paiN Gaming)")
+    @app_commands.autocomplete(nome=_team_autocomplete)
+    async def time(self, interaction: discord.Interaction, nome: str):
+        await interaction.response.defer()
+
+        try:
+            team = await get_cached_team_info_async(nome, http=self.bot.http_pool)
+        except UpstreamUnavailable:
+            await interaction.followup.send(
+                "⏳ A Liquipedia está instável agora. Tente novamente em alguns instantes.",
+                ephemeral=True
+            )
+            return
+
+        if not team:
+            await interaction.followup.send(f"❌ Não encontrei o time `{nome}` na Liquipedia.", ephemeral=True)
+            return
+
+        description = team.description or ""
+        if len(description) > 400:
+            description = description[:397] + "..."
+
+        embed = discord.Embed(
+            title=f"🏟️ {team.name}",
+            url=team.url,
+            description=description,
+            color=discord.Color.blue()
+        )
+        if team.logo_url:
+            embed.set_thumbnail(url=team.logo_url)
+
+        embed.add_field(name="🌎 País", value=team.country, inline=True)
+
+        lines = []
+        for p in team.players:
+            lines.append(f"**{p.tag}** — {p.real_name} · {p.role} ({p.nationality})")
+        roster = "\n".join(lines) or "Elenco não encontrado."
+        if len(roster) > 1024:
+            roster = roster[:1021] + "..."
+        embed.add_field(name="👥 Elenco", value=roster, inline=False)
+
+        embed.set_footer(text=FOOTER_TEXT)
+        await interaction.followup.send(embed=embed)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(TeamCog(bot))
@@ -1,10 +1,81 @@
-import aiohttp
-from bs4 import BeautifulSoup
+from typing import TYPE_CHECKING
 from urllib.parse import quote
 import re
 import asyncio
+import logging
+import sqlite3
+
+from utils.cache import AsyncTTLCache, NegativeCache
+from utils.diskcache import DISK_CACHE
+from utils.extract import Extractor, Field, Group, Select
+from utils.html import (
+    HiddenRanges, StreamScanner, attr_equals, class_contains, element_spans, join_spans, make_soup, open_tag,
+    visible_text,
+)
+from utils.http import BodyTooLarge, HttpPool, ServiceProfile, borrow_pool, read_text
+from services.models import Match, Profile, decode, encode
+from utils.logging_segup import METRICS, UPSTREAM_RETRIES
+from utils.ratelimit import UpstreamUnavailable
+from utils.singleflight import SingleFlight
+from utils.storage import MATCH_HISTORY
+from utils.workers import run_parser
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+log = logging.getLogger(__name__)
+
+PROFILE = ServiceProfile(
+    name="leagueofgraphs",
+    headers={
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    },
+    timeout=20,
+    rate=2.0,
+    burst=5,
+)
+
+# perfis raspados: 2 min frescos + 10 min servidos enquanto atualizam em background
+PROFILE_CACHE = AsyncTTLCache(
+    ttl=120,
+    stale_ttl=600,
+    max_entries=5000,
+    max_bytes=64 * 1024 * 1024,
+    fallback_on=(UpstreamUnavailable,),
+    # guardado já codificado (bytes): cabe muito mais perfil nos mesmos 64 MB
+    encode=encode,
+    decode=decode,
+)
+
+# perfis inexistentes (typo, tag errada) e falhas recentes do site, por "região/slug"
+PROFILE_MISSES = NegativeCache(not_found_ttl=10 * 60, error_ttl=30)
+
+# buscas idênticas simultâneas compartilham um único scrape
+_INFLIGHT = SingleFlight()
+
+METRICS.watch_stats("dppgg_cache", {"cache": "profile"}, PROFILE_CACHE.stats)
+METRICS.watch_stats("dppgg_negative_cache", {"cache": "profile"}, PROFILE_MISSES.stats)
+
+HOST = "www.leagueofgraphs.com"
+
+
+class _FetchFailed(Exception):
+    """O site respondeu erro (ou nada) em todas as tentativas: não é "perfil inexistente"."""
+
+# regiões da página que os extratores leem; só elas viram árvore
+_SCOPES = (
+    open_tag("meta", attr_equals("property", "og:image")),
+    open_tag("img", r"""\bsrc\s*=\s*["'][^"']*?summonerIcons"""),
+    open_tag("div", class_contains("mainRankingDescriptionText")),
+    open_tag("table", class_contains(r"\brecentGamesTable\b")),
+)
+
+# o download para quando tudo isso já chegou (o resto da página não é lido)
+_RANK_BOX, _RECENT_GAMES = _SCOPES[2], _SCOPES[3]
+_ICONS = _SCOPES[:2]
 
-TIERS = r"(Iron|Bronze|Silver|Gold|Platinum|Emerald|Diamond|Master|Grandmaster|Challenger)"
 
 def _display_name_from_slug(slug: str) -> str:
     if "-" in slug:
@@ -12,32 +83,6 @@ def _display_name_from_slug(slug: str) -> str:
         return f"{name}#{tag}"
     return slug
 
-def _extract_profile_img(soup: BeautifulSoup) -> str | None:
-    # prioridade 1: ícone do invocador no banner (src contém "summonerIcons")
-    img = soup.find("img", src=re.compile(r"summonerIcons", re.I))
-    if img and img.get("src"):
-        src = img["src"].strip()
-        if src.startswith("//"):
-            return "https:" + src
-        if src.startswith("/"):
-            return "https://www.leagueofgraphs.com" + src
-        if src.startswith("http://") or src.startswith("https://"):
-            return src
-        return None
-
-    # prioridade 2: og:image (fallback)
-    og = soup.find("meta", property="og:image")
-    if og and og.get("content"):
-        c = og["content"].strip()
-        if c.startswith("//"):
-            return "https:" + c
-        if c.startswith("/"):
-            return "https://www.leagueofgraphs.com" + c
-        if c.startswith("http://") or c.startswith("https://"):
-            return c
-
-    return None
-
 def _abs_url(u: str | None) -> str | None:
     if not u:
         return None
@@ -51,48 +96,33 @@ def _abs_url(u: str | None) -> str | None:
     return None
 
 
-def _extract_rank_info(soup: BeautifulSoup) -> tuple[str, str, str | None]:
-    """
-    Retorna (rank_text, lp_text, rank_icon_url)
-    Ex: ("Silver IV", "55", "https://lolg-cdn....png")
-    """
-    rank = "Unranked"
-    lp = "–"
-    rank_img = None
-
-    box = soup.find("div", class_=re.compile(r"mainRankingDescriptionText", re.I))
-    if not box:
-        return rank, lp, rank_img
-
-    # rank text
-    tier_div = box.find("div", class_=re.compile(r"leagueTier", re.I))
-    if tier_div:
-        rank = tier_div.get_text(" ", strip=True) or rank
-
-    # lp text (às vezes vem "55 LP" ou só "55")
-    lp_div = box.find("div", class_=re.compile(r"league-points", re.I))
-    if lp_div:
-        lp_text = lp_div.get_text(" ", strip=True)
-        m = re.search(r"(\d+)", lp_text or "")
-        if m:
-            lp = m.group(1)
+_LEVEL_RE = re.compile(r"\bLevel\s+(\d+)\b")
+_WINS_RE = re.compile(r"\bWins:\s*(\d+)\s+Losses:\s*(\d+)\b")
+_DIGITS_RE = re.compile(r"(\d+)")
+_DURATION_RE = re.compile(r"\b(\d+)\s*min\b(?:\s*(\d+)\s*s\b)?")
+_DATE_RE = re.compile(r"\b(\d+)\s+(day|days|hour|hours|minute|minutes)\s+ago\b", re.I)
+_LP_RE = re.compile(r"([+-]\d+)\s*LP\b")
+_KDA_RE = re.compile(r"(\d+)\s*/\s*(\d+)\s*/\s*(\d+)")
+_MATCH_ID_RE = re.compile(r"/match/([^?#]+)")
+
+# modos em ordem de prioridade: com "Ranked Flex" no texto, vale "Flex"
+_MODES = ("Soloqueue", "Flex", "ARAM", "Normal", "Ranked", "Clash")
+_MODE_RE = re.compile(r"\b(" + "|".join(map(re.escape, _MODES)) + r")\b", re.I)
+_MODE_PRIORITY = {m.lower(): i for i, m in enumerate(_MODES)}
 
-    # rank image icon
-    img = box.find("img")
-    if img and img.get("src"):
-        rank_img = _abs_url(img["src"])
+# linhas da tabela de partidas lidas por padrão (o embed mostra 5)
+MAX_MATCHES = 5
 
-    return rank, lp, rank_img
 
 def _extract_level(text: str) -> str:
-    m = re.search(r"\bLevel\s+(\d+)\b", text)
+    m = _LEVEL_RE.search(text)
     return m.group(1) if m else "Nível não encontrado"
 
 def _extract_winrate(text: str) -> tuple[int, int, str]:
     wins = losses = 0
     winrate = "Unranked"
 
-    m = re.search(r"\bWins:\s*(\d+)\s+Losses:\s*(\d+)\b", text)
+    m = _WINS_RE.search(text)
     if m:
         wins = int(m.group(1))
         losses = int(m.group(2))
@@ -101,161 +131,334 @@ def _extract_winrate(text: str) -> tuple[int, int, str]:
 
     return wins, losses, winrate
 
-def _extract_last_matches(soup: BeautifulSoup) -> list[dict]:
-    """
-    Extrai os últimos jogos da tabela:
-    table.recentGamesTable
-    """
-    last_matches: list[dict] = []
-
-    table = soup.find("table", class_=re.compile(r"\brecentGamesTable\b", re.I))
-    if not table:
-        return []
-
-    tbody = table.find("tbody")
-    if not tbody:
-        return []
-
-    # pega só linhas que tenham td (ignora headers/filters)
-    rows = [tr for tr in tbody.find_all("tr") if tr.find("td")]
-
-    for row in rows[:5]:
-        # campeão
-        champ = "–"
-        champ_td = row.find("td", class_=re.compile(r"\bchampionCell", re.I))
-        if champ_td:
-            img = champ_td.find("img", alt=True)
-            if img and img.get("alt"):
-                champ = img["alt"].strip()
-            else:
-                champ = champ_td.get_text(" ", strip=True) or champ
-
-        # resultado + modo + data + duração + LP (tudo costuma estar dentro do resultCell)
-        result = "Unknown"
-        date = "–"
-        mode = "–"
-        duration = "–"
-        lp_delta = ""
-
-        result_td = row.find("td", class_=re.compile(r"\bresultCell", re.I))
-        if result_td:
-            txt = result_td.get_text(" ", strip=True)
-
-            low = txt.lower()
-            if "victory" in low or "vitória" in low:
-                result = "Victory"
-            elif "defeat" in low or "derrota" in low:
-                result = "Defeat"
-            elif "remake" in low:
-                result = "Remake"
-
-            # tenta extrair duração "34min 35s" ou "17min 10s"
-            m_dur = re.search(r"\b(\d+)\s*min\b(?:\s*(\d+)\s*s\b)?", txt)
-            if m_dur:
-                # reconstrói
-                mins = m_dur.group(1)
-                secs = m_dur.group(2)
-                duration = f"{mins}min" + (f" {secs}s" if secs else "")
-
-            # "38 days ago" / "2 hours ago"
-            m_date = re.search(r"\b(\d+)\s+(day|days|hour|hours|minute|minutes)\s+ago\b", txt, flags=re.I)
-            if m_date:
-                date = f"{m_date.group(1)} {m_date.group(2)} ago"
-
-            # modo (Soloqueue, Flex, ARAM etc). Se achar “Soloqueue” usa isso.
-            for candidate in ["Soloqueue", "Flex", "ARAM", "Normal", "Ranked", "Clash"]:
-                if re.search(rf"\b{re.escape(candidate)}\b", txt, flags=re.I):
-                    mode = candidate
-                    break
-
-            # delta LP tipo "+23 LP" ou "-17 LP"
-            m_lp = re.search(r"([+-]\d+)\s*LP\b", txt)
-            if m_lp:
-                lp_delta = m_lp.group(1) + " LP"
-
-        # KDA (coluna específica)
-        kda = "KDA não disponível"
-        kda_td = row.find("td", class_=re.compile(r"\bkdaColumn\b", re.I))
-        if kda_td:
-            # geralmente vem "3/6/8"
-            kda_txt = kda_td.get_text(" ", strip=True)
-            mkda = re.search(r"(\d+)\s*/\s*(\d+)\s*/\s*(\d+)", kda_txt)
-            if mkda:
-                kda = f"{mkda.group(1)}/{mkda.group(2)}/{mkda.group(3)}"
-            else:
-                # fallback
-                if kda_txt:
-                    kda = kda_txt
-
-        last_matches.append({
-            "champion": champ,
-            "result": result,
-            "date": date,
-            "mode": mode,
-            "duration": (duration + (f" | {lp_delta}" if lp_delta else "")).strip(),
-            "kda": kda,
-        })
-
-    return last_matches
-
-async def get_league_of_graphs_profile_async(summoner_slug: str, region: str = "br"):
+
+def _lp_points(text: str) -> str | None:
+    # às vezes vem "55 LP" ou só "55"
+    m = _DIGITS_RE.search(text)
+    return m.group(1) if m else None
+
+
+def _champion(cell) -> str | None:
+    img = cell.find("img", alt=True)
+    if img and img.get("alt"):
+        return img["alt"].strip()
+    return cell.get_text(" ", strip=True)
+
+
+def _kda(cell) -> str:
+    # geralmente vem "3/6/8"
+    txt = cell.get_text(" ", strip=True)
+    m = _KDA_RE.search(txt)
+    return f"{m.group(1)}/{m.group(2)}/{m.group(3)}" if m else txt
+
+
+def _match_id(link) -> str | None:
+    # link da partida (ex: /match/br/2839123456): identifica o jogo entre scrapes
+    m = _MATCH_ID_RE.search(link["href"])
+    return m.group(1).strip("/") if m else None
+
+
+def _build_match(row: dict) -> Match:
+    # resultado, data, modo, duração e PDL vêm todos no texto do resultCell
+    txt = row["result_text"]
+    result, date, mode, duration, lp_delta, lp_change = "Unknown", "–", "–", "–", "", None
+
+    if txt:
+        low = txt.lower()
+        if "victory" in low or "vitória" in low:
+            result = "Victory"
+        elif "defeat" in low or "derrota" in low:
+            result = "Defeat"
+        elif "remake" in low:
+            result = "Remake"
+
+        m = _DURATION_RE.search(txt)
+        if m:
+            duration = f"{m.group(1)}min" + (f" {m.group(2)}s" if m.group(2) else "")
+
+        m = _DATE_RE.search(txt)
+        if m:
+            date = f"{m.group(1)} {m.group(2)} ago"
+
+        modes = [_MODE_PRIORITY[m.group(1).lower()] for m in _MODE_RE.finditer(txt)]
+        if modes:
+            mode = _MODES[min(modes)]
+
+        m = _LP_RE.search(txt)
+        if m:
+            lp_delta = m.group(1) + " LP"
+            lp_change = int(m.group(1))
+
+    return Match(
+        champion=row["champion"],
+        result=result,
+        date=date,
+        mode=mode,
+        duration=(duration + (f" | {lp_delta}" if lp_delta else "")).strip(),
+        kda=row["kda"],
+        match_id=row["match_id"],
+        lp_change=lp_change,
+    )
+
+
+# tudo que a árvore (já recortada por _SCOPES) fornece ao perfil, numa passada só
+PROFILE_SPEC = Group(
+    "profile",
+    fields=(
+        # ícone do invocador no banner; og:image só se ele não existir
+        Field(
+            "profile_img",
+            (Select("img", attrs={"src": "summonerIcons"}), Select("meta", attrs={"property": "^og:image$"})),
+            get=lambda el: _abs_url(el.get("src") if el.name == "img" else el.get("content")),
+        ),
+    ),
+    groups=(
+        Group(
+            "rank",
+            Select("div", cls="mainRankingDescriptionText"),
+            fields=(
+                Field("rank", Select("div", cls="leagueTier"), default="Unranked"),
+                Field("lp", Select("div", cls="league-points"), get=lambda el: _lp_points(el.get_text(" ", strip=True)), default="–"),
+                Field("rank_img", Select("img"), get=lambda el: _abs_url(el.get("src"))),
+            ),
+            limit=1,
+        ),
+        Group(
+            "games",
+            Select("table", cls=r"\brecentGamesTable\b"),
+            groups=(
+                Group(
+                    "body",
+                    Select("tbody"),
+                    groups=(
+                        Group(
+                            "matches",
+                            Select("tr"),
+                            fields=(
+                                Field("champion", Select("td", cls=r"\bchampionCell"), get=_champion, default="–"),
+                                Field("result_text", Select("td", cls=r"\bresultCell")),
+                                Field("kda", Select("td", cls=r"\bkdaColumn\b"), get=_kda, default="KDA não disponível"),
+                                Field("match_id", Select("a", attrs={"href": "/match/"}), get=_match_id),
+                                # linhas sem td são cabeçalho/filtro
+                                Field("cell", Select("td"), get=lambda el: True),
+                            ),
+                            limit=MAX_MATCHES,
+                            require=("cell",),
+                            build=_build_match,
+                        ),
+                    ),
+                    limit=1,
+                    build=lambda rec: rec["matches"],
+                ),
+            ),
+            limit=1,
+            build=lambda rec: rec["body"][0] if rec["body"] else [],
+        ),
+    ),
+)
+PROFILE_EXTRACTOR = Extractor(PROFILE_SPEC)
+
+_UNRANKED = {"rank": "Unranked", "lp": "–", "rank_img": None}
+
+
+def _extract_profile(soup: "BeautifulSoup", *, max_matches: int = MAX_MATCHES) -> dict:
+    """{"profile_img", "rank", "lp", "rank_img", "last_matches"} numa única passada pela árvore."""
+    rec = PROFILE_EXTRACTOR.extract(soup, limits={"matches": max_matches})
+    rank = rec["rank"][0] if rec["rank"] else _UNRANKED
+    return {
+        "profile_img": rec["profile_img"],
+        "rank": rank["rank"],
+        "lp": rank["lp"],
+        "rank_img": rank["rank_img"],
+        "last_matches": rec["games"][0] if rec["games"] else [],
+    }
+
+
+async def get_league_of_graphs_profile_async(
+    summoner_slug: str,
+    region: str = "br",
+    *,
+    http: HttpPool | None = None,
+):
     region = (region or "br").strip().lower()
     summoner_slug = (summoner_slug or "").strip()
 
+    return await _INFLIGHT.do(
+        (region, summoner_slug),
+        lambda: _fetch_profile(summoner_slug, region, http),
+    )
+
+
+async def _fetch_profile(summoner_slug: str, region: str, http: HttpPool | None):
+    # cache em disco: compartilhado entre processos e sobrevive a restart
+    disk_key = f"{region}/{summoner_slug}"
+    cached = await DISK_CACHE.get("profile", disk_key, max_age=PROFILE_CACHE.ttl)
+    if cached is not None:
+        return Profile.from_dict(cached)
+
+    miss = PROFILE_MISSES.get(disk_key)
+    if miss is not None:
+        kind, remaining = miss
+        if kind == NegativeCache.NOT_FOUND:
+            return None
+        # falhou há pouco: não refaz as retentativas, serve o que houver em disco
+        return await _stale_or_raise(disk_key, UpstreamUnavailable(HOST, remaining))
+
     summoner_encoded = quote(summoner_slug, safe="")
-    url = f"https://www.leagueofgraphs.com/summoner/{region}/{summoner_encoded}"
+    url = f"https://{HOST}/summoner/{region}/{summoner_encoded}"
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Connection": "keep-alive",
-    }
+    async with borrow_pool(http) as pool:
+        try:
+            html = await _fetch_html(pool, url)
+        except _FetchFailed:
+            PROFILE_MISSES.remember(disk_key, NegativeCache.ERROR)
+            return await _stale_or_raise(
+                disk_key, UpstreamUnavailable(HOST, PROFILE_MISSES.ttls[NegativeCache.ERROR])
+            )
+        except UpstreamUnavailable as e:
+            return await _stale_or_raise(disk_key, e)
+
+    profile = None
+    if html is not None:
+        profile = await run_parser(parse_profile_html, html, summoner_slug, region)
+    if profile is None:
+        PROFILE_MISSES.remember(disk_key, NegativeCache.NOT_FOUND)
+        return None
 
+    await DISK_CACHE.set("profile", disk_key, profile.to_dict())
+    await _record_matches(disk_key, profile)
+    return profile
+
+
+async def _stale_or_raise(disk_key: str, error: UpstreamUnavailable):
+    stale = await DISK_CACHE.get("profile", disk_key)
+    if stale is None:
+        raise error
+    return Profile.from_dict(stale)
+
+
+async def _record_matches(account: str, profile: Profile) -> None:
+    # só scrape novo chega aqui; o store guarda apenas as partidas que ainda não viu
+    if not MATCH_HISTORY.is_open:
+        return
+    try:
+        await MATCH_HISTORY.record(account, profile.last_matches)
+    except sqlite3.Error:
+        log.warning("falha ao gravar histórico de partidas", exc_info=True, extra={"account": account})
+
+
+def _scoped_profile_html(html: str) -> str:
+    spans = []
+    hidden = HiddenRanges.of(html)
+    for pattern in _SCOPES:
+        spans += element_spans(html, pattern, limit=1, hidden=hidden)
+    return join_spans(html, spans)
+
+
+class _ProfileCutoff:
+    """
+    Predicado de read_text(): a página está "completa" quando o quadro de rank
+    e a tabela de partidas já fecharam, o ícone já apareceu e o texto já tem
+    nível e vitórias/derrotas. Se o texto não estiver lá quando a estrutura
+    fechar, desiste e deixa a página ser lida até o fim.
+    """
+
+    def __init__(self):
+        self._gave_up = False
+        self._scan = StreamScanner(text_patterns=(_LEVEL_RE, _WINS_RE))
+        self._scan.watch("rank", _RANK_BOX)
+        self._scan.watch("games", _RECENT_GAMES)
+        for i, pattern in enumerate(_ICONS):
+            self._scan.watch(f"icon{i}", pattern)
+
+    def __call__(self, piece: str) -> bool:
+        if self._gave_up:
+            return False
+        scan = self._scan
+        scan.feed(piece)
+        if not (scan.done("rank") and scan.done("games")):
+            return False
+        if not any(scan.done(f"icon{i}") for i in range(len(_ICONS))):
+            return False
+
+        if scan.matched(_LEVEL_RE) and scan.matched(_WINS_RE):
+            return True
+        self._gave_up = True
+        return False
+
+
+def parse_profile_html(
+    html: str, summoner_slug: str, region: str, *, max_matches: int = MAX_MATCHES
+) -> Profile | None:
+    # level/wins saem do texto da página inteira, mas sem montar a árvore dela
+    text = visible_text(html)
+
+    # valida se é uma página real de summoner
+    if "Personal Ratings" not in text and "Wins:" not in text:
+        return None
+
+    soup = make_soup(_scoped_profile_html(html))
+    display_name = _display_name_from_slug(summoner_slug)
+
+    level = _extract_level(text)
+    wins, losses, winrate = _extract_winrate(text)
+    info = _extract_profile(soup, max_matches=max_matches)
+
+    return Profile(
+        name=display_name,
+        url_name=summoner_slug,
+        region=region,
+        level=level,
+        rank=info["rank"],
+        lp=info["lp"],
+        wins=wins,
+        losses=losses,
+        winrate=winrate,
+        profile_img=info["profile_img"],
+        rank_img=info["rank_img"],
+        last_matches=tuple(info["last_matches"]),
+    )
+
+
+async def get_cached_profile_async(
+    summoner_slug: str,
+    region: str = "br",
+    *,
+    http: HttpPool | None = None,
+):
+    key = ((region or "br").strip().lower(), (summoner_slug or "").strip())
+    return await PROFILE_CACHE.get_or_load(
+        key,
+        lambda: get_league_of_graphs_profile_async(summoner_slug, region, http=http),
+    )
+
+
+async def _fetch_html(pool: HttpPool, url: str, *, full: bool = False) -> str | None:
+    """
+    HTML da página, None se o perfil não existe; _FetchFailed para qualquer outro erro.
+    Sem `full`, a leitura para assim que o perfil já está completo (_ProfileCutoff).
+    """
     for attempt in range(3):
         try:
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 429:
-                        await asyncio.sleep(1.5 * (attempt + 1))
-                        continue
-                    if response.status != 200:
-                        return None
-                    html = await response.text()
-        except Exception:
+            async with pool.get(PROFILE, url) as response:
+                if response.status == 429:
+                    # o limiter do host já registrou o Retry-After; a próxima tentativa espera por ele
+                    UPSTREAM_RETRIES.inc(service="leagueofgraphs", reason="429")
+                    continue
+                if response.status in (404, 410):
+                    return None
+                if response.status != 200:
+                    raise _FetchFailed(f"HTTP {response.status}")
+                return await read_text(response, until=None if full else _ProfileCutoff())
+        except (UpstreamUnavailable, _FetchFailed):
+            raise
+        except BodyTooLarge as e:
+            # repetir não muda o tamanho da página
+            raise _FetchFailed(str(e)) from e
+        except Exception as e:
+            UPSTREAM_RETRIES.inc(service="leagueofgraphs", reason=type(e).__name__)
+            log.warning("falha ao buscar perfil", extra={"url": url, "attempt": attempt + 1, "error": repr(e)})
             await asyncio.sleep(1.0 * (attempt + 1))
             continue
 
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text("\n", strip=True)
-
-        # valida se é uma página real de summoner
-        if "Personal Ratings" not in text and "Wins:" not in text:
-            return None
-
-        display_name = _display_name_from_slug(summoner_slug)
-
-        level = _extract_level(text)
-        rank, lp, rank_img = _extract_rank_info(soup)
-        wins, losses, winrate = _extract_winrate(text)
-
-        profile_img = _extract_profile_img(soup)
-        last_matches = _extract_last_matches(soup)
-
-        return {
-            "name": display_name,
-            "url_name": summoner_slug,
-            "region": region,
-            "level": level,
-            "rank": rank,
-            "lp": lp,
-            "wins": wins,
-            "losses": losses,
-            "winrate": winrate,
-            "profile_img": profile_img,
-            "rank_img": rank_img,
-            "last_matches": last_matches,
-        }
-
-    return None
\ No newline at end of file
+    raise _FetchFailed(f"sem resposta após 3 tentativas: {url}")
@@ -1,8 +1,23 @@
-import aiohttp
 import asyncio
+import bisect
+import difflib
+import logging
 import re
-from bs4 import BeautifulSoup
-from urllib.parse import quote
+import time
+from dataclasses import replace
+from urllib.parse import quote, urlsplit
+
+from services.models import Player, Team, decode, encode
+from utils.cache import AsyncTTLCache, NegativeCache
+from utils.diskcache import DISK_CACHE
+from utils.html import HiddenRanges, class_contains, element_spans, join_spans, make_soup, open_tag
+from utils.http import HttpPool, ServiceProfile, borrow_pool
+from utils.logging_segup import METRICS, UPSTREAM_RETRIES
+from utils.ratelimit import UpstreamUnavailable
+from utils.singleflight import SingleFlight
+from utils.workers import run_parser
+
+log = logging.getLogger(__name__)
 
 BASE = "https://liquipedia.net"
 LOL_BASE = f"{BASE}/leagueoflegends"
@@ -12,9 +27,60 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) dppgg-bot/1.0",
     "Accept-Language": "en-US,en;q=0.9,pt-BR;q=0.8,pt;q=0.7",
     "Accept": "application/json,text/html,*/*;q=0.8",
-    "Connection": "keep-alive",
 }
 
+# a Liquipedia pede no máximo ~1 requisição a cada 2s por cliente
+PROFILE = ServiceProfile(name="liquipedia", headers=HEADERS, timeout=25, rate=0.5, burst=2)
+# action=parse tem limite próprio, bem abaixo do geral. Um time frio custa até
+# quatro (prop=sections, seção 0, visão geral e elenco; as seções ficam em cache
+# por revisão): a rajada cobre dois times frios seguidos e, depois dela, um
+# parse a cada 8s. A espera maior cabe no defer do comando: quem passa da
+# rajada espera a vez em vez de ouvir "tente mais tarde".
+PARSE_PROFILE = replace(PROFILE, action="parse", action_rate=1 / 8, action_burst=8, action_max_wait=30.0)
+
+# idade máxima de um time no cache em disco antes de buscar de novo
+TEAM_MAX_AGE = 6 * 60 * 60
+
+# seções lidas por _parse_team_info além da 0 (infobox): o primeiro parágrafo e o elenco
+OVERVIEW_SECTION_RE = re.compile(r"^overview$", re.I)
+ROSTER_SECTION_RE = re.compile(r"^(player roster|roster|active|current roster)$", re.I)
+
+# erros do action=parse que querem dizer "não existe" (o resto é falha do upstream)
+MISSING_PAGE_CODES = frozenset({"missingtitle", "nosuchrevid", "nosuchsection"})
+
+# limite de titles=A|B|C por query da API para clientes comuns
+MAX_TITLES_PER_QUERY = 50
+
+# categorias varridas para montar o índice local de times
+TEAM_CATEGORIES = ("Category:Teams", "Category:Disbanded Teams")
+
+# times já resolvidos ficam em memória: /time de um time conhecido não sai do processo
+TEAM_CACHE = AsyncTTLCache(
+    ttl=30 * 60,
+    stale_ttl=TEAM_MAX_AGE,
+    max_entries=2000,
+    fallback_on=(UpstreamUnavailable,),
+    encode=encode,
+    decode=decode,
+)
+
+# nomes que a busca da API não achou (ou que falharam há pouco), em minúsculas
+TITLE_MISSES = NegativeCache(not_found_ttl=30 * 60, error_ttl=30)
+
+METRICS.watch_stats("dppgg_cache", {"cache": "team"}, TEAM_CACHE.stats)
+METRICS.watch_stats("dppgg_negative_cache", {"cache": "team_title"}, TITLE_MISSES.stats)
+
+_INFLIGHT = SingleFlight()
+
+# (regex da abertura, limite) das regiões lidas por _parse_team_info
+_SCOPES = (
+    (open_tag("span", class_contains("team-template-image-icon")), 1),
+    (open_tag("div", class_contains("infobox-image")), 1),
+    (open_tag("div", class_contains("infobox-description")), None),
+    (open_tag("p"), 1),
+    (open_tag("table", class_contains(r"\btable2__table\b")), 1),
+)
+
 
 def _abs(url: str | None) -> str | None:
     if not url:
@@ -29,24 +95,160 @@ def _abs(url: str | None) -> str | None:
     return None
 
 
-async def _api_get(session: aiohttp.ClientSession, params: dict) -> dict | None:
+async def _api_get(http: HttpPool, params: dict, *, profile: ServiceProfile = PROFILE) -> dict | None:
     for attempt in range(3):
         try:
-            async with session.get(API, params=params) as r:
+            async with http.get(profile, API, params=params) as r:
                 if r.status == 429:
-                    await asyncio.sleep(1.5 * (attempt + 1))
+                    UPSTREAM_RETRIES.inc(service="liquipedia", reason="429")
                     continue
                 if r.status != 200:
+                    log.warning("API da Liquipedia respondeu erro", extra={"status": r.status, "action": params.get("action")})
                     return None
                 return await r.json()
-        except Exception:
+        except UpstreamUnavailable:
+            raise
+        except Exception as e:
+            UPSTREAM_RETRIES.inc(service="liquipedia", reason=type(e).__name__)
+            log.warning("falha na API da Liquipedia", extra={"attempt": attempt + 1, "action": params.get("action"), "error": repr(e)})
             await asyncio.sleep(1.0 * (attempt + 1))
     return None
 
 
-async def _resolve_page_title(session: aiohttp.ClientSession, team_name: str) -> str | None:
+def _api_unavailable() -> UpstreamUnavailable:
+    # erro da API não é "não existe": quem chamou avisa para tentar de novo em vez de cachear o miss
+    return UpstreamUnavailable(urlsplit(API).hostname, TITLE_MISSES.ttls[NegativeCache.ERROR])
+
+
+def _parse_result(data: dict | None) -> dict | None:
+    """O campo "parse" da resposta; None para página/revisão/seção inexistente."""
+    if not data:
+        raise _api_unavailable()
+    error = data.get("error")
+    if error:
+        if error.get("code") in MISSING_PAGE_CODES:
+            return None
+        log.warning("action=parse da Liquipedia falhou", extra={"code": error.get("code")})
+        raise _api_unavailable()
+    return data.get("parse") or {}
+
+
+class TeamIndex:
+    """
+    Índice local dos títulos das páginas de times da Liquipedia LoL.
+    Resolve nomes sem ida à rede e alimenta o autocomplete do /time
+    (prefixo primeiro, depois aproximado).
+    """
+
+    def __init__(self):
+        self.titles: list[str] = []
+        self.updated_at = 0.0
+        self._keys: list[str] = []
+        self._by_key: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.replace("_", " ").strip().casefold()
+
+    def load(self, titles: list[str], updated_at: float | None = None) -> None:
+        by_key = {self._key(t): t for t in titles}
+        self._by_key = by_key
+        self._keys = sorted(by_key)
+        self.titles = sorted(by_key.values())
+        self.updated_at = updated_at or time.time()
+
+    def lookup(self, name: str) -> str | None:
+        return self._by_key.get(self._key(name))
+
+    def search(self, query: str, limit: int = 25) -> list[str]:
+        key = self._key(query)
+        if not key:
+            return self.titles[:limit]
+
+        found: list[str] = []
+        i = bisect.bisect_left(self._keys, key)
+        while i < len(self._keys) and len(found) < limit and self._keys[i].startswith(key):
+            found.append(self._by_key[self._keys[i]])
+            i += 1
+
+        if len(found) < limit:
+            for k in difflib.get_close_matches(key, self._keys, n=limit, cutoff=0.6):
+                title = self._by_key[k]
+                if title not in found:
+                    found.append(title)
+                if len(found) >= limit:
+                    break
+
+        return found
+
+
+TEAM_INDEX = TeamIndex()
+
+
+async def load_team_index() -> bool:
+    """Carrega o índice salvo no cache em disco (sem rede). Retorna se achou algo."""
+    saved = await DISK_CACHE.get("team-index", "titles")
+    if not saved:
+        return False
+    TEAM_INDEX.load(saved["titles"], saved["updated_at"])
+    return True
+
+
+async def refresh_team_index(*, http: HttpPool | None = None) -> int:
+    """Relista as categorias de times (500 títulos por chamada) e salva o índice."""
+    titles: set[str] = set()
+    async with borrow_pool(http) as pool:
+        for category in TEAM_CATEGORIES:
+            params = {
+                "action": "query",
+                "list": "categorymembers",
+                "cmtitle": category,
+                "cmnamespace": 0,
+                "cmtype": "page",
+                "cmlimit": 500,
+                "format": "json",
+            }
+            while True:
+                data = await _api_get(pool, params)
+                if not data:
+                    break
+                for member in ((data.get("query") or {}).get("categorymembers") or []):
+                    if member.get("title"):
+                        titles.add(member["title"])
+
+                cont = (data.get("continue") or {}).get("cmcontinue")
+                if not cont:
+                    break
+                params = {**params, "cmcontinue": cont}
+
+    if titles:
+        TEAM_INDEX.load(list(titles))
+        await DISK_CACHE.set("team-index", "titles", {
+            "titles": TEAM_INDEX.titles,
+            "updated_at": TEAM_INDEX.updated_at,
+        })
+    return len(titles)
+
+
+async def _resolve_page_title(http: HttpPool, team_name: str) -> str | None:
+    # índice local primeiro; a busca na API fica só para nomes fora dele
+    title = TEAM_INDEX.lookup(team_name)
+    if title:
+        return title
+
+    miss_key = team_name.strip().lower()
+    miss = TITLE_MISSES.get(miss_key)
+    if miss is not None:
+        kind, remaining = miss
+        if kind == NegativeCache.NOT_FOUND:
+            return None
+        raise UpstreamUnavailable(urlsplit(API).hostname, remaining)
+
     # search via MediaWiki
-    data = await _api_get(session, {
+    data = await _api_get(http, {
         "action": "query",
         "list": "search",
         "srsearch": team_name,
@@ -54,10 +256,13 @@ async def _resolve_page_title(session: aiohttp.ClientSession, team_name: str) ->
         "srlimit": 5,
     })
     if not data:
-        return None
+        # erro da API não é "time inexistente": guarda bem menos tempo e avisa quem chamou
+        TITLE_MISSES.remember(miss_key, NegativeCache.ERROR)
+        raise _api_unavailable()
 
     results = (((data.get("query") or {}).get("search")) or [])
     if not results:
+        TITLE_MISSES.remember(miss_key, NegativeCache.NOT_FOUND)
         return None
 
     # tenta pegar o melhor match (prioriza igualdade ignorando case)
@@ -73,24 +278,202 @@ async def _resolve_page_title(session: aiohttp.ClientSession, team_name: str) ->
     return best
 
 
-async def _parse_page_html(session: aiohttp.ClientSession, title: str) -> str | None:
-    data = await _api_get(session, {
-        "action": "parse",
-        "page": title,
-        "prop": "text",
-        "format": "json",
-    })
-    if not data:
-        return None
+def _parse_params(title: str, revid: int | None, **extra) -> dict:
+    # com a revisão, todas as chamadas de um time leem a mesma versão da página
+    params = {"action": "parse", "format": "json", **extra}
+    if revid:
+        params["oldid"] = revid
+    else:
+        params["page"] = title
+    return params
 
-    parse = data.get("parse") or {}
+
+async def _parse_page_html(
+    http: HttpPool, title: str, *, revid: int | None = None, section: int | None = None
+) -> str | None:
+    params = _parse_params(title, revid, prop="text")
+    if section is not None:
+        params["section"] = section
+
+    parse = _parse_result(await _api_get(http, params, profile=PARSE_PROFILE))
+    if parse is None:
+        return None
     text = parse.get("text") or {}
-    html = text.get("*")
-    return html
+    return text.get("*")
+
+
+class TitleBatcher:
+    """
+    Junta consultas prop=info de vários títulos feitas ao mesmo tempo numa
+    única query titles=A|B|C (até MAX_TITLES_PER_QUERY) e devolve para cada
+    chamador só a página dele. Mesmo orçamento de requisições, mais vazão.
+
+    Sem query em andamento, o pedido sai já (só junta quem chegou na mesma
+    volta do loop); com uma em andamento, quem chega espera ela terminar e vai
+    na próxima leva, sem janela fixa somada a cada consulta.
+    """
+
+    def __init__(self, *, max_titles: int = MAX_TITLES_PER_QUERY):
+        self.max_titles = max_titles
+        self.queries = 0
+        self.titles_requested = 0
+
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._http: HttpPool | None = None
+        self._timer: asyncio.Handle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def page_info(self, http: HttpPool, title: str) -> dict | None:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.setdefault(title, []).append(fut)
+        self._http = self._http or http
+        self.titles_requested += 1
+
+        if len(self._pending) >= self.max_titles:
+            self._schedule_flush()
+        elif self._timer is None and not self._tasks:
+            self._timer = loop.call_soon(self._schedule_flush)
+
+        return await fut
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        titles = list(self._pending)[: self.max_titles]
+        waiters = {t: self._pending.pop(t) for t in titles}
+        http, self._http = self._http, None
+        if self._pending:
+            # sobrou gente além do limite: vai na próxima leva, quando esta terminar
+            self._http = http
+
+        task = asyncio.create_task(self._flush(http, waiters))
+        self._tasks.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if self._pending and not self._tasks and self._timer is None:
+            self._schedule_flush()
+
+    async def _flush(self, http: HttpPool, waiters: dict[str, list[asyncio.Future]]) -> None:
+        self.queries += 1
+        try:
+            data = await _api_get(http, {
+                "action": "query",
+                "prop": "info",
+                "titles": "|".join(waiters),
+                "redirects": 1,
+                "format": "json",
+            })
+            results = self._split(data, list(waiters))
+        except Exception as e:
+            for futs in waiters.values():
+                for fut in futs:
+                    if not fut.done():
+                        fut.set_exception(e)
+            return
+
+        for title, futs in waiters.items():
+            for fut in futs:
+                if not fut.done():
+                    fut.set_result(results.get(title))
+
+    @staticmethod
+    def _split(data: dict | None, titles: list[str]) -> dict[str, dict | None]:
+        query = (data or {}).get("query") or {}
+        # a API devolve o título normalizado/redirecionado; desfaz o caminho para cada pedido
+        normalized = {n["from"]: n["to"] for n in query.get("normalized") or []}
+        redirects = {r["from"]: r["to"] for r in query.get("redirects") or []}
+        pages = {p.get("title"): p for p in (query.get("pages") or {}).values()}
+
+        results: dict[str, dict | None] = {}
+        for title in titles:
+            final = normalized.get(title, title)
+            final = redirects.get(final, final)
+            page = pages.get(final)
+            results[title] = None if page is None or "missing" in page else page
+        return results
+
+
+_BATCHER = TitleBatcher()
+
+
+async def _latest_revid(http: HttpPool, title: str) -> int | None:
+    page = await _BATCHER.page_info(http, title)
+    if page and page.get("lastrevid"):
+        return int(page["lastrevid"])
+    return None
 
 
-def _parse_team_info(html: str, title: str) -> dict:
-    soup = BeautifulSoup(html, "html.parser")
+async def _team_sections(http: HttpPool, title: str, revid: int | None) -> list[int] | None:
+    """
+    Seções que _parse_team_info lê: [0, visão geral, elenco]. O prop=sections
+    sai uma vez por revisão (cache em disco); None quando não há seção de
+    elenco identificável. Falha da API levanta UpstreamUnavailable.
+    """
+    rev_key = f"{title}@{revid}"
+    if revid:
+        saved = await DISK_CACHE.get("team-sections", rev_key)
+        if saved is not None:
+            return saved["sections"]
+
+    parse = _parse_result(await _api_get(http, _parse_params(title, revid, prop="sections"), profile=PARSE_PROFILE))
+    if parse is None:
+        return None
+
+    overview = roster = None
+    for sec in (parse.get("sections") or []):
+        index = str(sec.get("index") or "")
+        # seções vindas de templates têm índice "T-1" e não podem ser pedidas por número
+        if not index.isdigit():
+            continue
+        line = (sec.get("line") or "").strip()
+        if overview is None and OVERVIEW_SECTION_RE.match(line):
+            overview = int(index)
+        if roster is None and ROSTER_SECTION_RE.match(line):
+            roster = int(index)
+
+    sections = None
+    if roster is not None:
+        sections = [0] + ([overview] if overview is not None else []) + [roster]
+    if revid:
+        await DISK_CACHE.set("team-sections", rev_key, {"sections": sections})
+    return sections
+
+
+async def _team_page_html(http: HttpPool, title: str, revid: int | None) -> str | None:
+    """
+    Só as seções lidas pelo parser; sem seção de elenco identificável, a página
+    inteira. None só para página inexistente; falha da API levanta UpstreamUnavailable.
+    """
+    sections = await _team_sections(http, title, revid)
+    if sections is None:
+        return await _parse_page_html(http, title, revid=revid)
+
+    parts = []
+    for section in sections:
+        html = await _parse_page_html(http, title, revid=revid, section=section)
+        if html is None:
+            return None
+        parts.append(html)
+    return "\n".join(parts)
+
+
+def _scoped_team_html(html: str) -> str:
+    spans = []
+    hidden = HiddenRanges.of(html)
+    for pattern, limit in _SCOPES:
+        spans += element_spans(html, pattern, limit=limit, hidden=hidden)
+    return join_spans(html, spans)
+
+
+def _parse_team_info(html: str, title: str) -> Team:
+    soup = make_soup(_scoped_team_html(html))
 
     name = title
     # título costuma vir fora do HTML do parse, então usamos title mesmo
@@ -163,38 +546,74 @@ def _parse_team_info(html: str, title: str) -> dict:
             role = cols[2].get_text(" ", strip=True) if len(cols) > 2 else "N/A"
             join_date = cols[3].get_text(" ", strip=True) if len(cols) > 3 else "N/A"
 
-            players.append({
-                "tag": tag,
-                "real_name": real_name or "N/A",
-                "nationality": nationality or "N/A",
-                "role": role or "N/A",
-                "join_date": join_date or "N/A",
-            })
+            players.append(Player(
+                tag=tag,
+                real_name=real_name or "N/A",
+                nationality=nationality or "N/A",
+                role=role or "N/A",
+                join_date=join_date or "N/A",
+            ))
+
+    return Team(
+        title=title,
+        name=name,
+        url=f"{LOL_BASE}/{quote(title.replace(' ', '_'))}",
+        logo_url=logo_url,
+        country=country,
+        description=description,
+        players=tuple(players),
+    )
 
-    return {
-        "title": title,
-        "name": name,
-        "url": f"{LOL_BASE}/{quote(title.replace(' ', '_'))}",
-        "logo_url": logo_url,
-        "country": country,
-        "description": description,
-        "players": players,
-    }
 
+async def get_cached_team_info_async(team_name: str, *, http: HttpPool | None = None) -> Team | None:
+    key = (team_name or "").strip().lower()
+    return await TEAM_CACHE.get_or_load(key, lambda: get_team_full_info_async(team_name, http=http))
 
-async def get_team_full_info_async(team_name: str) -> dict | None:
+
+async def get_team_full_info_async(team_name: str, *, http: HttpPool | None = None) -> Team | None:
     team_name = (team_name or "").strip()
     if not team_name:
         return None
 
-    timeout = aiohttp.ClientTimeout(total=25)
-    async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout) as session:
-        title = await _resolve_page_title(session, team_name)
-        if not title:
-            return None
-
-        html = await _parse_page_html(session, title)
-        if not html:
-            return None
+    return await _INFLIGHT.do(
+        team_name.lower(),
+        lambda: _fetch_team_info(team_name, http),
+    )
+
+
+async def _fetch_team_info(team_name: str, http: HttpPool | None) -> Team | None:
+    disk_key = team_name.lower()
+    cached = await DISK_CACHE.get("team", disk_key, max_age=TEAM_MAX_AGE)
+    if cached is not None:
+        return Team.from_dict(cached)
+
+    try:
+        async with borrow_pool(http) as pool:
+            title = await _resolve_page_title(pool, team_name)
+            if not title:
+                return None
+
+            # página sem edição nova desde o último parse: nada a baixar nem parsear
+            revid = await _latest_revid(pool, title)
+            rev_key = f"{title}@{revid}"
+            saved = await DISK_CACHE.get("team-rev", rev_key) if revid else None
+
+            if saved is not None:
+                info = Team.from_dict(saved)
+            else:
+                html = await _team_page_html(pool, title, revid)
+                if html is None:
+                    # a página não existe (não é falha: essas levantam UpstreamUnavailable)
+                    return None
 
-        return _parse_team_info(html, title)
\ No newline at end of file
+                info = await run_parser(_parse_team_info, html, title)
+                if revid:
+                    await DISK_CACHE.set("team-rev", rev_key, info.to_dict())
+    except UpstreamUnavailable:
+        stale = await DISK_CACHE.get("team", disk_key)
+        if stale is None:
+            raise
+        return Team.from_dict(stale)
+
+    await DISK_CACHE.set("team", disk_key, info.to_dict())
+    return info
\ No newline at end of file
@@ -0,0 +1,252 @@
+"""
+Modelos dos dados raspados (perfil, partida, time, jogador, nota de patch).
+
+Dataclasses congeladas com __slots__: sem o dict por instância nem as chaves
+repetidas em cada partida/jogador. Para os caches há uma codificação binária
+posicional (só os valores, na ordem dos campos), bem menor que o dict em
+memória; o disco continua guardando to_dict() em JSON, legível e compatível
+com as entradas já gravadas.
+"""
+import struct
+from dataclasses import dataclass, fields
+from typing import Any, ClassVar
+
+# sobe quando a ordem/lista de campos de algum modelo mudar: bytes antigos viram miss
+CODEC_VERSION = 1
+
+_NONE, _STR, _INT, _FLOAT, _LIST, _MODEL, _TRUE, _FALSE = range(8)
+_DOUBLE = struct.Struct("<d")
+
+_MODELS: dict[int, type["_Model"]] = {}
+
+
+class CodecError(ValueError):
+    """Bytes de outra versão do codec (ou corrompidos)."""
+
+
+class _Model:
+    __slots__ = ()
+    # byte que identifica o tipo na codificação binária
+    TAG: ClassVar[int]
+    # campos que guardam tupla de outro modelo: nome -> classe (para o from_dict)
+    NESTED: ClassVar[dict[str, type]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "TAG" in cls.__dict__:
+            _MODELS[cls.TAG] = cls
+
+    def to_dict(self) -> dict:
+        out = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if f.name in self.NESTED:
+                value = [item.to_dict() for item in value]
+            out[f.name] = value
+        return out
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "_Model":
+        """Aceita dicts de versões anteriores: chave faltando usa o default, chave a mais é ignorada."""
+        kwargs = {}
+        for f in fields(cls):
+            if f.name not in data:
+                continue
+            value = data[f.name]
+            nested = cls.NESTED.get(f.name)
+            if nested is not None:
+                value = tuple(nested.from_dict(item) for item in value or ())
+            kwargs[f.name] = value
+        return cls(**kwargs)
+
+    def encode(self) -> bytes:
+        out = bytearray((CODEC_VERSION,))
+        _write_model(out, self)
+        return bytes(out)
+
+    @staticmethod
+    def decode(blob: bytes) -> "_Model":
+        if not blob or blob[0] != CODEC_VERSION:
+            raise CodecError(f"versão do codec desconhecida: {blob[:1]!r}")
+        try:
+            value, _ = _read(blob, 1)
+        except (IndexError, KeyError, struct.error, UnicodeDecodeError) as e:
+            raise CodecError(str(e)) from e
+        return value
+
+
+def encode(value: "_Model") -> bytes:
+    return value.encode()
+
+
+def decode(blob: bytes) -> "_Model":
+    return _Model.decode(blob)
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(blob: bytes, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = blob[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _write_model(out: bytearray, model: "_Model") -> None:
+    out.append(_MODEL)
+    out.append(model.TAG)
+    for f in fields(model):
+        _write(out, getattr(model, f.name))
+
+
+def _write(out: bytearray, value: Any) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, str):
+        raw = value.encode("utf-8")
+        out.append(_STR)
+        _write_varint(out, len(raw))
+        out += raw
+    elif isinstance(value, int):
+        out.append(_INT)
+        # zigzag: negativos pequenos (ex: -18 PDL) continuam com 1 byte
+        _write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _write(out, item)
+    elif isinstance(value, _Model):
+        _write_model(out, value)
+    else:
+        raise TypeError(f"tipo sem codificação: {type(value).__name__}")
+
+
+def _read(blob: bytes, pos: int) -> tuple[Any, int]:
+    kind = blob[pos]
+    pos += 1
+    if kind == _NONE:
+        return None, pos
+    if kind == _TRUE:
+        return True, pos
+    if kind == _FALSE:
+        return False, pos
+    if kind == _STR:
+        size, pos = _read_varint(blob, pos)
+        return blob[pos:pos + size].decode("utf-8"), pos + size
+    if kind == _INT:
+        n, pos = _read_varint(blob, pos)
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+    if kind == _FLOAT:
+        return _DOUBLE.unpack_from(blob, pos)[0], pos + _DOUBLE.size
+    if kind == _LIST:
+        count, pos = _read_varint(blob, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _read(blob, pos)
+            items.append(item)
+        return tuple(items), pos
+    if kind == _MODEL:
+        cls = _MODELS[blob[pos]]
+        pos += 1
+        values = []
+        for _ in fields(cls):
+            value, pos = _read(blob, pos)
+            values.append(value)
+        return cls(*values), pos
+    raise CodecError(f"marcador inválido {kind} na posição {pos - 1}")
+
+
+@dataclass(frozen=True, slots=True)
+class Match(_Model):
+    TAG: ClassVar[int] = 1
+
+    champion: str = "–"
+    result: str = "–"
+    date: str = "–"
+    mode: str = "–"
+    duration: str = "–"
+    kda: str = "KDA não disponível"
+    # id do link /match/ (quando a linha tem um) e saldo de PDL da ranqueada
+    match_id: str | None = None
+    lp_change: int | None = None
+
+    @property
+    def is_victory(self) -> bool:
+        return "victory" in self.result.lower()
+
+    @property
+    def is_defeat(self) -> bool:
+        return "defeat" in self.result.lower()
+
+
+@dataclass(frozen=True, slots=True)
+class Profile(_Model):
+    TAG: ClassVar[int] = 2
+    NESTED: ClassVar[dict[str, type]] = {"last_matches": Match}
+
+    name: str
+    url_name: str
+    region: str
+    level: str = "–"
+    rank: str = "Unranked"
+    lp: str = "–"
+    wins: int = 0
+    losses: int = 0
+    winrate: str = "Unranked"
+    profile_img: str | None = None
+    rank_img: str | None = None
+    last_matches: tuple[Match, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Player(_Model):
+    TAG: ClassVar[int] = 3
+
+    tag: str = "N/A"
+    real_name: str = "N/A"
+    nationality: str = "N/A"
+    role: str = "N/A"
+    join_date: str = "N/A"
+
+
+@dataclass(frozen=True, slots=True)
+class Team(_Model):
+    TAG: ClassVar[int] = 4
+    NESTED: ClassVar[dict[str, type]] = {"players": Player}
+
+    title: str
+    name: str
+    url: str
+    logo_url: str | None = None
+    country: str = "N/A"
+    description: str = "Descrição não encontrada."
+    players: tuple[Player, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class PatchNote(_Model):
+    TAG: ClassVar[int] = 5
+
+    title: str
+    url: str
+    # do card da listagem ou, sem ele, o 1º parágrafo do artigo
+    description: str | None = None
+    skin_img: str | None = None
+    skin_text: str | None = None
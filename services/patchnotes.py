@@ -1,5 +1,18 @@
-import aiohttp
-from bs4 import BeautifulSoup
+import logging
+from dataclasses import replace
+
+from services.models import PatchNote
+from utils.diskcache import DISK_CACHE
+from utils.html import (
+    HiddenRanges, StreamScanner, attr_equals, class_contains, element_spans, first_inside, join_spans, make_soup,
+    open_tag,
+)
+from utils.http import HttpPool, ServiceProfile, borrow_pool, read_text
+from utils.ratelimit import UpstreamUnavailable
+from utils.singleflight import SingleFlight
+from utils.workers import run_parser
+
+log = logging.getLogger(__name__)
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0",
@@ -8,87 +21,209 @@ HEADERS = {
     "Referer": "https://www.google.com/",
 }
 
+PROFILE = ServiceProfile(name="patchnotes", headers=HEADERS, timeout=20)
+
+LATEST_URL = "https://www.leagueoflegends.com/pt-br/news/tags/patch-notes/"
+# idade máxima da última nota no cache em disco antes de revalidar (um GET condicional)
+PATCH_MAX_AGE = 5 * 60
+
+_INFLIGHT = SingleFlight()
+
+_CARD = open_tag("a", attr_equals("data-testid", "articlefeaturedcard-component"))
+_H1 = open_tag("h1")
+_CONTENT_BORDER = open_tag("div", class_contains(r"(?<![\w-])content-border(?![\w-])"))
+_ARTICLE = open_tag("article")
+_P = open_tag("p")
+
+
+class PatchArticleCutoff:
+    """Predicado de read_text(): título, bloco da skin e 1º parágrafo do artigo já chegaram."""
+
+    def __init__(self):
+        self._scan = StreamScanner()
+        self._scan.watch("title", _H1)
+        self._scan.watch("skin", _CONTENT_BORDER)
+        self._scan.watch("article", _ARTICLE)
+        # do artigo basta o primeiro <p> fechado
+        self._scan.watch("paragraph", _P, inside="article")
+
+    def __call__(self, piece: str) -> bool:
+        scan = self._scan
+        scan.feed(piece)
+        return scan.done("title") and scan.done("skin") and scan.done("paragraph")
+
+
+def parse_patch_listing(html: str) -> list[dict]:
+    """
+    Cards de "Atualizações do jogo" da página de tags, em ordem:
+    [{"href": "/pt-br/news/game-updates/...", "description": "..." | None}]
+    """
+    soup = make_soup(join_spans(html, element_spans(html, _CARD)))
+    cards = soup.find_all("a", {"data-testid": "articlefeaturedcard-component"})
+
+    found = []
+    for card in cards:
+        category = card.find("div", {"data-testid": "card-category"})
+        if category and "Atualizações do jogo" in category.text:
+            href = card.get("href")
+            if not href:
+                continue
+
+            description_div = card.find("div", {"data-testid": "card-description"})
+            found.append({
+                "href": href,
+                "description": description_div.text.strip() if description_div else None,
+            })
+
+    return found
+
+
+def parse_patch_article(html: str, patch_url: str) -> PatchNote:
+    hidden = HiddenRanges.of(html)
+    spans = element_spans(html, _H1, limit=1, hidden=hidden) + element_spans(html, _CONTENT_BORDER, limit=1, hidden=hidden)
+    scoped = join_spans(html, spans) + "\n" + first_inside(html, _ARTICLE, _P, hidden=hidden)
+    soup = make_soup(scoped)
+
+    title_tag = soup.find("h1")
+    title = title_tag.text.strip() if title_tag else "Sem título"
+
+    content_border_div = soup.find("div", class_="content-border")
+    skin_img_url, skin_text = None, None
+    if content_border_div:
+        img_tag = content_border_div.find("img")
+        if img_tag:
+            skin_img_url = img_tag.get("src")
+
+        p_tag = content_border_div.find("p")
+        if p_tag:
+            skin_text = p_tag.text.strip()
+
+    first_paragraph = None
+    article_section = soup.find("article")
+    if article_section:
+        p = article_section.find("p")
+        if p:
+            first_paragraph = p.text.strip()
+
+    return PatchNote(
+        title=title,
+        url=patch_url,
+        description=first_paragraph,
+        skin_img=skin_img_url,
+        skin_text=skin_text,
+    )
+
+
+def _load_patch_note(data: dict) -> PatchNote:
+    # artigos gravados antes dos modelos guardavam o 1º parágrafo em "summary"
+    if "description" not in data and "summary" in data:
+        data = {**data, "description": data["summary"]}
+    return PatchNote.from_dict(data)
+
+
+async def _conditional_get_parsed(http: HttpPool, url: str, parser, *args, until=None, load=None):
+    """
+    GET com If-None-Match/If-Modified-Since. Guarda ETag/Last-Modified junto com
+    o resultado de `parser`; num 304 devolve o resultado guardado sem baixar nem parsear.
+    `until` cria o predicado de read_text (um por download) que encerra a leitura
+    quando o parser já tem o que precisa.
+    Se o parser devolve um modelo, ele é guardado com to_dict() e `load` o reconstrói.
+    """
+    memo = await DISK_CACHE.get("conditional", url)
+    headers = {}
+    if memo:
+        if memo.get("etag"):
+            headers["If-None-Match"] = memo["etag"]
+        if memo.get("last_modified"):
+            headers["If-Modified-Since"] = memo["last_modified"]
+
+    async with http.get(PROFILE, url, headers=headers) as response:
+        if response.status == 304 and memo:
+            return load(memo["parsed"]) if load else memo["parsed"]
+        if response.status != 200:
+            return None
+        text = await read_text(response, until=until() if until else None)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+    parsed = await run_parser(parser, text, *args)
+    if etag or last_modified:
+        await DISK_CACHE.set("conditional", url, {
+            "etag": etag,
+            "last_modified": last_modified,
+            "parsed": parsed.to_dict() if load else parsed,
+        })
+    return parsed
+
+
+async def get_patch_details_async(patch_url: str, http: HttpPool) -> PatchNote | None:
+    cached = await DISK_CACHE.get("patch-article", patch_url)
+    if cached is not None:
+        return _load_patch_note(cached)
 
-async def get_patch_details_async(patch_url: str, session: aiohttp.ClientSession) -> dict | None:
     try:
-        async with session.get(patch_url, headers=HEADERS) as response:
-            if response.status != 200:
-                return None
-            text = await response.text()
-
-        soup = BeautifulSoup(text, "html.parser")
-
-        title_tag = soup.find("h1")
-        title = title_tag.text.strip() if title_tag else "Sem título"
-
-        content_border_div = soup.find("div", class_="content-border")
-        skin_img_url, skin_text = None, None
-        if content_border_div:
-            img_tag = content_border_div.find("img")
-            if img_tag:
-                skin_img_url = img_tag.get("src")
-
-            p_tag = content_border_div.find("p")
-            if p_tag:
-                skin_text = p_tag.text.strip()
-
-        first_paragraph = None
-        article_section = soup.find("article")
-        if article_section:
-            p = article_section.find("p")
-            if p:
-                first_paragraph = p.text.strip()
-
-        return {
-            "title": title,
-            "skin_img": skin_img_url,
-            "skin_text": skin_text,
-            "summary": first_paragraph,
-            "url": patch_url,
-        }
+        details = await _conditional_get_parsed(
+            http, patch_url, parse_patch_article, patch_url,
+            until=PatchArticleCutoff, load=_load_patch_note,
+        )
+    except UpstreamUnavailable:
+        raise
     except Exception:
+        log.exception("falha ao buscar artigo de patch", extra={"url": patch_url})
         return None
 
+    if details is not None:
+        await DISK_CACHE.set("patch-article", patch_url, details.to_dict())
+    return details
+
+
+async def get_latest_patch_note_with_skins_async(*, http: HttpPool | None = None) -> PatchNote | None:
+    return await _INFLIGHT.do(LATEST_URL, lambda: _cached_latest_patch_note(http))
+
+
+async def _cached_latest_patch_note(http: HttpPool | None) -> PatchNote | None:
+    cached = await DISK_CACHE.get("patch", "latest", max_age=PATCH_MAX_AGE)
+    if cached is not None:
+        return PatchNote.from_dict(cached)
 
-async def get_latest_patch_note_with_skins_async() -> dict | None:
-    url = "https://www.leagueoflegends.com/pt-br/news/tags/patch-notes/"
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=HEADERS) as response:
-                if response.status != 200:
-                    return None
-                text = await response.text()
+        patch = await _fetch_latest_patch_note(http)
+    except UpstreamUnavailable:
+        stale = await DISK_CACHE.get("patch", "latest")
+        if stale is None:
+            raise
+        return PatchNote.from_dict(stale)
+
+    if patch is not None:
+        await DISK_CACHE.set("patch", "latest", patch.to_dict())
+    return patch
 
-            soup = BeautifulSoup(text, "html.parser")
-            cards = soup.find_all("a", {"data-testid": "articlefeaturedcard-component"})
+
+async def _fetch_latest_patch_note(http: HttpPool | None) -> PatchNote | None:
+    url = LATEST_URL
+    try:
+        async with borrow_pool(http) as pool:
+            # listagem inalterada -> 304 e nada é baixado/parseado de novo
+            cards = await _conditional_get_parsed(pool, url, parse_patch_listing)
+            if cards is None:
+                return None
 
             for card in cards:
-                category = card.find("div", {"data-testid": "card-category"})
-                if category and "Atualizações do jogo" in category.text:
-                    href = card.get("href")
-                    if not href:
-                        continue
-
-                    patch_url = f"https://www.leagueoflegends.com{href}"
-
-                    patch_details = await get_patch_details_async(patch_url, session)
-                    if not patch_details:
-                        continue
-
-                    description_div = card.find("div", {"data-testid": "card-description"})
-                    description = (
-                        description_div.text.strip()
-                        if description_div else (patch_details.get("summary") or "Sem descrição")
-                    )
-
-                    return {
-                        "title": patch_details["title"],
-                        "description": description,
-                        "url": patch_details["url"],
-                        "skin_img": patch_details["skin_img"],
-                        "skin_text": patch_details["skin_text"],
-                    }
+                patch_url = f"https://www.leagueoflegends.com{card['href']}"
+
+                patch_details = await get_patch_details_async(patch_url, pool)
+                if not patch_details:
+                    continue
+
+                # o texto do card vale mais que o 1º parágrafo do artigo
+                description = card["description"]
+                if description is None:
+                    description = patch_details.description or "Sem descrição"
+                return replace(patch_details, description=description)
 
         return None
+    except UpstreamUnavailable:
+        raise
     except Exception:
-        return None
\ No newline at end of file
+        log.exception("falha ao buscar a listagem de patches", extra={"url": url})
+        return None
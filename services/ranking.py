@@ -0,0 +1,137 @@
+import asyncio
+import itertools
+import logging
+import time
+
+from services.leagueofgraphs import get_league_of_graphs_profile_async
+from services.models import Profile
+from utils.http import HttpPool
+from utils.ratelimit import UpstreamUnavailable
+from utils.storage import RankingStore
+
+log = logging.getLogger(__name__)
+
+# snapshot mais velho que isto entra na fila de atualização
+SNAPSHOT_MAX_AGE = 30 * 60
+# servidor que rodou /ranking há menos que isto tem prioridade na fila
+ACTIVE_WINDOW = 15 * 60
+# scrapes simultâneos; o HostGuard do League of Graphs ainda limita a taxa
+REFRESH_WORKERS = 3
+
+PRIORITY_ACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+def account_key(region: str, nickname: str) -> str:
+    return f"{region}/{nickname}"
+
+
+def summarize_profile(profile: Profile) -> dict:
+    # só o que o ranking mostra; o perfil completo continua no cache de disco
+    return {
+        "name": profile.name,
+        "rank": profile.rank,
+        "lp": profile.lp,
+        "wins": profile.wins,
+        "losses": profile.losses,
+        "winrate": profile.winrate,
+    }
+
+
+class ProfileRefresher:
+    """
+    Atualiza os snapshots de perfil em background com um número fixo de workers.
+    A fila é de prioridade: contas de servidores que estão consultando o
+    /ranking passam na frente da varredura periódica. Cada conta aparece no
+    máximo uma vez na fila (com a melhor prioridade pedida).
+    """
+
+    def __init__(self, store: RankingStore, http: HttpPool, *, workers: int = REFRESH_WORKERS):
+        self.store = store
+        self.http = http
+        self.workers = workers
+        self.refreshed = 0
+        self.failed = 0
+
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._queued: dict[str, int] = {}
+        self._seq = itertools.count()
+        self._active_guilds: dict[int, float] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def pending(self) -> int:
+        return len(self._queued)
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def touch(self, guild_id: int) -> None:
+        self._active_guilds[guild_id] = time.monotonic()
+
+    def is_active(self, guild_id: int) -> bool:
+        seen = self._active_guilds.get(guild_id)
+        return seen is not None and time.monotonic() - seen < ACTIVE_WINDOW
+
+    def is_queued(self, region: str, nickname: str) -> bool:
+        return account_key(region, nickname) in self._queued
+
+    def enqueue(self, region: str, nickname: str, priority: int) -> bool:
+        """
+        Põe a conta na fila. Retorna se ela é nova na fila: uma conta que já
+        estava só pode subir de prioridade, e isso não conta.
+        """
+        key = account_key(region, nickname)
+        current = self._queued.get(key)
+        if current is not None and current <= priority:
+            return False
+        # a entrada antiga (se houver) vira lixo e é ignorada pelo worker
+        self._queued[key] = priority
+        self._queue.put_nowait((priority, next(self._seq), key, region, nickname))
+        return current is None
+
+    def enqueue_stale(
+        self,
+        accounts: list[tuple[str, str]],
+        snapshots: dict[str, tuple[dict | None, float]],
+        priority: int,
+    ) -> int:
+        """Enfileira as contas com snapshot velho (ou sem snapshot); retorna quantas entraram agora."""
+        now = time.time()
+        queued = 0
+        for region, nickname in accounts:
+            snap = snapshots.get(account_key(region, nickname))
+            if snap is None or now - snap[1] > SNAPSHOT_MAX_AGE:
+                queued += self.enqueue(region, nickname, priority)
+        return queued
+
+    async def _worker(self) -> None:
+        while True:
+            priority, _, key, region, nickname = await self._queue.get()
+            if self._queued.get(key) != priority:
+                continue
+            del self._queued[key]
+
+            try:
+                profile = await get_league_of_graphs_profile_async(nickname, region, http=self.http)
+            except UpstreamUnavailable as e:
+                # site instável: devolve para a fila e espera o circuito reabrir
+                self.failed += 1
+                self.enqueue(region, nickname, priority)
+                await asyncio.sleep(e.retry_in)
+                continue
+            except Exception:
+                self.failed += 1
+                log.exception("falha ao atualizar snapshot", extra={"account": key})
+                continue
+
+            # perfil inexistente também vira snapshot (None) para não ser raspado a cada volta
+            await self.store.save_snapshot(key, summarize_profile(profile) if profile else None)
+            self.refreshed += 1
@@ -0,0 +1,27 @@
+import pytest
+
+from utils import cache, ratelimit
+
+
+class FakeClock:
+    """Substitui o módulo `time` de utils.cache e utils.ratelimit: o relógio só anda quando o teste manda."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache, "time", fake)
+    monkeypatch.setattr(ratelimit, "time", fake)
+    return fake
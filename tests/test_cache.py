@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from utils.cache import AsyncTTLCache
+
+
+def _loader(value, calls):
+    async def load():
+        calls.append(value)
+        return value
+    return load
+
+
+def test_ttl_hit_then_miss(clock):
+    c = AsyncTTLCache(ttl=10)
+    calls = []
+
+    async def main():
+        assert await c.get_or_load("k", _loader(1, calls)) == 1
+        clock.advance(9)
+        assert await c.get_or_load("k", _loader(2, calls)) == 1
+        clock.advance(2)
+        assert await c.get_or_load("k", _loader(3, calls)) == 3
+
+    asyncio.run(main())
+    assert calls == [1, 3]
+    assert (c.stats.hits, c.stats.misses) == (1, 2)
+
+
+def test_stale_served_while_refreshing(clock):
+    c = AsyncTTLCache(ttl=10, stale_ttl=5)
+    calls = []
+
+    async def main():
+        await c.get_or_load("k", _loader("velho", calls))
+        clock.advance(12)
+        assert await c.get_or_load("k", _loader("novo", calls)) == "velho"
+        # a atualização roda em background
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await c.get_or_load("k", _loader("outro", calls)) == "novo"
+
+    asyncio.run(main())
+    assert calls == ["velho", "novo"]
+    assert (c.stats.stale_hits, c.stats.refreshes) == (1, 1)
+
+
+def test_fallback_serves_expired_entry(clock):
+    c = AsyncTTLCache(ttl=1, fallback_on=(ConnectionError,))
+
+    async def broken():
+        raise ConnectionError
+
+    async def main():
+        await c.get_or_load("k", _loader("guardado", []))
+        clock.advance(100)
+        assert await c.get_or_load("k", broken) == "guardado"
+        with pytest.raises(ConnectionError):
+            await c.get_or_load("outra", broken)
+
+    asyncio.run(main())
+    assert c.stats.fallbacks == 1
+
+
+def test_none_is_not_cached(clock):
+    c = AsyncTTLCache(ttl=10)
+    calls = []
+
+    async def main():
+        assert await c.get_or_load("k", _loader(None, calls)) is None
+        assert await c.get_or_load("k", _loader(None, calls)) is None
+
+    asyncio.run(main())
+    assert len(calls) == 2
+    assert len(c) == 0
+
+
+def test_lru_eviction_by_count_and_bytes(clock):
+    c = AsyncTTLCache(ttl=10, max_entries=2, max_bytes=10, sizeof=len)
+    c.set("a", "xxx")
+    c.set("b", "xxx")
+    c.set("c", "xxx")
+    assert "a" not in c._data and len(c) == 2
+    # 3 + 3 + 7 passa de 10 bytes: sai o mais antigo
+    c.set("d", "xxxxxxx")
+    assert list(c._data) == ["c", "d"]
+    assert c.total_bytes == 10
+    # maior que o cache inteiro: não entra nem despeja o resto
+    c.set("e", "x" * 11)
+    assert list(c._data) == ["c", "d"]
+    assert c.stats.evictions == 2
@@ -0,0 +1,90 @@
+import re
+
+from bs4 import BeautifulSoup
+
+from services.leagueofgraphs import _ProfileCutoff, parse_profile_html
+from utils.html import HiddenRanges, StreamScanner, class_contains, element_spans, join_spans, open_tag
+
+_RANK_BOX = open_tag("div", class_contains("mainRankingDescriptionText"))
+
+# o rank de verdade vem depois de um "template" dentro de um <script> inline
+DECOY_PAGE = """<html><head>
+<script>
+var tpl = "<div class='mainRankingDescriptionText'><div class='leagueTier'>Iron IV</div></div>";
+</script>
+<!-- <div class="mainRankingDescriptionText"><div class="leagueTier">Bronze I</div></div> -->
+</head><body>
+<div class="bannerSummonerInfo"><img src="//cdn.leagueofgraphs.com/img/summonerIcons/1.png">
+<div class="bannerSubtitle">Level 120 - BR</div></div>
+<h3>Personal Ratings</h3>
+<div class="img-align-block mainRankingDescriptionText">
+  <img src="/img/league-icons/gold_2.png">
+  <div class="leagueTier">Gold II</div>
+  <div class="league-points"><span>38</span> LP</div>
+  <script>document.write("</div>");</script>
+  <div class="winslosses">Wins: <span>50</span> Losses: <span>40</span></div>
+</div>
+<table class="recentGamesTable"><tr><td>-</td></tr></table>
+</body></html>"""
+
+
+def test_element_spans_skips_script_and_comment_decoys():
+    spans = element_spans(DECOY_PAGE, _RANK_BOX, limit=1)
+    assert len(spans) == 1
+    s, e = spans[0]
+    # o fechamento dentro do document.write também não conta
+    assert DECOY_PAGE[s:e].rstrip().endswith("</div>\n</div>")
+    scoped = BeautifulSoup(join_spans(DECOY_PAGE, spans), "html.parser")
+    assert scoped.find("div", class_="leagueTier").get_text(strip=True) == "Gold II"
+
+
+def test_rank_matches_full_document_parse():
+    baseline = BeautifulSoup(DECOY_PAGE, "html.parser")
+    box = baseline.find("div", class_=re.compile("mainRankingDescriptionText"))
+    expected = box.find("div", class_="leagueTier").get_text(strip=True)
+
+    profile = parse_profile_html(DECOY_PAGE, "a-b", "br")
+    assert profile is not None
+    assert (profile.rank, profile.lp) == (expected, "38")
+    assert profile.rank_img == "https://www.leagueofgraphs.com/img/league-icons/gold_2.png"
+
+
+def test_hidden_ranges_extend_matches_full_scan():
+    for step in (1, 5, 64):
+        ranges = HiddenRanges()
+        for end in range(0, len(DECOY_PAGE) + step, step):
+            ranges.extend(DECOY_PAGE[:end])
+        full = HiddenRanges.of(DECOY_PAGE)
+        assert (ranges.starts, ranges.ends) == (full.starts, full.ends)
+
+
+def _stop_at(predicate, html, step):
+    for start in range(0, len(html), step):
+        if predicate(html[start:start + step]):
+            return min(start + step, len(html))
+    return None
+
+
+def test_profile_cutoff_stops_after_structure_at_any_chunk_size():
+    full = parse_profile_html(DECOY_PAGE, "a-b", "br")
+    for step in (1, 7, 64, len(DECOY_PAGE)):
+        end = _stop_at(_ProfileCutoff(), DECOY_PAGE, step)
+        assert end is not None
+        # nunca para antes do </table>, nem enganado pelo <script>
+        assert end >= DECOY_PAGE.index("</table>") + len("</table>")
+        assert parse_profile_html(DECOY_PAGE[:end], "a-b", "br") == full
+
+
+def test_stream_scanner_ignores_closes_inside_hidden_blocks():
+    page = "<div class='box'><script>x = '</div>';</script><!-- </div> --><p>a</p></div><i>fim</i>"
+    for step in (1, 3, len(page)):
+        scanner = StreamScanner()
+        scanner.watch("box", open_tag("div", class_contains("box")))
+        scanner.watch("p", open_tag("p"), inside="box")
+        seen = []
+        for start in range(0, len(page), step):
+            scanner.feed(page[start:start + step])
+            seen.append((start + step, scanner.done("box")))
+        closed_at = next(pos for pos, done in seen if done)
+        assert closed_at >= page.index("</div><i>") + len("</div>")
+        assert scanner.done("p")
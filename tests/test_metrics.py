@@ -0,0 +1,50 @@
+import asyncio
+
+from utils.http import HttpPool, ServiceProfile
+from utils.logging_segup import METRICS
+from utils.workers import ParsePool
+
+
+def _parse(value: str) -> str:
+    return value.upper()
+
+
+def test_host_guard_stats_are_exported_while_the_pool_is_open():
+    pool = HttpPool(upstream=None)
+    profile = ServiceProfile("teste", rate=2.0, burst=2, action="parse", action_rate=1.0, action_burst=1)
+
+    async def main():
+        await pool.start()
+        guard = pool.guard("example.org", profile)
+        pool.action_guard("example.org", profile)
+        guard.stats.requests += 3
+        guard.record_status(429)
+        text = METRICS.render()
+        await pool.close()
+        return text, METRICS.render()
+
+    text, after_close = asyncio.run(main())
+    assert "# TYPE dppgg_host_throttled_total counter" in text
+    assert 'dppgg_host_requests_total{guard="example.org"} 3' in text
+    assert 'dppgg_host_throttled_total{guard="example.org"} 1' in text
+    assert 'dppgg_host_rejected_total{guard="example.org#parse"} 0' in text
+    assert 'dppgg_host_circuit_state{guard="example.org",state="closed"} 1' in text
+    assert 'dppgg_host_circuit_state{guard="example.org",state="open"} 0' in text
+    assert "dppgg_host_" not in after_close
+
+
+def test_parse_pool_stats_are_exported():
+    pool = ParsePool(kind="thread", workers=1, max_pending=4)
+    METRICS.register_collector(pool.collect_metrics)
+    try:
+        assert asyncio.run(pool.run(_parse, "a")) == "A"
+        text = METRICS.render()
+    finally:
+        METRICS.unregister_collector(pool.collect_metrics)
+        pool.shutdown()
+
+    assert 'dppgg_parse_calls_total{parser="_parse"} 1' in text
+    assert 'dppgg_parse_rejected_total{parser="_parse"} 0' in text
+    assert "# TYPE dppgg_parse_wait_seconds_total counter" in text
+    assert 'dppgg_parse_pool_capacity{kind="thread"} 4' in text
+    assert "# TYPE dppgg_parse_backend gauge" in text
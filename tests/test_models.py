@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+from services.models import CODEC_VERSION, CodecError, Match, PatchNote, Player, Profile, Team, decode, encode
+from utils.cache import AsyncTTLCache
+
+MATCHES = (
+    Match("Ahri", "Victory", "1 hours ago", "Soloqueue", "36min 24s", "7/2/9", "br/3076820322", 24),
+    Match("Lee Sin", "Defeat", lp_change=-18),
+    Match(),
+)
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        Profile("Summoner", "Summoner-BR1", "br", "312", "Emerald III", "67", 50, 40, "55.6%", None, None, MATCHES),
+        Profile("Sem Rank", "Sem-Rank-BR1", "br"),
+        Team("T1", "T1", "https://liquipedia.net/leagueoflegends/T1", players=(Player("Faker", role="Mid"), Player())),
+        PatchNote("Notas da atualização 25.1", "https://x/", skin_text="Ahri Florescer Espiritual"),
+        MATCHES[1],
+    ],
+    ids=lambda model: type(model).__name__,
+)
+def test_codec_round_trip(model):
+    blob = encode(model)
+    assert blob[0] == CODEC_VERSION
+    assert decode(blob) == model
+
+
+@pytest.mark.parametrize("n", [0, 1, -1, 63, -64, 64, -65, 2**31, -(2**31), 2**70])
+def test_zigzag_ints_round_trip(n):
+    assert decode(encode(Match(lp_change=n))).lp_change == n
+
+
+def test_small_negative_int_fits_one_byte():
+    # marcador + 1 byte de varint, contra só o marcador do None
+    assert len(encode(Match(lp_change=-18))) == len(encode(Match(lp_change=None))) + 1
+
+
+def test_binary_is_smaller_than_dict_json():
+    profile = Profile("Summoner", "Summoner-BR1", "br", last_matches=MATCHES)
+    assert len(encode(profile)) < len(json.dumps(profile.to_dict()).encode())
+
+
+def test_decode_rejects_other_version_and_garbage():
+    blob = encode(MATCHES[0])
+    with pytest.raises(CodecError):
+        decode(bytes([CODEC_VERSION + 1]) + blob[1:])
+    with pytest.raises(CodecError):
+        decode(b"")
+    with pytest.raises(CodecError):
+        decode(blob[:-3])
+
+
+def test_from_dict_accepts_older_dicts():
+    data = MATCHES[0].to_dict()
+    del data["lp_change"]
+    data["extra"] = "ignorado"
+    match = Match.from_dict(data)
+    assert match.lp_change is None
+    assert match.champion == MATCHES[0].champion
+    profile = Profile("A", "a", "br", last_matches=MATCHES)
+    assert Profile.from_dict(profile.to_dict()) == profile
+
+
+def test_cache_stores_encoded_values_and_decodes_on_read(clock):
+    c = AsyncTTLCache(ttl=10, encode=encode, decode=decode)
+    match = Match("Ahri", "Victory", lp_change=-18)
+
+    async def load():
+        return match
+
+    async def main():
+        await c.get_or_load("k", load)
+        assert isinstance(c._data["k"].value, bytes)
+        assert await c.get_or_load("k", load) == match
+
+    asyncio.run(main())
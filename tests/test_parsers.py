@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.scrapers import TARGETS, _SOUP_BUILDERS, _normalize, load_fixtures
+from services import leagueofgraphs as log
+from services import liquipedia as lq
+from services import patchnotes as pn
+
+FIXTURES = load_fixtures(Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures")
+
+
+def _ids(fixtures):
+    return [name for name, _, _ in fixtures]
+
+
+def test_fixtures_cover_every_parser():
+    assert {meta["kind"] for _, _, meta in FIXTURES} == set(TARGETS)
+
+
+@pytest.mark.parametrize("name, html, meta", FIXTURES, ids=_ids(FIXTURES))
+def test_output_matches_golden(name, html, meta):
+    kind = meta["kind"]
+    soup = _SOUP_BUILDERS[kind](html) if kind in _SOUP_BUILDERS else None
+    for target, fn in TARGETS[kind].items():
+        assert _normalize(fn(html, meta["args"], soup)) == meta["expected"][target], target
+
+
+def _full_document(monkeypatch, kind):
+    # desliga o recorte: o parser recebe a página inteira
+    if kind == "profile":
+        monkeypatch.setattr(log, "_scoped_profile_html", lambda html: html)
+    elif kind == "team":
+        monkeypatch.setattr(lq, "_scoped_team_html", lambda html: html)
+    else:
+        monkeypatch.setattr(pn, "join_spans", lambda html, spans: html)
+        monkeypatch.setattr(pn, "first_inside", lambda *args, **kwargs: "")
+
+
+@pytest.mark.parametrize("name, html, meta", FIXTURES, ids=_ids(FIXTURES))
+def test_scoped_parse_equals_full_document_parse(monkeypatch, name, html, meta):
+    kind = meta["kind"]
+    # os extratores de árvore pronta não passam pelo recorte
+    targets = {t: fn for t, fn in TARGETS[kind].items() if not t.startswith("_extract")}
+    scoped = {t: _normalize(fn(html, meta["args"], None)) for t, fn in targets.items()}
+
+    _full_document(monkeypatch, kind)
+    full = {t: _normalize(fn(html, meta["args"], None)) for t, fn in targets.items()}
+    assert scoped == full
@@ -0,0 +1,22 @@
+import time
+
+from services.ranking import PRIORITY_ACTIVE, PRIORITY_BACKGROUND, SNAPSHOT_MAX_AGE, ProfileRefresher, account_key
+
+
+def test_enqueue_stale_counts_only_accounts_new_to_the_queue():
+    refresher = ProfileRefresher(store=None, http=None)
+    fresh = ("br", "Fresco#BR1")
+    stale = [("br", "Velho#BR1"), ("na", "Sem#NA1")]
+    snapshots = {
+        account_key(*fresh): ({"rank": "Gold II"}, time.time()),
+        account_key(*stale[0]): ({"rank": "Iron IV"}, time.time() - SNAPSHOT_MAX_AGE - 1),
+    }
+
+    assert refresher.enqueue_stale([fresh, *stale], snapshots, PRIORITY_BACKGROUND) == 2
+    # já estão na fila: subir a prioridade não conta como novo
+    assert refresher.enqueue_stale([fresh, *stale], snapshots, PRIORITY_ACTIVE) == 0
+    assert refresher.enqueue_stale(stale, snapshots, PRIORITY_BACKGROUND) == 0
+
+    assert refresher.pending == 2
+    assert refresher.is_queued(*stale[1]) and not refresher.is_queued(*fresh)
+    assert refresher._queued[account_key(*stale[0])] == PRIORITY_ACTIVE
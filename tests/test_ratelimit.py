@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from utils.ratelimit import AdaptiveTokenBucket, CircuitBreaker, HostGuard, UpstreamUnavailable
+
+
+def test_bucket_spends_burst_then_refills(clock):
+    bucket = AdaptiveTokenBucket(rate=2.0, burst=3)
+
+    async def main():
+        for _ in range(3):
+            assert await bucket.acquire() == 0
+        assert bucket.tokens < 1
+        clock.advance(0.5)
+        assert await bucket.acquire() == 0
+
+    asyncio.run(main())
+
+
+def test_bucket_throttle_halves_rate_and_success_recovers(clock):
+    bucket = AdaptiveTokenBucket(rate=4.0, burst=4)
+    bucket.on_throttled(retry_after=10)
+    assert bucket.rate == 2.0
+    assert bucket.tokens == 0
+    assert bucket.blocked_until == clock.now + 10
+    # o bloqueio entra na espera projetada
+    assert bucket.projected_wait() == pytest.approx(10 + 1 / 2.0)
+
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == bucket.max_rate == 4.0
+
+    for _ in range(100):
+        bucket.on_throttled(retry_after=0)
+    assert bucket.rate == bucket.min_rate == 4.0 / 16
+
+
+def test_bucket_projected_wait_counts_queue(clock):
+    bucket = AdaptiveTokenBucket(rate=1.0, burst=1)
+    assert bucket.projected_wait() == 0
+    bucket.tokens = 0.0
+    bucket.waiting = 4
+    assert bucket.projected_wait() == pytest.approx(5.0)
+
+
+def test_breaker_opens_then_allows_a_single_probe(clock):
+    breaker = CircuitBreaker("example.org", failure_threshold=3, reset_timeout=30)
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_request()
+
+    clock.advance(30)
+    breaker.before_request()
+    assert breaker.state == "half-open"
+    # só uma requisição de teste por vez
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert (breaker.state, breaker.failures) == ("closed", 0)
+    breaker.before_request()
+
+
+def test_breaker_failed_probe_reopens(clock):
+    breaker = CircuitBreaker("example.org", failure_threshold=1, reset_timeout=5)
+    breaker.record_failure()
+    clock.advance(5)
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.opened_at == clock.now
+
+
+def test_breaker_releases_a_stale_probe(clock):
+    breaker = CircuitBreaker("example.org", failure_threshold=1, reset_timeout=5)
+    breaker.record_failure()
+    clock.advance(5)
+    # a requisição de teste foi cancelada sem registrar resultado
+    breaker.before_request()
+    clock.advance(6)
+    breaker.before_request()
+
+
+def test_guard_rejects_when_projected_wait_exceeds_max_wait(clock):
+    guard = HostGuard("example.org", rate=1.0, burst=1, max_wait=2.0)
+    guard.record_status(429, "60")
+
+    async def main():
+        with pytest.raises(UpstreamUnavailable) as exc:
+            await guard.enter()
+        assert exc.value.retry_in > 2.0
+
+    asyncio.run(main())
+    assert guard.stats.rejected == 1
+    assert guard.stats.throttled == 1
+    assert guard.stats.requests == 0
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def test_singleflight_shares_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("k", slow) for _ in range(5)))
+        assert results == ["ok"] * 5
+        assert len(flight) == 0
+
+    asyncio.run(main())
+    assert calls == [1]
+    assert (flight.calls, flight.shared) == (5, 4)
+
+
+def test_singleflight_cancelled_waiter_keeps_shared_task():
+    flight = SingleFlight()
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def slow():
+            await gate.wait()
+            return "ok"
+
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        assert await second == "ok"
+        assert first.cancelled()
+
+    asyncio.run(main())
+
+
+def test_singleflight_propagates_errors_and_forgets_key():
+    flight = SingleFlight()
+
+    async def boom():
+        raise ValueError("falhou")
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await flight.do("k", boom)
+        assert len(flight) == 0
+
+    asyncio.run(main())
+    assert flight.shared == 0
@@ -0,0 +1,70 @@
+import asyncio
+
+from utils.storage import UserStore, WriteBehindStore
+
+
+class GatedStore(UserStore):
+    """apply_batch só termina quando o teste libera (e falha se `fail`)."""
+
+    def __init__(self, path):
+        super().__init__(str(path), legacy_json=str(path) + ".json")
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def apply_batch(self, changes):
+        self.started.set()
+        await self.release.wait()
+        if self.fail:
+            raise OSError("disco cheio")
+        await super().apply_batch(changes)
+
+
+def test_link_stays_readable_while_its_batch_is_flushing(tmp_path):
+    async def main():
+        store = WriteBehindStore(GatedStore(tmp_path / "links.db"), flush_interval=3600)
+        await store.open()
+        store.upsert("1", "br", "Nome#BR1")
+
+        flush = asyncio.create_task(store.flush())
+        await store.store.started.wait()
+        assert store.pending == 0
+        assert await store.get("1") == {"region": "br", "nickname": "Nome#BR1"}
+        assert (await store.load_all())["1"]["nickname"] == "Nome#BR1"
+
+        store.store.release.set()
+        await flush
+        assert await store.store.get("1") == {"region": "br", "nickname": "Nome#BR1"}
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_failed_flush_puts_the_batch_back_without_overwriting_newer_changes(tmp_path):
+    async def main():
+        store = WriteBehindStore(GatedStore(tmp_path / "links.db"), flush_interval=3600)
+        await store.open()
+        store.upsert("1", "br", "Antigo#BR1")
+        store.upsert("2", "na", "Outro#NA1")
+
+        store.store.fail = True
+        flush = asyncio.create_task(store.flush())
+        await store.store.started.wait()
+        # alteração feita durante a gravação vale mais que a do lote
+        store.upsert("1", "br", "Novo#BR1")
+        store.store.release.set()
+        await flush
+
+        assert store.flush_errors == 1
+        assert store.pending == 2
+        assert (await store.get("1"))["nickname"] == "Novo#BR1"
+        assert (await store.get("2"))["nickname"] == "Outro#NA1"
+
+        store.store.fail = False
+        await store.close()
+        reopened = UserStore(str(tmp_path / "links.db"), legacy_json=str(tmp_path / "none.json"))
+        await reopened.open()
+        assert (await reopened.get("1"))["nickname"] == "Novo#BR1"
+        await reopened.close()
+
+    asyncio.run(main())
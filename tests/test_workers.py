@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.ratelimit import UpstreamUnavailable
+from utils.workers import ParseOverloaded, ParsePool
+
+
+def _blocking_parse(gate: threading.Event, value: str) -> str:
+    gate.wait(5)
+    return value.upper()
+
+
+def test_full_queue_rejects_instead_of_waiting():
+    pool = ParsePool(kind="thread", workers=1, max_pending=2)
+    gate = threading.Event()
+
+    async def main():
+        first = asyncio.create_task(pool.run(_blocking_parse, gate, "a"))
+        second = asyncio.create_task(pool.run(_blocking_parse, gate, "b"))
+        await asyncio.sleep(0)
+        assert pool.pending == 2
+
+        with pytest.raises(ParseOverloaded) as exc:
+            await pool.run(_blocking_parse, gate, "c")
+        # mesmo caminho de "tente mais tarde" dos upstreams
+        assert isinstance(exc.value, UpstreamUnavailable)
+
+        gate.set()
+        assert await asyncio.gather(first, second) == ["A", "B"]
+        assert await pool.run(_blocking_parse, gate, "d") == "D"
+
+    try:
+        asyncio.run(main())
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats["_blocking_parse"]
+    assert (stats.calls, stats.rejected, pool.rejected, pool.pending) == (3, 1, 1, 0)
+    assert stats.wait_max >= 0 and stats.run_max > 0
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Hashable
+
+log = logging.getLogger(__name__)
+
+
+def approx_size(value: Any) -> int:
+    """Tamanho aproximado (bytes) de dicts/listas/strings aninhados."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += approx_size(k) + approx_size(v)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            size += approx_size(v)
+    return size
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    fallbacks: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "stored_at")
+
+    def __init__(self, value: Any, size: int, stored_at: float):
+        self.value = value
+        self.size = size
+        self.stored_at = stored_at
+
+
+class AsyncTTLCache:
+    """
+    Cache em memória com TTL por entrada, despejo LRU (por quantidade e por bytes)
+    e stale-while-revalidate: depois do TTL, a entrada ainda é servida por
+    `stale_ttl` segundos enquanto uma atualização roda em background.
+    Entradas vencidas só saem pelo LRU, servindo de resposta de emergência
+    quando o loader falha com uma das exceções de `fallback_on`.
+    Com `encode`/`decode`, os valores ficam guardados na forma codificada
+    (ex: bytes de services.models) e são decodificados a cada leitura.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        max_entries: int = 1000,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = approx_size,
+        fallback_on: tuple[type[BaseException], ...] = (),
+        encode: Callable[[Any], Any] | None = None,
+        decode: Callable[[Any], Any] | None = None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        # se o loader levantar uma destas, serve a entrada vencida (se ainda existir)
+        self.fallback_on = fallback_on
+        self.encode = encode
+        self.decode = decode
+        self.stats = CacheStats()
+
+        self._data: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.encode is not None:
+            value = self.encode(value)
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # nunca caberia; não vale despejar o cache inteiro por ela
+            self.invalidate(key)
+            return
+
+        self.invalidate(key)
+        self._data[key] = _Entry(value, size, time.monotonic())
+        self._bytes += size
+        self._evict()
+
+    def invalidate(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, entry = self._data.popitem(last=False)
+            self._bytes -= entry.size
+            self.stats.evictions += 1
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Retorna o valor do cache ou chama `loader()`.
+        Resultados None não são guardados (ex: perfil não encontrado).
+        """
+        entry = self._data.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age < self.ttl:
+                self._data.move_to_end(key)
+                self.stats.hits += 1
+                return self._value(entry)
+
+            if age < self.ttl + self.stale_ttl:
+                self._data.move_to_end(key)
+                self.stats.stale_hits += 1
+                self._schedule_refresh(key, loader)
+                return self._value(entry)
+
+        self.stats.misses += 1
+        try:
+            value = await loader()
+        except self.fallback_on:
+            # entradas vencidas ficam no LRU justamente para este caso
+            entry = self._data.get(key)
+            if entry is None:
+                raise
+            self.stats.fallbacks += 1
+            return self._value(entry)
+
+        if value is not None:
+            self.set(key, value)
+        else:
+            self.invalidate(key)
+        return value
+
+    def _value(self, entry: _Entry) -> Any:
+        return entry.value if self.decode is None else self.decode(entry.value)
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._refreshing[key] = task
+
+    async def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            value = await loader()
+            self.stats.refreshes += 1
+            if value is not None:
+                self.set(key, value)
+        except Exception:
+            self.stats.refresh_errors += 1
+            log.warning("atualização em background falhou", exc_info=True, extra={"key": repr(key)})
+        finally:
+            self._refreshing.pop(key, None)
+
+
+@dataclass
+class NegativeStats:
+    not_found_hits: int = 0
+    error_hits: int = 0
+    not_found_stored: int = 0
+    errors_stored: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class NegativeCache:
+    """
+    Lembra por pouco tempo que uma chave não existe (NOT_FOUND) ou que o
+    upstream falhou ao buscá-la (ERROR), para o mesmo typo repetido não
+    refazer o scrape inteiro nem o laço de retentativas. Erro dura bem menos
+    que "não encontrado": o site pode voltar a qualquer momento.
+    """
+
+    NOT_FOUND = "not_found"
+    ERROR = "error"
+
+    def __init__(self, *, not_found_ttl: float = 600.0, error_ttl: float = 30.0, max_entries: int = 10000):
+        self.ttls = {self.NOT_FOUND: not_found_ttl, self.ERROR: error_ttl}
+        self.max_entries = max_entries
+        self.stats = NegativeStats()
+        self._data: OrderedDict[Hashable, tuple[str, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> tuple[str, float] | None:
+        """(tipo, segundos restantes) se a chave ainda está marcada, senão None."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        kind, expires_at = entry
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            del self._data[key]
+            return None
+
+        if kind == self.NOT_FOUND:
+            self.stats.not_found_hits += 1
+        else:
+            self.stats.error_hits += 1
+        return kind, remaining
+
+    def remember(self, key: Hashable, kind: str) -> None:
+        self._data.pop(key, None)
+        self._data[key] = (kind, time.monotonic() + self.ttls[kind])
+        if kind == self.NOT_FOUND:
+            self.stats.not_found_stored += 1
+        else:
+            self.stats.errors_stored += 1
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def forget(self, key: Hashable) -> None:
+        self._data.pop(key, None)
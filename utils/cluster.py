@@ -0,0 +1,52 @@
+import os
+from dataclasses import dataclass
+
+
+def _int_list(value: str | None) -> list[int] | None:
+    if not value:
+        return None
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+@dataclass(frozen=True)
+class ClusterConfig:
+    """
+    Posição deste processo no cluster (preenchida pelo supervisor em cluster.py).
+    Sem as variáveis, o bot roda sozinho e o discord.py escolhe os shards.
+    """
+    cluster_id: int = 0
+    workers: int = 1
+    shard_ids: list[int] | None = None
+    shard_count: int | None = None
+
+    @classmethod
+    def from_env(cls) -> "ClusterConfig":
+        return cls(
+            cluster_id=int(os.getenv("DPPGG_CLUSTER_ID", "0")),
+            workers=int(os.getenv("DPPGG_CLUSTER_WORKERS", "1")),
+            shard_ids=_int_list(os.getenv("DPPGG_SHARD_IDS")),
+            shard_count=int(os.getenv("DPPGG_SHARD_COUNT")) if os.getenv("DPPGG_SHARD_COUNT") else None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Há outros processos do bot mexendo nos mesmos dados."""
+        return self.workers > 1
+
+    @property
+    def primary(self) -> bool:
+        """Só o primário roda tarefas globais (poll de patch, índice de times, sync de comandos)."""
+        return self.cluster_id == 0
+
+    def share(self, rate: float, burst: int) -> tuple[float, int]:
+        """
+        Fatia deste processo de um limite por host (req/s, rajada): cada worker tem
+        o seu próprio HostGuard, então N workers com o limite inteiro mandariam N vezes
+        a taxa. A rajada não desce de 1, então a soma dela pode passar um pouco do total.
+        """
+        if not self.enabled:
+            return rate, burst
+        return rate / self.workers, max(1, burst // self.workers)
+
+
+CLUSTER = ClusterConfig.from_env()
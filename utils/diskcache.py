@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any
+
+from utils.logging_segup import METRICS
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.getenv("DPPGG_CACHE_PATH", "dppgg-cache.db")
+DEFAULT_MAX_BYTES = int(os.getenv("DPPGG_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# por quanto tempo cada namespace fica guardado em disco (segundos).
+# quem lê decide com `max_age` se o dado ainda serve como "fresco";
+# o resto da retenção é resposta de emergência quando o upstream cai.
+NAMESPACE_TTLS = {
+    "profile": 60 * 60,
+    "team": 24 * 60 * 60,
+    "patch": 24 * 60 * 60,
+    # validadores HTTP (ETag/Last-Modified) + resultado parseado por URL
+    "conditional": 7 * 24 * 60 * 60,
+    # artigo de patch parseado, por href; o texto praticamente não muda depois de publicado
+    "patch-article": 30 * 24 * 60 * 60,
+    # time parseado por "título@revid": a mesma revisão nunca é parseada duas vezes
+    "team-rev": 30 * 24 * 60 * 60,
+    # índices das seções lidas de cada "título@revid" (evita repetir o prop=sections)
+    "team-sections": 30 * 24 * 60 * 60,
+    # índice de títulos de times da Liquipedia (reconstruído em background)
+    "team-index": 7 * 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    ns          TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    value       BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    stored_at   REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (ns, key)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires_at);
+"""
+
+
+@dataclass
+class DiskCacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class DiskCache:
+    """
+    Cache persistente (SQLite em WAL + zlib) para dicts já parseados.
+    Sobrevive a restart/deploy e pode ser aberto por vários processos do bot
+    ao mesmo tempo: leitores não bloqueiam, escritas usam BEGIN IMMEDIATE.
+    O tamanho total é limitado por `max_bytes` (despeja os menos acessados).
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: dict[str, float] | None = None,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = {**NAMESPACE_TTLS, **(ttls or {})}
+        self.stats = DiskCacheStats()
+
+        self._conn: sqlite3.Connection | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diskcache")
+        self._writes_since_evict = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+    @staticmethod
+    def decode(blob: bytes) -> Any:
+        return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+    def get_sync(self, ns: str, key: str, max_age: float | None = None) -> Any:
+        now = time.time()
+        row = self._db().execute(
+            "SELECT value, stored_at, expires_at, accessed_at FROM entries WHERE ns = ? AND key = ?",
+            (ns, key),
+        ).fetchone()
+        if row is None or row[2] <= now or (max_age is not None and now - row[1] > max_age):
+            self.stats.misses += 1
+            return None
+
+        # evita uma escrita por leitura: só atualiza o LRU de minuto em minuto
+        if now - row[3] > 60:
+            self._db().execute(
+                "UPDATE entries SET accessed_at = ? WHERE ns = ? AND key = ?", (now, ns, key)
+            )
+        self.stats.hits += 1
+        return self.decode(row[0])
+
+    def set_sync(self, ns: str, key: str, value: Any, ttl: float | None = None) -> None:
+        blob = self.encode(value)
+        now = time.time()
+        ttl = ttl if ttl is not None else self.ttls.get(ns, DEFAULT_TTL)
+        conn = self._db()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO entries (ns, key, value, size, stored_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(ns, key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "stored_at = excluded.stored_at, expires_at = excluded.expires_at, "
+                "accessed_at = excluded.accessed_at",
+                (ns, key, blob, len(blob), now, now + ttl, now),
+            )
+        self.stats.writes += 1
+
+        self._writes_since_evict += 1
+        if self._writes_since_evict >= 50:
+            self._writes_since_evict = 0
+            self.evict_sync()
+
+    def delete_sync(self, ns: str, key: str) -> None:
+        self._db().execute("DELETE FROM entries WHERE ns = ? AND key = ?", (ns, key))
+
+    def evict_sync(self) -> None:
+        conn = self._db()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+            evicted = max(cur.rowcount, 0)
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            while total > self.max_bytes:
+                rows = conn.execute(
+                    "SELECT ns, key, size FROM entries ORDER BY accessed_at LIMIT 100"
+                ).fetchall()
+                if not rows:
+                    break
+                conn.executemany("DELETE FROM entries WHERE ns = ? AND key = ?", [(r[0], r[1]) for r in rows])
+                total -= sum(r[2] for r in rows)
+                evicted += len(rows)
+        self.stats.evictions += evicted
+
+    async def get(self, ns: str, key: str, *, max_age: float | None = None) -> Any:
+        try:
+            return await self._run(self.get_sync, ns, key, max_age)
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            # cache corrompido/ocupado nunca derruba o comando
+            log.warning("leitura do cache em disco falhou", extra={"ns": ns, "key": key, "error": repr(e)})
+            return None
+
+    async def set(self, ns: str, key: str, value: Any, *, ttl: float | None = None) -> None:
+        try:
+            await self._run(self.set_sync, ns, key, value, ttl)
+        except sqlite3.Error as e:
+            log.warning("escrita no cache em disco falhou", extra={"ns": ns, "key": key, "error": repr(e)})
+
+    async def delete(self, ns: str, key: str) -> None:
+        try:
+            await self._run(self.delete_sync, ns, key)
+        except sqlite3.Error:
+            pass
+
+    async def close(self) -> None:
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(_close)
+
+
+DISK_CACHE = DiskCache()
+METRICS.watch_stats("dppgg_disk_cache", {}, DISK_CACHE.stats)
@@ -0,0 +1,193 @@
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from bs4 import Tag
+
+
+def text(sep: str = " ") -> Callable[["Tag"], str]:
+    """Getter padrão dos campos: o texto do elemento, como get_text(sep, strip=True)."""
+    return lambda el: el.get_text(sep, strip=True)
+
+
+@dataclass(frozen=True)
+class Select:
+    """
+    Seletor de elemento. `cls` é uma regex buscada em cada classe (como
+    class_=re.compile(...) no bs4); em `attrs`, cada valor é uma regex buscada
+    no atributo, ou None quando basta o atributo existir.
+    """
+    tag: str | None = None
+    cls: str | None = None
+    attrs: dict[str, str | None] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    Um valor do registro: o primeiro elemento que casa com `select` (com uma
+    tupla de seletores, vale o primeiro seletor que casar, não o primeiro no
+    documento) passa por `get`. Valor vazio ("" ou None) vira `default`.
+    """
+    name: str
+    select: Select | tuple[Select, ...]
+    get: Callable[["Tag"], Any] = text()
+    default: Any = None
+
+
+@dataclass(frozen=True)
+class Group:
+    """
+    Elementos repetidos (ou seções) que viram registros com campos próprios.
+    Campos e subgrupos só enxergam os descendentes do elemento do registro.
+    Registros sem algum campo de `require` são descartados e não contam em
+    `limit`; `build` transforma o dict do registro no valor final.
+    """
+    name: str
+    select: Select | None = None
+    fields: tuple[Field, ...] = ()
+    groups: tuple["Group", ...] = ()
+    limit: int | None = None
+    require: tuple[str, ...] = ()
+    build: Callable[[dict], Any] | None = None
+
+
+def _compile_select(sel: Select) -> Callable[["Tag"], bool]:
+    name = sel.tag
+    cls_re = re.compile(sel.cls, re.I) if sel.cls else None
+    attrs = [(k, re.compile(v, re.I) if v is not None else None) for k, v in sel.attrs.items()]
+
+    def match(tag: "Tag") -> bool:
+        if name is not None and tag.name != name:
+            return False
+        if cls_re is not None:
+            classes = tag.get("class") or ()
+            if not any(cls_re.search(c) for c in classes) and not (
+                len(classes) > 1 and cls_re.search(" ".join(classes))
+            ):
+                return False
+        for key, pattern in attrs:
+            value = tag.get(key)
+            if value is None:
+                return False
+            if pattern is not None:
+                if isinstance(value, list):
+                    value = " ".join(value)
+                if not pattern.search(value):
+                    return False
+        return True
+
+    return match
+
+
+class _CompiledField:
+    __slots__ = ("name", "matchers", "get", "default")
+
+    def __init__(self, spec: Field):
+        selects = spec.select if isinstance(spec.select, tuple) else (spec.select,)
+        self.name = spec.name
+        self.matchers = [_compile_select(s) for s in selects]
+        self.get = spec.get
+        self.default = spec.default
+
+
+class _CompiledGroup:
+    __slots__ = ("name", "match", "fields", "groups", "limit", "require", "build")
+
+    def __init__(self, spec: Group):
+        self.name = spec.name
+        self.match = _compile_select(spec.select) if spec.select is not None else None
+        self.fields = [_CompiledField(f) for f in spec.fields]
+        self.groups = [_CompiledGroup(g) for g in spec.groups]
+        self.limit = spec.limit
+        self.require = spec.require
+        self.build = spec.build
+
+
+class _Frame:
+    """Registro aberto durante a passada: o melhor candidato de cada campo e os subgrupos."""
+    __slots__ = ("group", "found", "pending", "children", "counts", "open")
+
+    def __init__(self, group: _CompiledGroup):
+        self.group = group
+        # campo -> (prioridade do seletor, elemento)
+        self.found: dict[str, tuple[int, "Tag"]] = {}
+        self.pending = list(group.fields)
+        self.children: dict[str, list] = {g.name: [] for g in group.groups}
+        self.counts: dict[str, int] = {g.name: 0 for g in group.groups}
+        self.open: set[str] = set()
+
+    def offer(self, tag: "Tag") -> None:
+        done = []
+        for f in self.pending:
+            best = self.found.get(f.name)
+            # candidatos de prioridade pior que o já achado não precisam ser testados
+            upto = best[0] if best else len(f.matchers)
+            for priority in range(upto):
+                if f.matchers[priority](tag):
+                    self.found[f.name] = (priority, tag)
+                    if priority == 0:
+                        done.append(f)
+                    break
+        for f in done:
+            self.pending.remove(f)
+
+    def finish(self) -> Any:
+        record = {}
+        for f in self.group.fields:
+            hit = self.found.get(f.name)
+            value = f.get(hit[1]) if hit else None
+            record[f.name] = f.default if value is None or value == "" else value
+        record.update(self.children)
+        return self.group.build(record) if self.group.build else record
+
+
+class Extractor:
+    """
+    Spec declarativa compilada uma vez (no import do service) e aplicada numa
+    única passada pela árvore: cada elemento é testado contra os campos e
+    subgrupos dos registros abertos, sem um find() por campo.
+    """
+
+    def __init__(self, spec: Group):
+        self.spec = spec
+        self._root = _CompiledGroup(spec)
+
+    def extract(self, root: "Tag", *, limits: dict[str, int] | None = None) -> Any:
+        """`limits` troca o `limit` de grupos pelo nome (ex: {"matches": 20})."""
+        limits = limits or {}
+        top = _Frame(self._root)
+        self._walk(root, [top], limits)
+        return top.finish()
+
+    def _walk(self, node: "Tag", frames: list[_Frame], limits: dict[str, int]) -> None:
+        for child in node.children:
+            # textos e comentários não têm nome de tag
+            if child.name is None:
+                continue
+
+            opened = []
+            for frame in frames:
+                if frame.pending:
+                    frame.offer(child)
+                for group in frame.group.groups:
+                    if group.name in frame.open:
+                        continue
+                    limit = limits.get(group.name, group.limit)
+                    if limit is not None and frame.counts[group.name] >= limit:
+                        continue
+                    if group.match(child):
+                        opened.append((frame, _Frame(group)))
+
+            if opened:
+                for parent, frame in opened:
+                    parent.open.add(frame.group.name)
+                self._walk(child, frames + [f for _, f in opened], limits)
+                for parent, frame in opened:
+                    parent.open.discard(frame.group.name)
+                    if all(name in frame.found for name in frame.group.require):
+                        parent.children[frame.group.name].append(frame.finish())
+                        parent.counts[frame.group.name] += 1
+            elif child.contents:
+                self._walk(child, frames, limits)
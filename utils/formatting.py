@@ -21,3 +21,28 @@ def rank_color(rank_name):
             return color
 
     return discord.Color.default()
+
+TIER_ORDER = ["iron", "bronze", "silver", "gold", "platinum", "emerald", "diamond", "master", "grandmaster", "challenger"]
+DIVISIONS = {"iv": 0, "iii": 1, "ii": 2, "i": 3, "4": 0, "3": 1, "2": 2, "1": 3}
+
+
+def rank_score(rank_name, lp=None) -> int:
+    """
+    Pontuação ordenável de um elo: tier, divisão e PDL ("Gold II", "45").
+    Unranked (ou texto desconhecido) vale -1.
+    """
+    parts = (rank_name or "").lower().split()
+    if not parts or parts[0] not in TIER_ORDER:
+        return -1
+
+    # Master+ passa fácil de 400 PDL: cada tier ganha uma faixa bem larga
+    score = TIER_ORDER.index(parts[0]) * 10000
+    # Master+ não tem divisão: só o PDL separa os jogadores
+    if len(parts) > 1:
+        score += DIVISIONS.get(parts[1], 0) * 100
+
+    try:
+        score += int(lp)
+    except (TypeError, ValueError):
+        pass
+    return score
@@ -0,0 +1,401 @@
+import html as _html
+import os
+import re
+from bisect import bisect_right
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # o bs4 só é importado no primeiro parse (ver make_soup): deixa o boot mais rápido
+    from bs4 import BeautifulSoup
+
+# "lxml" é bem mais rápido que o html.parser; sem lxml instalado caímos no parser da stdlib
+_PREFERRED_BACKEND = os.getenv("DPPGG_HTML_PARSER", "lxml")
+_backend: str | None = None
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+_HIDDEN_BLOCK_RE = re.compile(
+    r"<!--.*?-->|<(script|style|template)\b[^>]*>.*?</\1\s*>",
+    re.I | re.S,
+)
+# mesmos blocos, mas aceitando um bloco sem fechamento no fim do buffer (leitura em streaming)
+_HIDDEN_OPEN_RE = re.compile(
+    r"<!--.*?(?:-->|\Z)|<(script|style|template)\b[^>]*>.*?(?:</\1\s*>|\Z)",
+    re.I | re.S,
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+_BLANK_LINES_RE = re.compile(r"\s*\n\s*")
+_TAG_PAIR_RE: dict[str, re.Pattern] = {}
+
+
+def parser_backend() -> str:
+    global _backend
+    if _backend is None:
+        _backend = "html.parser"
+        if _PREFERRED_BACKEND == "lxml":
+            try:
+                import lxml  # noqa: F401
+                _backend = "lxml"
+            except ImportError:
+                pass
+    return _backend
+
+
+def make_soup(markup: str) -> "BeautifulSoup":
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, parser_backend())
+
+
+def warm_up() -> str:
+    """Importa o bs4 e o backend de parse antes do primeiro comando precisar deles."""
+    make_soup("")
+    return parser_backend()
+
+
+def open_tag(tag: str, attr_pattern: str = "") -> re.Pattern:
+    """
+    Regex para a abertura de uma tag, ex:
+    open_tag("div", class_contains("mainRankingDescriptionText"))
+    """
+    return re.compile(rf"<(?P<tag>{tag})\b[^>]*?{attr_pattern}", re.I)
+
+
+def class_contains(name: str) -> str:
+    # `name` é um trecho de regex buscado dentro do atributo class (como class_=re.compile(name))
+    return rf"""\bclass\s*=\s*["'][^"']*?{name}"""
+
+
+def attr_equals(attr: str, value: str) -> str:
+    return rf"""\b{attr}\s*=\s*["']{re.escape(value)}["']"""
+
+
+class HiddenRanges:
+    """
+    Trechos de comentários/scripts/estilos do HTML bruto. Uma tag que começa
+    dentro deles é texto para o navegador (e para o BeautifulSoup), então a
+    busca por regex tem que ignorá-la.
+    """
+    __slots__ = ("starts", "ends", "scanned")
+
+    def __init__(self):
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.scanned = 0
+
+    @classmethod
+    def of(cls, markup: str) -> "HiddenRanges":
+        ranges = cls()
+        ranges.extend(markup)
+        return ranges
+
+    def extend(self, markup: str) -> None:
+        """
+        Continua a varredura de onde parou (o buffer só cresce). Um bloco que
+        ficou aberto no fim do buffer anterior é varrido de novo desde o início,
+        e uma abertura cortada ao meio ("<scr") desde o último "<".
+        """
+        pos = self.resume_point(markup)
+        if self.ends and self.ends[-1] >= self.scanned:
+            self.ends.pop()
+            self.starts.pop()
+        for m in _HIDDEN_OPEN_RE.finditer(markup, pos):
+            self.starts.append(m.start())
+            self.ends.append(m.end())
+        self.scanned = len(markup)
+
+    def resume_point(self, markup: str) -> int:
+        """De onde a próxima extend() volta a varrer (o texto antes disso pode ser descartado)."""
+        if self.ends and self.ends[-1] >= self.scanned:
+            return self.starts[-1]
+        last_end = self.ends[-1] if self.ends else 0
+        lt = markup.rfind("<", last_end, self.scanned)
+        return lt if lt != -1 else self.scanned
+
+    def trim(self, cut: int) -> None:
+        """O buffer perdeu os primeiros `cut` caracteres: desloca as posições."""
+        i = bisect_right(self.ends, cut)
+        self.starts = [s - cut for s in self.starts[i:]]
+        self.ends = [e - cut for e in self.ends[i:]]
+        self.scanned -= cut
+
+    def skip(self, pos: int) -> int:
+        """Fim do bloco oculto que contém `pos`, ou -1 se `pos` está visível."""
+        i = bisect_right(self.starts, pos) - 1
+        if i >= 0 and pos < self.ends[i]:
+            return self.ends[i]
+        return -1
+
+    def start_of(self, pos: int) -> int:
+        """Início do bloco oculto que contém `pos`, ou -1 se `pos` está visível."""
+        i = bisect_right(self.starts, pos) - 1
+        if i >= 0 and pos < self.ends[i]:
+            return self.starts[i]
+        return -1
+
+
+def element_spans(
+    markup: str,
+    pattern: re.Pattern,
+    *,
+    limit: int | None = None,
+    start: int = 0,
+    end: int | None = None,
+    hidden: HiddenRanges | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Localiza elementos no HTML bruto (sem montar árvore) e devolve (início, fim)
+    de cada um, já incluindo a tag de fechamento correspondente. Tags dentro de
+    comentários/scripts/estilos são ignoradas; quem busca vários padrões no
+    mesmo HTML pode passar `hidden` (HiddenRanges.of(markup)) para varrer uma vez só.
+    """
+    end = len(markup) if end is None else end
+    hidden = HiddenRanges.of(markup) if hidden is None else hidden
+    spans: list[tuple[int, int]] = []
+    pos = start
+
+    while pos < end and (limit is None or len(spans) < limit):
+        m = pattern.search(markup, pos, end)
+        if not m:
+            break
+
+        skip_to = hidden.skip(m.start())
+        if skip_to != -1:
+            pos = skip_to
+            continue
+
+        tag = m.group("tag").lower()
+        gt = markup.find(">", m.end())
+        if gt == -1 or gt >= end:
+            spans.append((m.start(), end))
+            break
+
+        if tag in _VOID_TAGS or markup[gt - 1] == "/":
+            spans.append((m.start(), gt + 1))
+            pos = gt + 1
+            continue
+
+        close = _matching_close(markup, tag, gt + 1, end, hidden)
+        spans.append((m.start(), close))
+        pos = close
+
+    return spans
+
+
+def _matching_close(markup: str, tag: str, pos: int, end: int, hidden: HiddenRanges) -> int:
+    close, _, _ = _scan_close(markup, tag, pos, end, hidden, 1)
+    return close if close != -1 else end
+
+
+def _scan_close(markup: str, tag: str, pos: int, end: int, hidden: HiddenRanges, depth: int) -> tuple[int, int, int]:
+    """
+    Procura o fechamento que zera `depth`. Devolve (fim do fechamento ou -1,
+    posição de onde retomar, profundidade), para continuar quando chegar mais texto.
+    """
+    pattern = _TAG_PAIR_RE.get(tag)
+    if pattern is None:
+        pattern = _TAG_PAIR_RE[tag] = re.compile(rf"<(/?){tag}\b[^>]*>", re.I)
+
+    while True:
+        m = pattern.search(markup, pos, end)
+        if not m:
+            return -1, _resume_point(markup, pos, end), depth
+        skip_to = hidden.skip(m.start())
+        if skip_to != -1:
+            pos = skip_to
+            continue
+        depth += -1 if m.group(1) else 1
+        pos = m.end()
+        if depth == 0:
+            return pos, pos, 0
+
+
+def _resume_point(markup: str, pos: int, end: int) -> int:
+    # uma tag cortada no fim do buffer ("<di", "</tab") só casa quando o resto chegar
+    lt = markup.rfind("<", pos, end)
+    if lt != -1 and markup.find(">", lt, end) == -1:
+        return lt
+    return end
+
+
+class _Watch:
+    __slots__ = ("pattern", "inside", "state", "pos", "body", "tag", "depth", "close_end")
+
+    def __init__(self, pattern: re.Pattern, inside: "_Watch | None"):
+        self.pattern = pattern
+        self.inside = inside
+        self.state = StreamScanner.SEARCHING
+        self.pos = 0
+        self.body: int | None = None
+        self.tag = ""
+        self.depth = 0
+        self.close_end = 0
+
+
+class StreamScanner:
+    """
+    Acompanha um HTML que chega em pedaços (predicados de read_text) sem
+    reescanear o que já passou: cada elemento vigiado retoma a busca (da
+    abertura, e depois do fechamento correspondente) de onde parou, e só fica
+    em memória a janela do texto que ainda pode conter algo procurado.
+    Tags dentro de comentários/scripts/estilos são ignoradas, como em element_spans.
+    """
+    SEARCHING, OPEN, DONE, MISSING = range(4)
+
+    # texto visível guardado entre pedaços, para achar um padrão que ficou dividido
+    TEXT_TAIL = 256
+
+    def __init__(self, *, text_patterns: tuple[re.Pattern, ...] = ()):
+        self.window = ""
+        self.hidden = HiddenRanges()
+        self._watches: dict[str, _Watch] = {}
+        self._text_patterns = text_patterns
+        self._text_pos = 0
+        self._text_tail = ""
+        self._matched: set[re.Pattern] = set()
+
+    def watch(self, name: str, pattern: re.Pattern, *, inside: str | None = None) -> None:
+        """Vigia o primeiro elemento de `pattern` (com `inside`, o primeiro dentro daquele elemento)."""
+        self._watches[name] = _Watch(pattern, self._watches[inside] if inside else None)
+
+    def done(self, name: str) -> bool:
+        """O elemento já fechou (ou é vazio, como <img>)."""
+        return self._watches[name].state == self.DONE
+
+    def missing(self, name: str) -> bool:
+        """O elemento de fora fechou sem conter este."""
+        return self._watches[name].state == self.MISSING
+
+    def matched(self, pattern: re.Pattern) -> bool:
+        """`pattern` (de text_patterns) já apareceu no texto visível."""
+        return pattern in self._matched
+
+    def feed(self, piece: str) -> None:
+        self.window += piece
+        self.hidden.extend(self.window)
+        for w in self._watches.values():
+            self._advance(w)
+        if self._text_patterns:
+            self._scan_text()
+        self._trim()
+
+    def _advance(self, w: _Watch) -> None:
+        markup = self.window
+        if w.state == self.SEARCHING:
+            start, end = w.pos, len(markup)
+            outer = w.inside
+            if outer is not None:
+                if outer.body is None:
+                    return
+                start = max(start, outer.body)
+                if outer.state == self.DONE:
+                    end = outer.close_end
+
+            while True:
+                m = w.pattern.search(markup, start, end)
+                if not m:
+                    if outer is not None and outer.state == self.DONE:
+                        w.state = self.MISSING
+                    else:
+                        w.pos = _resume_point(markup, start, end)
+                    return
+                skip_to = self.hidden.skip(m.start())
+                if skip_to == -1:
+                    break
+                start = skip_to
+
+            gt = markup.find(">", m.end(), end)
+            if gt == -1:
+                w.pos = m.start()
+                return
+            w.body = gt + 1
+            w.tag = m.group("tag").lower()
+            if w.tag in _VOID_TAGS or markup[gt - 1] == "/":
+                w.state, w.close_end = self.DONE, gt + 1
+                return
+            w.state, w.pos, w.depth = self.OPEN, gt + 1, 1
+
+        if w.state == self.OPEN:
+            close, w.pos, w.depth = _scan_close(markup, w.tag, w.pos, len(markup), self.hidden, w.depth)
+            if close != -1:
+                w.state, w.close_end = self.DONE, close
+
+    def _scan_text(self) -> None:
+        markup = self.window
+        # corta antes do último "<" (nenhuma tag ou entidade pela metade) e antes
+        # de um bloco oculto ainda aberto
+        cut = markup.rfind("<", self._text_pos)
+        if cut <= self._text_pos:
+            return
+        block = self.hidden.start_of(cut)
+        if block != -1:
+            cut = block
+        if cut <= self._text_pos:
+            return
+
+        text = self._text_tail + "\n" + visible_text(markup[self._text_pos:cut])
+        for pattern in self._text_patterns:
+            if pattern not in self._matched and pattern.search(text):
+                self._matched.add(pattern)
+        self._text_tail = text[-self.TEXT_TAIL:]
+        self._text_pos = cut
+
+    def _trim(self) -> None:
+        keep = self.hidden.resume_point(self.window)
+        if self._text_patterns:
+            keep = min(keep, self._text_pos)
+        for w in self._watches.values():
+            if w.state in (self.SEARCHING, self.OPEN) and (w.inside is None or w.inside.body is not None):
+                keep = min(keep, w.pos)
+        # só corta quando vale a cópia: a janela ao menos cai pela metade
+        if keep <= 0 or keep * 2 < len(self.window):
+            return
+
+        self.window = self.window[keep:]
+        self.hidden.trim(keep)
+        self._text_pos -= keep
+        for w in self._watches.values():
+            w.pos -= keep
+            w.close_end -= keep
+            if w.body is not None:
+                w.body -= keep
+
+
+def join_spans(markup: str, spans: list[tuple[int, int]]) -> str:
+    """Concatena os trechos em ordem de documento, descartando os que estão contidos em outros."""
+    parts: list[str] = []
+    last_end = -1
+    for s, e in sorted(spans):
+        if e <= last_end:
+            continue
+        s = max(s, last_end)
+        parts.append(markup[s:e])
+        last_end = e
+    return "\n".join(parts)
+
+
+def first_inside(markup: str, outer: re.Pattern, inner: re.Pattern, *, hidden: HiddenRanges | None = None) -> str:
+    """
+    Trecho com a abertura de `outer`, o primeiro `inner` dentro dele e o fechamento,
+    para que outer.find(inner) continue funcionando sem copiar o elemento inteiro.
+    """
+    hidden = HiddenRanges.of(markup) if hidden is None else hidden
+    outer_spans = element_spans(markup, outer, limit=1, hidden=hidden)
+    if not outer_spans:
+        return ""
+    s, e = outer_spans[0]
+    gt = markup.find(">", s) + 1
+    inner_spans = element_spans(markup, inner, limit=1, start=gt, end=e, hidden=hidden)
+    tag = outer.search(markup, s).group("tag")
+    body = "".join(markup[a:b] for a, b in inner_spans)
+    return f"{markup[s:gt]}{body}</{tag}>"
+
+
+def visible_text(markup: str) -> str:
+    """
+    Equivalente barato a BeautifulSoup(markup).get_text("\\n", strip=True):
+    ignora comentários/scripts/estilos e remove as tags direto na string.
+    """
+    text = _HIDDEN_BLOCK_RE.sub("", markup)
+    text = _TAG_RE.sub("\n", text)
+    text = _html.unescape(text)
+    return _BLANK_LINES_RE.sub("\n", text).strip()
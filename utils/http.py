@@ -0,0 +1,249 @@
+import asyncio
+import codecs
+import logging
+import os
+import time
+import aiohttp
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Callable
+from urllib.parse import urlsplit, urlunsplit
+
+from utils.cluster import CLUSTER
+from utils.logging_segup import METRICS, UPSTREAM_REJECTED, UPSTREAM_SECONDS, UPSTREAM_WAIT_SECONDS
+from utils.ratelimit import CircuitBreaker, HostGuard, UpstreamUnavailable
+
+log = logging.getLogger(__name__)
+
+# manda todo tráfego upstream para outro servidor (ex: o stand-in de benchmarks/standin.py)
+UPSTREAM_OVERRIDE = os.getenv("DPPGG_UPSTREAM_URL") or None
+
+# teto do corpo (já descomprimido) de uma página raspada; acima disso a leitura é abortada
+MAX_BODY_BYTES = int(os.getenv("DPPGG_MAX_BODY_BYTES", str(8 * 1024 * 1024)))
+READ_CHUNK = 64 * 1024
+
+
+@dataclass(frozen=True)
+class ServiceProfile:
+    """Headers, timeout e limite de taxa padrão de um serviço upstream."""
+    name: str
+    headers: dict = field(default_factory=dict)
+    timeout: float = 20.0
+    # requisições/s por host e rajada máxima (token bucket); no cluster, o total
+    # de todos os workers (cada processo fica com a sua parte, ver ClusterConfig.share)
+    rate: float = 2.0
+    burst: int = 4
+    # limite a mais, somado ao do host, para uma classe de requisição cara do
+    # mesmo host (ex: action=parse na Liquipedia); requisições com o mesmo
+    # `action` dividem um bucket próprio
+    action: str | None = None
+    action_rate: float | None = None
+    action_burst: int = 1
+    # espera máxima por um token da ação (None: o padrão do HostGuard)
+    action_max_wait: float | None = None
+
+    @property
+    def client_timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=self.timeout)
+
+
+class HttpPool:
+    """
+    Sessão aiohttp compartilhada pelo bot inteiro.
+    Criada no setup_hook e fechada no close(): reaproveita conexões (keep-alive),
+    limita conexões por host e mantém cache de DNS entre os comandos.
+    Toda requisição passa pelo HostGuard do host (rate limit + circuit breaker).
+    Com `upstream`, as URLs vão para esse servidor (mesmo caminho e query),
+    mas limites e estatísticas continuam contados por host original.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_ttl: int = 300,
+        upstream: str | None = UPSTREAM_OVERRIDE,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.upstream = urlsplit(upstream) if upstream else None
+        self._session: aiohttp.ClientSession | None = None
+        self.guards: dict[str, HostGuard] = {}
+
+    async def start(self) -> "HttpPool":
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            METRICS.register_collector(self.collect_metrics)
+        return self
+
+    async def close(self) -> None:
+        METRICS.unregister_collector(self.collect_metrics)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def collect_metrics(self):
+        """HostStats, taxa atual e estado do circuito de cada guard (host ou "host#ação")."""
+        for key, guard in list(self.guards.items()):
+            labels = {"guard": key}
+            stats = guard.stats
+            yield "dppgg_host_requests_total", "counter", labels, stats.requests
+            yield "dppgg_host_throttled_total", "counter", labels, stats.throttled
+            yield "dppgg_host_failures_total", "counter", labels, stats.failures
+            yield "dppgg_host_rejected_total", "counter", labels, stats.rejected
+            yield "dppgg_host_wait_seconds_total", "counter", labels, stats.wait_total
+            yield "dppgg_host_rate", "gauge", labels, guard.bucket.rate
+            yield "dppgg_host_waiting", "gauge", labels, guard.bucket.waiting
+            for state in CircuitBreaker.STATES:
+                yield "dppgg_host_circuit_state", "gauge", {**labels, "state": state}, int(guard.breaker.state == state)
+
+    async def __aenter__(self) -> "HttpPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HttpPool não foi iniciado (chame start()).")
+        return self._session
+
+    def guard(self, host: str, profile: ServiceProfile) -> HostGuard:
+        guard = self.guards.get(host)
+        if guard is None:
+            guard = self.guards[host] = HostGuard(host, *CLUSTER.share(profile.rate, profile.burst))
+        return guard
+
+    def action_guard(self, host: str, profile: ServiceProfile) -> HostGuard | None:
+        if profile.action is None or profile.action_rate is None:
+            return None
+        key = f"{host}#{profile.action}"
+        guard = self.guards.get(key)
+        if guard is None:
+            rate, burst = CLUSTER.share(profile.action_rate, profile.action_burst)
+            if profile.action_max_wait is None:
+                guard = HostGuard(key, rate, burst)
+            else:
+                guard = HostGuard(key, rate, burst, max_wait=profile.action_max_wait)
+            self.guards[key] = guard
+        return guard
+
+    @asynccontextmanager
+    async def request(self, profile: ServiceProfile, method: str, url: str, **kwargs):
+        """
+        Igual a session.request(), mas esperando o token do host antes (e o da
+        ação, se o profile tiver um limite próprio). Levanta UpstreamUnavailable
+        se o circuito do host estiver aberto ou a espera passar do teto.
+        """
+        headers = {**profile.headers, **(kwargs.pop("headers", None) or {})}
+        kwargs.setdefault("timeout", profile.client_timeout)
+
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        guard = self.guard(host, profile)
+        guards = [g for g in (self.action_guard(host, profile), guard) if g is not None]
+        if self.upstream is not None:
+            url = urlunsplit((self.upstream.scheme, self.upstream.netloc, parts.path, parts.query, parts.fragment))
+            headers["X-Upstream-Host"] = host
+
+        queued = time.perf_counter()
+        try:
+            # o da ação primeiro: quem espera por ela não segura um token do host
+            for g in guards:
+                await g.enter()
+        except UpstreamUnavailable as e:
+            UPSTREAM_REJECTED.inc(host=host)
+            log.warning("upstream recusado sem requisição", extra={"host": host, "retry_in": e.retry_in})
+            raise
+        started = time.perf_counter()
+        UPSTREAM_WAIT_SECONDS.observe(started - queued, host=host)
+
+        try:
+            response = await self.session.request(method, url, headers=headers, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, host=host, status="error")
+            log.warning("falha de rede no upstream", extra={"host": host, "error": repr(e)})
+            for g in guards:
+                g.record_error()
+            raise
+
+        elapsed = time.perf_counter() - started
+        UPSTREAM_SECONDS.observe(elapsed, host=host, status=str(response.status))
+        if response.status == 429 or response.status >= 500:
+            log.warning(
+                "upstream respondeu erro",
+                extra={"host": host, "status": response.status, "elapsed_s": elapsed,
+                       "retry_after": response.headers.get("Retry-After")},
+            )
+        for g in guards:
+            g.record_status(response.status, response.headers.get("Retry-After"))
+        async with response:
+            yield response
+
+    def get(self, profile: ServiceProfile, url: str, **kwargs):
+        return self.request(profile, "GET", url, **kwargs)
+
+
+class BodyTooLarge(Exception):
+    """O corpo passou de `max_bytes` antes de a página ficar completa."""
+
+
+async def read_text(
+    response: aiohttp.ClientResponse,
+    *,
+    until: Callable[[str], bool] | None = None,
+    max_bytes: int = MAX_BODY_BYTES,
+) -> str:
+    """
+    Lê o corpo em pedaços, decodificando aos poucos, em vez de response.text().
+    `until` recebe cada pedaço decodificado, em ordem (o predicado guarda o
+    próprio estado, ver utils.html.StreamScanner) e decide se o resto da página
+    é dispensável; se for, a leitura para ali (a conexão é descartada ao sair
+    do `async with`, não volta para o pool). A descompressão (gzip/deflate, e
+    br com o pacote Brotli instalado) é negociada e feita pelo aiohttp.
+    """
+    # Content-Length é o tamanho comprimido: se ele já passa do teto, o corpo também passa
+    if response.content_length is not None and response.content_length > max_bytes:
+        raise BodyTooLarge(f"{response.content_length} bytes em {response.url}")
+
+    try:
+        decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    # os pedaços só viram uma string no fim: somar a cada pedaço seria quadrático
+    parts: list[str] = []
+    received = 0
+    async for chunk in response.content.iter_chunked(READ_CHUNK):
+        received += len(chunk)
+        if received > max_bytes:
+            raise BodyTooLarge(f"mais de {max_bytes} bytes em {response.url}")
+        piece = decoder.decode(chunk)
+        parts.append(piece)
+        if until is not None and until(piece):
+            log.debug("leitura encerrada cedo", extra={"url": str(response.url), "bytes": received})
+            return "".join(parts)
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+@asynccontextmanager
+async def borrow_pool(http: HttpPool | None):
+    # usa o pool injetado; sem ele (scripts, testes manuais) abre um temporário
+    if http is not None:
+        yield http
+        return
+    async with HttpPool() as tmp:
+        yield tmp
@@ -0,0 +1,413 @@
+"""
+Logging estruturado e métricas no formato texto do Prometheus.
+
+    setup_logging()            # uma vez, antes de subir o bot
+    METRICS.counter(...)       # contadores/histogramas usados nos hot paths
+    MetricsExporter().start()  # /metrics local e/ou dump periódico no log
+
+Variáveis de ambiente:
+    DPPGG_LOG_LEVEL       INFO (padrão), DEBUG, WARNING...
+    DPPGG_LOG_FORMAT      "text" (padrão, key=value) ou "json" (uma linha por evento)
+    DPPGG_METRICS_PORT    porta do endpoint /metrics em 127.0.0.1 (desligado se vazio)
+    DPPGG_METRICS_DUMP    intervalo em segundos do dump das métricas no log (0 = nunca)
+"""
+import asyncio
+import bisect
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from typing import Callable, Iterable
+
+LOG_LEVEL = os.getenv("DPPGG_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("DPPGG_LOG_FORMAT", "text")
+METRICS_PORT = int(os.getenv("DPPGG_METRICS_PORT") or 0)
+METRICS_DUMP_INTERVAL = float(os.getenv("DPPGG_METRICS_DUMP") or 0)
+
+# segundos; cobre de cache em memória (~1ms) até scrape com Retry-After (~30s)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+# ---------- logging ----------
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Campos passados em `extra=` viram pares chave=valor (ou chaves do JSON):
+        log.info("upstream lento", extra={"host": h, "elapsed": 2.3})
+    """
+
+    def __init__(self, fmt: str = LOG_FORMAT):
+        super().__init__()
+        self.json = fmt == "json"
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {k: v for k, v in vars(record).items() if k not in _RESERVED and not k.startswith("_")}
+        ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}"
+
+        if self.json:
+            payload = {"ts": ts, "level": record.levelname, "logger": record.name, "msg": record.getMessage(), **fields}
+            if record.exc_info:
+                payload["exc"] = self.formatException(record.exc_info)
+            return json.dumps(payload, ensure_ascii=False, default=str)
+
+        line = f"{ts} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{k}={_fmt_value(v)}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def _fmt_value(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    text = str(value)
+    return json.dumps(text, ensure_ascii=False) if (" " in text or not text) else text
+
+
+class _StaticFields(logging.Filter):
+    def __init__(self, fields: dict):
+        super().__init__()
+        self.fields = fields
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in self.fields.items():
+            setattr(record, key, value)
+        return True
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, *, static_fields: dict | None = None) -> logging.Handler:
+    """
+    Configura o logger raiz (inclusive o do discord.py) com o formatter estruturado.
+    `static_fields` entram em toda linha (ex: o id do processo no cluster).
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(StructuredFormatter(fmt))
+    if static_fields:
+        handler.addFilter(_StaticFields(static_fields))
+
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+    # o discord.py loga cada evento do gateway em DEBUG; só interessa acima disso
+    logging.getLogger("discord").setLevel(max(logging.INFO, root.level))
+    return handler
+
+
+# ---------- métricas ----------
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels_text(self.labels, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # por label: [contagem por bucket..., soma, total]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels) -> "_Timer":
+        return _Timer(self, labels)
+
+    def snapshot(self, **labels) -> dict:
+        state = self._values.get(self._key(labels))
+        if state is None:
+            return {"count": 0, "sum": 0.0}
+        return {"count": state[-1], "sum": state[-2]}
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-2]):
+                cumulative += count
+                le = 'le="' + _num(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels_text(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.labels, key)} {_num(state[-2])}")
+            lines.append(f"{self.name}_count{_labels_text(self.labels, key)} {state[-1]}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        labels = self.labels
+        if "status" in self.histogram.labels and "status" not in labels:
+            labels = {**labels, "status": "error" if exc_type else "ok"}
+        self.histogram.observe(time.perf_counter() - self.started, **labels)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Registro único das métricas do processo. Além dos contadores/histogramas
+    atualizados nos hot paths, aceita "coletores": funções chamadas só na
+    hora de renderizar, para expor estatísticas que já existem
+    (CacheStats, HostStats, ParseStats...) sem duplicar contagem.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[tuple[str, str, dict, float]]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, labels: Iterable[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"métrica {name} já registrada como {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple[str, str, dict, float]]]) -> None:
+        """`collector()` devolve (nome, tipo, labels, valor) a cada renderização."""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Callable[[], Iterable[tuple[str, str, dict, float]]]) -> None:
+        """Para objetos de vida curta (ex.: um HttpPool fechado) pararem de aparecer."""
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def watch_stats(self, prefix: str, labels: dict, stats) -> None:
+        """
+        Expõe cada campo numérico de um objeto com as_dict() como `<prefix>_<campo>`.
+        Se houver hits/misses, também expõe `<prefix>_hit_ratio`.
+        """
+        def collect():
+            data = stats.as_dict()
+            for field, value in data.items():
+                if isinstance(value, (int, float)):
+                    yield f"{prefix}_{field}", "gauge", labels, value
+            if "hits" in data and "misses" in data:
+                hits = data["hits"] + data.get("stale_hits", 0)
+                total = hits + data["misses"]
+                yield f"{prefix}_hit_ratio", "gauge", labels, hits / total if total else 0.0
+        self.register_collector(collect)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+
+        collected: dict[str, tuple[str, list[str]]] = {}
+        for collector in self._collectors:
+            try:
+                for name, kind, labels, value in collector():
+                    names = tuple(labels)
+                    entry = collected.setdefault(name, (kind, []))
+                    entry[1].append(f"{name}{_labels_text(names, tuple(labels.values()))} {_num(value)}")
+            except Exception:
+                logging.getLogger(__name__).exception("coletor de métricas falhou")
+        for name, (kind, samples) in sorted(collected.items()):
+            lines += [f"# TYPE {name} {kind}", *samples]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+# métricas dos hot paths, compartilhadas pelos módulos
+COMMAND_SECONDS = METRICS.histogram(
+    "dppgg_command_seconds", "Latência dos slash commands, do evento até a conclusão", ("command", "status")
+)
+UPSTREAM_SECONDS = METRICS.histogram(
+    "dppgg_upstream_request_seconds", "Latência das requisições upstream até os headers", ("host", "status")
+)
+UPSTREAM_WAIT_SECONDS = METRICS.histogram(
+    "dppgg_upstream_wait_seconds", "Espera no rate limiter antes da requisição", ("host",)
+)
+UPSTREAM_REJECTED = METRICS.counter(
+    "dppgg_upstream_rejected_total", "Requisições recusadas na hora (circuito aberto ou Retry-After longo)", ("host",)
+)
+UPSTREAM_RETRIES = METRICS.counter(
+    "dppgg_upstream_retries_total", "Retentativas dos services", ("service", "reason")
+)
+PARSE_SECONDS = METRICS.histogram(
+    "dppgg_parse_seconds", "Tempo de parse por extrator (rodando no pool)", ("parser",)
+)
+PARSE_WAIT_SECONDS = METRICS.histogram(
+    "dppgg_parse_wait_seconds", "Espera pela vaga no pool de parse", ("parser",)
+)
+GATEWAY_DELAY_SECONDS = METRICS.histogram(
+    "dppgg_gateway_delay_seconds", "Da criação da interação no Discord até o evento chegar ao bot"
+)
+LOOP_LAG_SECONDS = METRICS.histogram(
+    "dppgg_event_loop_lag_seconds", "Atraso do event loop em relação ao sleep agendado",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+class LoopLagMonitor:
+    """Mede o quanto um sleep curto atrasa: é o tempo que o loop ficou ocupado com outra coisa."""
+
+    def __init__(self, interval: float = 0.5, *, warn_after: float = 0.25):
+        self.interval = interval
+        self.warn_after = warn_after
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        log = logging.getLogger("dppgg.loop")
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            LOOP_LAG_SECONDS.observe(lag)
+            if lag >= self.warn_after:
+                log.warning("event loop travado", extra={"lag_s": lag})
+
+
+class MetricsExporter:
+    """Endpoint GET /metrics em 127.0.0.1 e/ou dump periódico das métricas no log."""
+
+    def __init__(self, registry: MetricsRegistry = METRICS, *, port: int = METRICS_PORT, dump_interval: float = METRICS_DUMP_INTERVAL):
+        self.registry = registry
+        self.port = port
+        self.dump_interval = dump_interval
+        self._runner = None
+        self._dump_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        log = logging.getLogger("dppgg.metrics")
+        if self.port and self._runner is None:
+            from aiohttp import web
+
+            async def metrics(_request):
+                return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8")
+
+            app = web.Application()
+            app.router.add_get("/metrics", metrics)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+            log.info("endpoint de métricas no ar", extra={"url": f"http://127.0.0.1:{self.port}/metrics"})
+
+        if self.dump_interval and self._dump_task is None:
+            self._dump_task = asyncio.create_task(self._dump_loop())
+
+    async def _dump_loop(self) -> None:
+        log = logging.getLogger("dppgg.metrics")
+        while True:
+            await asyncio.sleep(self.dump_interval)
+            log.info("métricas\n%s", self.registry.render())
+
+    async def stop(self) -> None:
+        if self._dump_task is not None:
+            self._dump_task.cancel()
+            self._dump_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
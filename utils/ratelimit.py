@@ -0,0 +1,200 @@
+import asyncio
+import time
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+
+
+class UpstreamUnavailable(Exception):
+    """O circuito do host está aberto: falha rápido em vez de insistir num site fora do ar."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} indisponível; tente novamente em {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket compartilhado por todas as requisições de um host.
+    Cada 429 corta a taxa pela metade e bloqueia o host pelo Retry-After;
+    cada sucesso devolve um pouco da taxa até `max_rate` (AIMD).
+    """
+
+    def __init__(self, rate: float, burst: int, *, min_rate: float | None = None, max_rate: float | None = None):
+        self.max_rate = max_rate or rate
+        self.min_rate = min_rate or rate / 16
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        # chamadas dentro de acquire() (a que tem o lock e as que esperam por ele)
+        self.waiting = 0
+
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def projected_wait(self) -> float:
+        """Quanto um novo acquire() esperaria: o bloqueio mais a fila toda à taxa atual."""
+        now = time.monotonic()
+        blocked = max(0.0, self.blocked_until - now)
+        tokens = min(self.burst, self.tokens + max(0.0, now - self._updated) * self.rate)
+        return blocked + max(0.0, self.waiting + 1 - tokens) / self.rate
+
+    async def acquire(self) -> float:
+        """Espera um token; retorna quanto tempo esperou."""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            # lock: quem chegou primeiro sai primeiro
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self.blocked_until:
+                        await asyncio.sleep(self.blocked_until - now)
+                        continue
+
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return time.monotonic() - started
+
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+    def on_throttled(self, retry_after: float | None) -> None:
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0.0
+        pause = retry_after if retry_after is not None else 1 / self.rate
+        self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+        # não acumula tokens durante o bloqueio
+        self._updated = self.blocked_until
+
+    def on_success(self) -> None:
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    """
+    closed -> open depois de `failure_threshold` falhas seguidas (5xx/timeout/conexão);
+    open -> half-open depois de `reset_timeout`, liberando uma única requisição de teste.
+    """
+    STATES = ("closed", "half-open", "open")
+
+    def __init__(self, host: str, *, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+
+    def before_request(self) -> None:
+        if self.state == "closed":
+            return
+
+        now = time.monotonic()
+        elapsed = now - self.opened_at
+        if self.state == "open" and elapsed >= self.reset_timeout:
+            self.state = "half-open"
+
+        # se a requisição de teste sumiu (cancelada), libera outra depois de um tempo
+        stale_probe = now - self._probe_started > self.reset_timeout
+        if self.state == "half-open" and (not self._probing or stale_probe):
+            self._probing = True
+            self._probe_started = now
+            return
+
+        raise UpstreamUnavailable(self.host, max(0.0, self.reset_timeout - elapsed))
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    throttled: int = 0
+    failures: int = 0
+    rejected: int = 0
+    wait_total: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class HostGuard:
+    """Limiter + circuit breaker de um host upstream."""
+
+    def __init__(self, host: str, rate: float, burst: int, *, max_wait: float = 10.0):
+        self.host = host
+        self.bucket = AdaptiveTokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(host)
+        self.stats = HostStats()
+        # espera máxima por um token (fila + Retry-After): acima disso responde
+        # "tente mais tarde" em vez de segurar o comando
+        self.max_wait = max_wait
+
+    async def enter(self) -> None:
+        try:
+            self.breaker.before_request()
+            projected = self.bucket.projected_wait()
+            if projected > self.max_wait:
+                raise UpstreamUnavailable(self.host, projected)
+            # a projeção vale para a taxa de agora; um 429 no meio da fila corta a
+            # taxa pela metade, então o timeout garante o teto mesmo assim
+            try:
+                async with asyncio.timeout(self.max_wait):
+                    waited = await self.bucket.acquire()
+            except TimeoutError:
+                raise UpstreamUnavailable(self.host, self.bucket.projected_wait()) from None
+        except UpstreamUnavailable:
+            self.stats.rejected += 1
+            raise
+        self.stats.wait_total += waited
+        self.stats.requests += 1
+
+    def record_status(self, status: int, retry_after: str | None = None) -> None:
+        if status == 429:
+            self.stats.throttled += 1
+            self.bucket.on_throttled(parse_retry_after(retry_after))
+            # 429 significa que o host está de pé; não conta para o circuito
+            self.breaker.record_success()
+        elif status >= 500:
+            self.stats.failures += 1
+            self.breaker.record_failure()
+        else:
+            self.bucket.on_success()
+            self.breaker.record_success()
+
+    def record_error(self) -> None:
+        self.stats.failures += 1
+        self.breaker.record_failure()
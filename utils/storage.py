@@ -1,14 +1,585 @@
+import asyncio
+import hashlib
 import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-DEFAULT_PATH = "user_history.json"
+log = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.getenv("DPPGG_DB_PATH", "dppgg.db")
+# formato antigo (um JSON reescrito inteiro a cada /vincular); só lido na migração
+LEGACY_JSON_PATH = "user_history.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_links (
+    user_id   TEXT PRIMARY KEY,
+    region    TEXT NOT NULL,
+    nickname  TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS patch_subscriptions (
+    channel_id TEXT PRIMARY KEY,
+    guild_id   TEXT NOT NULL,
+    created_at REAL NOT NULL
+) WITHOUT ROWID;
+
+-- quem já usou o bot em cada servidor (sem o intent de membros não dá para listar)
+CREATE TABLE IF NOT EXISTS guild_members (
+    guild_id TEXT NOT NULL,
+    user_id  TEXT NOT NULL,
+    seen_at  REAL NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+) WITHOUT ROWID;
+
+-- histórico de partidas só de acréscimo, uma linha por jogo já visto
+CREATE TABLE IF NOT EXISTS match_history (
+    account     TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    data        TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (account, seq),
+    UNIQUE (account, fingerprint)
+) WITHOUT ROWID;
+
+-- agregados por conta, atualizados a cada partida nova (sequência, PDL, campeões)
+CREATE TABLE IF NOT EXISTS match_aggregates (
+    account TEXT PRIMARY KEY,
+    data    TEXT NOT NULL
+) WITHOUT ROWID;
+
+-- último perfil resumido de cada conta vinculada, lido pelo /ranking
+CREATE TABLE IF NOT EXISTS profile_snapshots (
+    account      TEXT PRIMARY KEY,
+    data         TEXT,
+    refreshed_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def connect(path: str = DEFAULT_PATH) -> sqlite3.Connection:
+    """Conexão SQLite em modo WAL (leitores não bloqueiam o escritor e vice-versa)."""
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _migrate_legacy_json(conn: sqlite3.Connection, json_path: str) -> None:
+    done = conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_json_migrated'").fetchone()
+    if done:
+        return
 
-def load_user_history(path: str = DEFAULT_PATH) -> dict:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(json_path, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+        legacy = {}
+
+    now = time.time()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        # no cluster, outro processo pode ter migrado entre a checagem e o lock
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_json_migrated'").fetchone():
+            return
+        conn.executemany(
+            "INSERT OR IGNORE INTO user_links (user_id, region, nickname, updated_at) VALUES (?, ?, ?, ?)",
+            [
+                (str(uid), v["region"], v["nickname"], now)
+                for uid, v in legacy.items()
+                if isinstance(v, dict) and v.get("region") and v.get("nickname")
+            ],
+        )
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('legacy_json_migrated', ?)",
+            (str(len(legacy)),),
+        )
+
+
+def _rows_to_history(rows) -> dict:
+    return {uid: {"region": region, "nickname": nickname} for uid, region, nickname in rows}
+
+
+class _SqliteStore:
+    """Base dos stores: uma conexão por store, usada só pela sua thread dedicada."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError(f"{type(self).__name__} não foi aberto (chame open()).")
+        return self._conn
+
+    def _on_open(self, conn: sqlite3.Connection) -> None:
+        pass
+
+    async def open(self):
+        def _open():
+            if self._conn is None:
+                self._conn = connect(self.path)
+                self._on_open(self._conn)
+        await self._run(_open)
+        return self
+
+    async def close(self) -> None:
+        def _close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(_close)
+        self._executor.shutdown(wait=False)
+
+    async def get_meta(self, key: str) -> str | None:
+        def _get():
+            row = self._db().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+        return await self._run(_get)
+
+    async def set_meta(self, key: str, value: str) -> None:
+        def _set():
+            self._db().execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+        await self._run(_set)
+
+
+class UserStore(_SqliteStore):
+    """
+    Acesso assíncrono aos vínculos Discord -> conta do LoL.
+    Todas as operações rodam numa thread dedicada (uma conexão, sem disputa),
+    e cada /vincular ou /desvincular mexe em uma linha só.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, legacy_json: str = LEGACY_JSON_PATH):
+        super().__init__(path)
+        self.legacy_json = legacy_json
+
+    def _on_open(self, conn: sqlite3.Connection) -> None:
+        _migrate_legacy_json(conn, self.legacy_json)
+
+    async def load_all(self) -> dict:
+        def _load():
+            return _rows_to_history(self._db().execute("SELECT user_id, region, nickname FROM user_links"))
+        return await self._run(_load)
+
+    async def get(self, user_id: str) -> dict | None:
+        def _get():
+            row = self._db().execute(
+                "SELECT region, nickname FROM user_links WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            return {"region": row[0], "nickname": row[1]} if row else None
+        return await self._run(_get)
+
+    async def upsert(self, user_id: str, region: str, nickname: str) -> None:
+        def _upsert():
+            self._db().execute(
+                "INSERT INTO user_links (user_id, region, nickname, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET region = excluded.region, "
+                "nickname = excluded.nickname, updated_at = excluded.updated_at",
+                (user_id, region, nickname, time.time()),
+            )
+        await self._run(_upsert)
+
+    async def delete(self, user_id: str) -> None:
+        def _delete():
+            self._db().execute("DELETE FROM user_links WHERE user_id = ?", (user_id,))
+        await self._run(_delete)
+
+    async def apply_batch(self, changes: dict[str, tuple[str, str] | None]) -> None:
+        """Aplica várias alterações numa transação: (region, nickname) faz upsert, None apaga."""
+        def _apply():
+            now = time.time()
+            upserts = [(uid, v[0], v[1], now) for uid, v in changes.items() if v is not None]
+            deletes = [(uid,) for uid, v in changes.items() if v is None]
+            conn = self._db()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO user_links (user_id, region, nickname, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET region = excluded.region, "
+                    "nickname = excluded.nickname, updated_at = excluded.updated_at",
+                    upserts,
+                )
+                conn.executemany("DELETE FROM user_links WHERE user_id = ?", deletes)
+        await self._run(_apply)
+
+    async def checkpoint(self) -> None:
+        """Compacta o WAL (log só de acréscimo) de volta no arquivo principal."""
+        await self._run(lambda: self._db().execute("PRAGMA wal_checkpoint(TRUNCATE)"))
+
+
+class SubscriptionStore(_SqliteStore):
+    """Canais inscritos para receber as notas de patch automaticamente."""
+
+    async def subscribe(self, channel_id: int, guild_id: int) -> None:
+        def _sub():
+            self._db().execute(
+                "INSERT INTO patch_subscriptions (channel_id, guild_id, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(channel_id) DO NOTHING",
+                (str(channel_id), str(guild_id), time.time()),
+            )
+        await self._run(_sub)
+
+    async def unsubscribe(self, channel_id: int) -> bool:
+        def _unsub():
+            cur = self._db().execute("DELETE FROM patch_subscriptions WHERE channel_id = ?", (str(channel_id),))
+            return cur.rowcount > 0
+        return await self._run(_unsub)
+
+    async def unsubscribe_guild(self, guild_id: int) -> int:
+        def _unsub():
+            cur = self._db().execute("DELETE FROM patch_subscriptions WHERE guild_id = ?", (str(guild_id),))
+            return cur.rowcount
+        return await self._run(_unsub)
+
+    async def channels(self, guild_id: int | None = None) -> list[int]:
+        def _list():
+            if guild_id is None:
+                rows = self._db().execute("SELECT channel_id FROM patch_subscriptions")
+            else:
+                rows = self._db().execute(
+                    "SELECT channel_id FROM patch_subscriptions WHERE guild_id = ?", (str(guild_id),)
+                )
+            return [int(r[0]) for r in rows]
+        return await self._run(_list)
+
+
+class RankingStore(_SqliteStore):
+    """Membros vistos por servidor e o último snapshot de perfil de cada conta."""
+
+    async def add_member(self, guild_id: int, user_id: int) -> None:
+        def _add():
+            self._db().execute(
+                "INSERT INTO guild_members (guild_id, user_id, seen_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(guild_id, user_id) DO UPDATE SET seen_at = excluded.seen_at",
+                (str(guild_id), str(user_id), time.time()),
+            )
+        await self._run(_add)
+
+    async def remove_guild(self, guild_id: int) -> None:
+        def _remove():
+            self._db().execute("DELETE FROM guild_members WHERE guild_id = ?", (str(guild_id),))
+        await self._run(_remove)
+
+    async def members(self, guild_id: int | None = None) -> list[tuple[int, str]]:
+        """(guild_id, user_id) de um servidor ou de todos."""
+        def _list():
+            if guild_id is None:
+                rows = self._db().execute("SELECT guild_id, user_id FROM guild_members")
+            else:
+                rows = self._db().execute(
+                    "SELECT guild_id, user_id FROM guild_members WHERE guild_id = ?", (str(guild_id),)
+                )
+            return [(int(g), u) for g, u in rows]
+        return await self._run(_list)
+
+    async def snapshots(self, accounts: list[str]) -> dict[str, tuple[dict | None, float]]:
+        """account -> (perfil resumido ou None se não existe, refreshed_at)."""
+        def _load():
+            out = {}
+            conn = self._db()
+            # o SQLite limita o número de parâmetros por query
+            for i in range(0, len(accounts), 500):
+                chunk = accounts[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT account, data, refreshed_at FROM profile_snapshots "
+                    f"WHERE account IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for account, data, refreshed_at in rows:
+                    out[account] = (json.loads(data) if data else None, refreshed_at)
+            return out
+        return await self._run(_load)
+
+    async def save_snapshot(self, account: str, data: dict | None) -> None:
+        def _save():
+            self._db().execute(
+                "INSERT INTO profile_snapshots (account, data, refreshed_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(account) DO UPDATE SET data = excluded.data, refreshed_at = excluded.refreshed_at",
+                (account, json.dumps(data, ensure_ascii=False) if data is not None else None, time.time()),
+            )
+        await self._run(_save)
+
+
+# quantas partidas entram no saldo de PDL recente
+LP_WINDOW = 20
+# campos guardados por partida; "date" vem relativo ("2 hours ago") e não serve
+_MATCH_FIELDS = ("match_id", "champion", "result", "mode", "duration", "kda", "lp_change")
+
+
+def match_fingerprint(match: dict) -> str:
+    """Id estável da partida: o link dela quando existe, senão um hash dos campos fixos."""
+    if match.get("match_id"):
+        return f"id:{match['match_id']}"
+    raw = "|".join(str(match.get(k)) for k in ("champion", "result", "mode", "duration", "kda"))
+    return "h:" + hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def empty_aggregates() -> dict:
+    return {
+        "games": 0,
+        "wins": 0,
+        "losses": 0,
+        # positivo = vitórias seguidas, negativo = derrotas seguidas
+        "streak": 0,
+        "lp_window": [],
+        "lp_delta": 0,
+        "champions": {},
+        "updated_at": None,
+    }
+
+
+def apply_match(agg: dict, match: dict) -> None:
+    """Soma uma partida (mais antiga primeiro) nos agregados, em O(1)."""
+    agg["games"] += 1
+    result = (match.get("result") or "").lower()
+    if result == "victory":
+        agg["wins"] += 1
+        agg["streak"] = agg["streak"] + 1 if agg["streak"] > 0 else 1
+    elif result == "defeat":
+        agg["losses"] += 1
+        agg["streak"] = agg["streak"] - 1 if agg["streak"] < 0 else -1
+
+    if match.get("lp_change") is not None:
+        agg["lp_window"].append(match["lp_change"])
+        agg["lp_delta"] += match["lp_change"]
+        if len(agg["lp_window"]) > LP_WINDOW:
+            agg["lp_delta"] -= agg["lp_window"].pop(0)
+
+    champion = match.get("champion")
+    if champion and champion != "–":
+        agg["champions"][champion] = agg["champions"].get(champion, 0) + 1
+
+
+class MatchHistoryStore(_SqliteStore):
+    """
+    Histórico de partidas por conta ("região/nick"), só de acréscimo.
+    Cada scrape traz as últimas partidas (mais nova primeiro); só as que vêm
+    antes da primeira já conhecida são gravadas, e os agregados são
+    atualizados na mesma transação. Consultas de estatística leem uma linha.
+    """
+
+    @property
+    def is_open(self) -> bool:
+        return self._conn is not None
+
+    async def record(self, account: str, matches) -> list[dict]:
+        """
+        Grava as partidas novas (services.models.Match, mais nova primeiro) e
+        devolve-as como dicts compactos, mais antiga primeiro.
+        """
+        matches = [{k: getattr(m, k) for k in _MATCH_FIELDS} for m in matches]
+
+        def _record():
+            conn = self._db()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                new = []
+                for match in matches:
+                    fp = match_fingerprint(match)
+                    known = conn.execute(
+                        "SELECT 1 FROM match_history WHERE account = ? AND fingerprint = ?", (account, fp)
+                    ).fetchone()
+                    if known:
+                        break
+                    if all(fp != f for f, _ in new):
+                        new.append((fp, match))
+                if not new:
+                    return []
+
+                new.reverse()
+                row = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) FROM match_history WHERE account = ?", (account,)
+                ).fetchone()
+                agg_row = conn.execute(
+                    "SELECT data FROM match_aggregates WHERE account = ?", (account,)
+                ).fetchone()
+                agg = json.loads(agg_row[0]) if agg_row else empty_aggregates()
+
+                now = time.time()
+                rows = []
+                for seq, (fp, match) in enumerate(new, start=row[0] + 1):
+                    rows.append((account, seq, fp, json.dumps(match, ensure_ascii=False), now))
+                    apply_match(agg, match)
+                agg["updated_at"] = now
+
+                conn.executemany(
+                    "INSERT INTO match_history (account, seq, fingerprint, data, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT INTO match_aggregates (account, data) VALUES (?, ?) "
+                    "ON CONFLICT(account) DO UPDATE SET data = excluded.data",
+                    (account, json.dumps(agg, ensure_ascii=False)),
+                )
+                return [m for _, m in new]
+        return await self._run(_record)
+
+    async def aggregates(self, account: str) -> dict | None:
+        def _get():
+            row = self._db().execute(
+                "SELECT data FROM match_aggregates WHERE account = ?", (account,)
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        return await self._run(_get)
+
+    async def recent(self, account: str, limit: int = 20) -> list[dict]:
+        """Partidas gravadas, mais nova primeiro."""
+        def _list():
+            rows = self._db().execute(
+                "SELECT data, recorded_at FROM match_history WHERE account = ? ORDER BY seq DESC LIMIT ?",
+                (account, limit),
+            )
+            return [{**json.loads(data), "recorded_at": recorded_at} for data, recorded_at in rows]
+        return await self._run(_list)
+
+
+# aberto pelo bot no setup_hook; sem ele (scripts) o histórico simplesmente não é gravado
+MATCH_HISTORY = MatchHistoryStore()
+
+
+class MetaStore(_SqliteStore):
+    """Chaves avulsas do próprio bot (ex: hash da última árvore de comandos sincronizada)."""
+
+
+BOT_META = MetaStore()
+
+
+class WriteBehindStore:
+    """
+    Write-behind na frente do UserStore: /vincular e /desvincular só anotam a
+    alteração em memória (coalescida por usuário) e retornam na hora.
+    Um loop grava o lote a cada `flush_interval` segundos ou quando passa de
+    `max_batch` alterações, e no close(). Um crash perde no máximo uma janela.
+    Periodicamente o WAL do SQLite é compactado (checkpoint).
+    """
+
+    def __init__(
+        self,
+        store: UserStore,
+        *,
+        flush_interval: float = 2.0,
+        max_batch: int = 200,
+        checkpoint_interval: float = 300.0,
+    ):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.checkpoint_interval = checkpoint_interval
+
+        self._pending: dict[str, tuple[str, str] | None] = {}
+        # lote sendo gravado: continua visível para get()/load_all() até o commit
+        self._flushing: dict[str, tuple[str, str] | None] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self._last_checkpoint = time.monotonic()
+        self.flushes = 0
+        self.flush_errors = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def open(self) -> "WriteBehindStore":
+        await self.store.open()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def load_all(self) -> dict:
+        data = await self.store.load_all()
+        # o que ainda não foi gravado vale mais que o banco (e o pendente mais que o lote em gravação)
+        for changes in (self._flushing, self._pending):
+            for user_id, v in list(changes.items()):
+                if v:
+                    data[user_id] = {"region": v[0], "nickname": v[1]}
+                else:
+                    data.pop(user_id, None)
+        return data
+
+    async def get(self, user_id: str) -> dict | None:
+        for changes in (self._pending, self._flushing):
+            if user_id in changes:
+                v = changes[user_id]
+                return {"region": v[0], "nickname": v[1]} if v else None
+        return await self.store.get(user_id)
+
+    def upsert(self, user_id: str, region: str, nickname: str) -> None:
+        self._note(user_id, (region, nickname))
+
+    def delete(self, user_id: str) -> None:
+        self._note(user_id, None)
+
+    def _note(self, user_id: str, value: tuple[str, str] | None) -> None:
+        self._pending[user_id] = value
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            await self.flush()
+            if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                self._last_checkpoint = time.monotonic()
+                try:
+                    await self.store.checkpoint()
+                except Exception:
+                    # o loop não pode morrer: sem ele os vínculos só iriam ao banco no close()
+                    log.warning("checkpoint do WAL falhou", exc_info=True)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch = self._flushing = self._pending
+            self._pending = {}
+            try:
+                await self.store.apply_batch(batch)
+                self.flushes += 1
+            except Exception:
+                self.flush_errors += 1
+                log.warning("gravação dos vínculos falhou", exc_info=True, extra={"batch": len(batch)})
+                # devolve o lote, sem sobrescrever alterações mais novas
+                for uid, value in batch.items():
+                    self._pending.setdefault(uid, value)
+            finally:
+                # só agora: até o commit, get() ainda acha o lote em memória
+                self._flushing = {}
 
-def save_user_history(data: dict, path: str = DEFAULT_PATH) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await self.store.close()
@@ -0,0 +1,151 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Callable
+
+from utils.html import parser_backend
+from utils.logging_segup import METRICS, PARSE_SECONDS, PARSE_WAIT_SECONDS
+from utils.ratelimit import UpstreamUnavailable
+
+# "thread" (padrão) ou "process"; processos isolam o GIL mas pagam pickle do HTML
+POOL_KIND = os.getenv("DPPGG_PARSE_POOL", "thread")
+POOL_WORKERS = int(os.getenv("DPPGG_PARSE_WORKERS", "2"))
+# máximo de parses aguardando/rodando no pool; acima disso run() recusa na hora
+POOL_MAX_PENDING = int(os.getenv("DPPGG_PARSE_QUEUE", "32"))
+# quanto a recusa sugere esperar antes de tentar de novo (segundos)
+OVERLOAD_RETRY_IN = 1.0
+
+
+class ParseOverloaded(UpstreamUnavailable):
+    """
+    Fila de parse cheia. É um UpstreamUnavailable para seguir o mesmo caminho:
+    os caches servem a entrada vencida e os cogs respondem "tente mais tarde".
+    """
+
+    def __init__(self, pending: int):
+        super().__init__("parse", OVERLOAD_RETRY_IN)
+        self.pending = pending
+
+
+@dataclass
+class ParseStats:
+    calls: int = 0
+    errors: int = 0
+    rejected: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    run_total: float = 0.0
+    run_max: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _timed_call(fn: Callable, args: tuple) -> tuple[Any, float]:
+    # roda dentro do worker; precisa ser função de módulo para ser "picklável"
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class ParsePool:
+    """
+    Tira o parse de HTML do event loop do discord.py.
+    A fila é limitada por `max_pending` (esperando + rodando): cheia, run()
+    levanta ParseOverloaded na hora em vez de acumular espera. Cada função
+    registra quanto tempo esperou na fila do executor e quanto tempo rodou.
+    """
+
+    def __init__(self, *, kind: str = POOL_KIND, workers: int = POOL_WORKERS, max_pending: int = POOL_MAX_PENDING):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"tipo de pool inválido: {kind!r}")
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.stats: dict[str, ParseStats] = {}
+
+        self._executor: Executor | None = None
+        self.pending = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parse")
+        return self._executor
+
+    async def run(self, fn: Callable, *args) -> Any:
+        stats = self.stats.setdefault(fn.__name__, ParseStats())
+        if self.pending >= self.max_pending:
+            stats.rejected += 1
+            self.rejected += 1
+            raise ParseOverloaded(self.pending)
+
+        enqueued = time.perf_counter()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, run_time = await loop.run_in_executor(self._get_executor(), _timed_call, fn, args)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            self.pending -= 1
+
+        wait = max(0.0, time.perf_counter() - enqueued - run_time)
+        PARSE_SECONDS.observe(run_time, parser=fn.__name__)
+        PARSE_WAIT_SECONDS.observe(wait, parser=fn.__name__)
+        stats.calls += 1
+        stats.wait_total += wait
+        stats.wait_max = max(stats.wait_max, wait)
+        stats.run_total += run_time
+        stats.run_max = max(stats.run_max, run_time)
+        return result
+
+    async def warm_up(self, fn: Callable) -> None:
+        """
+        Roda `fn` (ex: importar o parser) em cada worker antes do primeiro
+        comando, para que ninguém pague o import na primeira raspagem.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # no pool de processos cada worker importa por conta própria
+        calls = self.workers if self.kind == "process" else 1
+        await asyncio.gather(*(loop.run_in_executor(executor, fn) for _ in range(calls)), return_exceptions=True)
+
+    def collect_metrics(self):
+        """ParseStats por parser, a fila do pool e o backend de parse em uso (lxml ou o fallback)."""
+        yield "dppgg_parse_pool_pending", "gauge", {"kind": self.kind}, self.pending
+        yield "dppgg_parse_pool_capacity", "gauge", {"kind": self.kind}, self.max_pending
+        yield "dppgg_parse_pool_rejected_total", "counter", {"kind": self.kind}, self.rejected
+        yield "dppgg_parse_backend", "gauge", {"backend": parser_backend()}, 1
+        for name, stats in list(self.stats.items()):
+            labels = {"parser": name}
+            yield "dppgg_parse_calls_total", "counter", labels, stats.calls
+            yield "dppgg_parse_errors_total", "counter", labels, stats.errors
+            yield "dppgg_parse_rejected_total", "counter", labels, stats.rejected
+            yield "dppgg_parse_wait_seconds_total", "counter", labels, stats.wait_total
+            yield "dppgg_parse_wait_max_seconds", "gauge", labels, stats.wait_max
+            yield "dppgg_parse_run_seconds_total", "counter", labels, stats.run_total
+            yield "dppgg_parse_run_max_seconds", "gauge", labels, stats.run_max
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+PARSE_POOL = ParsePool()
+METRICS.register_collector(PARSE_POOL.collect_metrics)
+
+
+async def run_parser(fn: Callable, *args) -> Any:
+    return await PARSE_POOL.run(fn, *args)